@@ -0,0 +1 @@
+"""Micro-benchmarks for Peer DID creation, resolution and encoding primitives."""
@@ -0,0 +1,82 @@
+"""Run the benchmark suite."""
+
+import argparse
+import json
+import sys
+
+from .runner import compare, format_comparisons, format_result, run
+from .scenarios import IMPORT_BUDGETS, SCENARIOS
+
+
+def main(argv=None) -> int:
+    """Run the benchmarks, optionally saving and comparing the results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the peerdid micro-benchmarks."
+    )
+    parser.add_argument(
+        "-k", "--filter", help="only run scenarios whose name contains this string"
+    )
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument(
+        "-b", "--baseline", help="compare the results to a saved JSON report"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative median slowdown reported as a regression (default: 0.1)",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=30, help="samples per scenario (default: 30)"
+    )
+    parser.add_argument(
+        "--sample-time",
+        type=float,
+        default=0.01,
+        help="target duration of a sample in seconds (default: 0.01)",
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = {
+        name: fn
+        for name, fn in SCENARIOS.items()
+        if not args.filter or args.filter in name
+    }
+    imports = [
+        module
+        for module in IMPORT_BUDGETS
+        if not args.filter or args.filter in "import_" + module
+    ]
+    report = run(
+        scenarios,
+        args.samples,
+        args.sample_time,
+        progress=lambda name, result: print(format_result(name, result)),
+        imports=imports,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    status = 0
+    for module in imports:
+        p50 = report["results"]["import_" + module]["p50"]
+        if p50 > IMPORT_BUDGETS[module]:
+            print(
+                "import {} took {:.1f}ms, over its {:.1f}ms budget".format(
+                    module, p50 * 1e3, IMPORT_BUDGETS[module] * 1e3
+                )
+            )
+            status = 1
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparisons = compare(json.load(f), report, args.threshold)
+        print()
+        print(format_comparisons(comparisons))
+        if any(c.regression for c in comparisons):
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Benchmark measurement, reporting and baseline comparison."""
+
+import math
+import platform
+import subprocess
+import sys
+import time
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import peerdid
+
+BenchmarkResult = NamedTuple(
+    "BenchmarkResult",
+    [
+        ("ops_per_sec", float),
+        ("mean", float),
+        ("p50", float),
+        ("p90", float),
+        ("p99", float),
+        ("samples", int),
+        ("loops", int),
+    ],
+)
+
+Comparison = NamedTuple(
+    "Comparison",
+    [
+        ("name", str),
+        ("baseline", float),
+        ("current", float),
+        ("change", float),
+        ("regression", bool),
+    ],
+)
+
+
+def measure(
+    fn: Callable[[], object], samples: int = 30, sample_time: float = 0.01
+) -> BenchmarkResult:
+    """
+    Measure a function.
+
+    The number of calls per sample is calibrated so that a sample takes about
+    sample_time seconds, then the per-call latency of every sample is recorded.
+
+    :param fn: function to call without arguments
+    :param samples: number of samples to take
+    :param sample_time: target duration of a sample in seconds
+    :return: throughput and per-call latency percentiles in seconds
+    """
+    if samples < 1:
+        raise ValueError("Number of samples must be positive")
+    loops = 1
+    while True:
+        elapsed = _time_loops(fn, loops)
+        if elapsed >= sample_time:
+            break
+        loops = max(loops * 2, int(loops * sample_time / max(elapsed, 1e-9)))
+
+    total = 0.0
+    latencies = []
+    for _ in range(samples):
+        elapsed = _time_loops(fn, loops)
+        total += elapsed
+        latencies.append(elapsed / loops)
+    latencies.sort()
+    return BenchmarkResult(
+        ops_per_sec=samples * loops / total,
+        mean=total / (samples * loops),
+        p50=_percentile(latencies, 50),
+        p90=_percentile(latencies, 90),
+        p99=_percentile(latencies, 99),
+        samples=samples,
+        loops=loops,
+    )
+
+
+def measure_import(module: str, samples: int = 30) -> BenchmarkResult:
+    """
+    Measure the cold import time of a module.
+
+    Every sample imports the module in a fresh interpreter, timing the import
+    statement only, without the interpreter start-up.
+
+    :param module: name of the module to import
+    :param samples: number of interpreters to start
+    :return: throughput and import time percentiles in seconds
+    """
+    if samples < 1:
+        raise ValueError("Number of samples must be positive")
+    code = (
+        "import time; start = time.perf_counter(); import {}; "
+        "print(time.perf_counter() - start)".format(module)
+    )
+    latencies = sorted(
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                check=True,
+                stdout=subprocess.PIPE,
+                universal_newlines=True,
+            ).stdout
+        )
+        for _ in range(samples)
+    )
+    total = sum(latencies)
+    return BenchmarkResult(
+        ops_per_sec=samples / total,
+        mean=total / samples,
+        p50=_percentile(latencies, 50),
+        p90=_percentile(latencies, 90),
+        p99=_percentile(latencies, 99),
+        samples=samples,
+        loops=1,
+    )
+
+
+def run(
+    scenarios: Dict[str, Callable[[], object]],
+    samples: int = 30,
+    sample_time: float = 0.01,
+    progress: Optional[Callable[[str, BenchmarkResult], None]] = None,
+    imports: Iterable[str] = (),
+) -> dict:
+    """
+    Run benchmark scenarios.
+
+    :param scenarios: functions to measure by name
+    :param samples: number of samples per scenario
+    :param sample_time: target duration of a sample in seconds
+    :param progress: optional callback receiving each scenario result
+    :param imports: modules to measure the cold import time of, reported as
+        `import_<module>` scenarios
+    :return: JSON-serializable report with metadata and results by scenario name
+    """
+    results = {}
+    measurements = [
+        (name, lambda fn=fn: measure(fn, samples, sample_time))
+        for name, fn in scenarios.items()
+    ] + [
+        ("import_" + module, lambda module=module: measure_import(module, samples))
+        for module in imports
+    ]
+    for name, measurement in measurements:
+        result = measurement()
+        if progress:
+            progress(name, result)
+        results[name] = result._asdict()
+    return {
+        "metadata": {
+            "peerdid": peerdid.__version__,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> List[Comparison]:
+    """
+    Compare two reports by median latency.
+
+    :param baseline: report to compare against
+    :param current: report to compare
+    :param threshold: relative slowdown above which a scenario is a regression
+    :return: comparison of every scenario present in both reports
+    """
+    comparisons = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = result["p50"] / base["p50"] - 1
+        comparisons.append(
+            Comparison(name, base["p50"], result["p50"], change, change > threshold)
+        )
+    return comparisons
+
+
+def format_result(name: str, result: BenchmarkResult) -> str:
+    """Format a scenario result for display."""
+    return "{:<40} {:>12,.0f} ops/s  p50 {:>9}  p90 {:>9}  p99 {:>9}".format(
+        name,
+        result.ops_per_sec,
+        _format_time(result.p50),
+        _format_time(result.p90),
+        _format_time(result.p99),
+    )
+
+
+def format_comparisons(comparisons: Iterable[Comparison]) -> str:
+    """Format a baseline comparison for display."""
+    return "\n".join(
+        "{:<40} {:>9} -> {:>9}  {:+7.1%}{}".format(
+            c.name,
+            _format_time(c.baseline),
+            _format_time(c.current),
+            c.change,
+            "  REGRESSION" if c.regression else "",
+        )
+        for c in comparisons
+    )
+
+
+def _time_loops(fn: Callable[[], object], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    index = max(math.ceil(len(values) * percentile / 100) - 1, 0)
+    return values[index]
+
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return "{:.2f}ms".format(seconds * 1e3)
+    return "{:.2f}us".format(seconds * 1e6)
@@ -0,0 +1,77 @@
+"""Benchmark scenarios."""
+
+import json
+
+from typing import Callable, Dict
+
+from peerdid.core.jwk_okp import jwk_to_public_key, public_key_to_jwk
+from peerdid.core.multibase import from_multibase, to_multibase
+from peerdid.core.multicodec import Codec, from_multicodec
+from peerdid.core.peer_did_helper import decode_service, encode_service
+from peerdid.dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+)
+from peerdid.keys import Ed25519VerificationKey, KeyFormat, X25519KeyAgreementKey
+
+SIGNING_KEY = Ed25519VerificationKey.from_base58(
+    "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7"
+)
+ENCRYPTION_KEY = X25519KeyAgreementKey.from_base58(
+    "DmgBSHMqaZiYqwNMEJJuxWzsGGC8jUYADrfSdBrC6L8s"
+)
+SERVICE = {
+    "type": "DIDCommMessaging",
+    "serviceEndpoint": "https://example.com/endpoint",
+    "routingKeys": ["did:example:somemediator#somekey"],
+    "accept": ["didcomm/v2", "didcomm/aip2;env=rfc587"],
+}
+
+PEER_DID_NUMALGO_0 = create_peer_did_numalgo_0(SIGNING_KEY)
+PEER_DID_NUMALGO_2 = create_peer_did_numalgo_2([ENCRYPTION_KEY], [SIGNING_KEY], SERVICE)
+ENCODED_SERVICE = encode_service(SERVICE)[2:]
+MULTICODEC = Codec.ED25519.encode_multicodec(SIGNING_KEY.public_key)
+MULTIBASE = to_multibase(MULTICODEC)
+JWK = json.dumps(public_key_to_jwk(SIGNING_KEY.public_key, Codec.ED25519))
+
+
+def _scenarios() -> Dict[str, Callable[[], object]]:
+    scenarios = {
+        "create_peer_did_numalgo_0": lambda: create_peer_did_numalgo_0(SIGNING_KEY),
+        "create_peer_did_numalgo_2": lambda: create_peer_did_numalgo_2(
+            [ENCRYPTION_KEY], [SIGNING_KEY], SERVICE
+        ),
+    }
+    for numalgo, peer_did in (("0", PEER_DID_NUMALGO_0), ("2", PEER_DID_NUMALGO_2)):
+        for format in KeyFormat:
+            name = "resolve_peer_did_numalgo_{}_{}".format(numalgo, format.name.lower())
+            scenarios[name] = lambda peer_did=peer_did, format=format: resolve_peer_did(
+                peer_did, format
+            )
+    scenarios.update(
+        {
+            "encode_service": lambda: encode_service(SERVICE),
+            "decode_service": lambda: decode_service(ENCODED_SERVICE),
+            "to_multibase": lambda: to_multibase(MULTICODEC),
+            "from_multibase": lambda: from_multibase(MULTIBASE),
+            "encode_multicodec": lambda: Codec.ED25519.encode_multicodec(
+                SIGNING_KEY.public_key
+            ),
+            "from_multicodec": lambda: from_multicodec(MULTICODEC),
+            "public_key_to_jwk": lambda: public_key_to_jwk(
+                SIGNING_KEY.public_key, Codec.ED25519
+            ),
+            "jwk_to_public_key": lambda: jwk_to_public_key(JWK),
+        }
+    )
+    return scenarios
+
+
+SCENARIOS = _scenarios()
+
+# cold-start budgets in seconds for the median import time of these modules
+IMPORT_BUDGETS = {
+    "peerdid": 0.1,
+    "peerdid.documents": 0.4,
+}
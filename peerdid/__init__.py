@@ -1,9 +1,38 @@
 """Peer DID document generation and resolution."""
 
-from . import core, dids, errors, keys
+import importlib
 
-from pydid import DID, DIDDocument
+from typing import TYPE_CHECKING
+
+from . import cache, core, dids, errors, instrumentation, keys, policy, routing
+
+if TYPE_CHECKING:
+    from pydid import DID, DIDDocument
+
+    from . import documents
 
 __version__ = "0.5.2"
 
-__all__ = ["__version__", "core", "errors", "dids", "keys", "DID", "DIDDocument"]
+__all__ = [
+    "__version__",
+    "cache",
+    "core",
+    "errors",
+    "instrumentation",
+    "dids",
+    "documents",
+    "keys",
+    "policy",
+    "routing",
+    "DID",
+    "DIDDocument",
+]
+
+
+def __getattr__(name: str):
+    """Load pydid and the modules depending on it on first use."""
+    if name in ("DID", "DIDDocument"):
+        return getattr(importlib.import_module("pydid"), name)
+    if name == "documents":
+        return importlib.import_module(".documents", __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
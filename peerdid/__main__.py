@@ -0,0 +1,8 @@
+"""Run the Peer DID command-line interface."""
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,514 @@
+"""Peer DID resolution caching."""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .core.utils import lazy_import
+from .keys import KeyFormat
+
+if TYPE_CHECKING:
+    from pydid import DID, DIDDocument
+
+__getattr__ = lazy_import(__name__, {"DID": "pydid", "DIDDocument": "pydid"})
+
+CacheStats = NamedTuple(
+    "CacheStats",
+    [
+        ("hits", int),
+        ("misses", int),
+        ("evictions", int),
+        ("entries", int),
+        ("nbytes", int),
+    ],
+)
+
+CacheKey = Tuple[str, KeyFormat]
+SegmentKey = Tuple[str, Optional[KeyFormat]]
+
+SQLITE_SCHEMA_VERSION = 1
+
+
+class CacheBackend(ABC):
+    """Storage of resolved DID Documents consulted by `resolve_peer_did`."""
+
+    @abstractmethod
+    def get(
+        self, peer_did: Union[str, DID], format: KeyFormat
+    ) -> Optional[DIDDocument]:
+        """Get a copy of the cached DID Document, or None if it is not cached."""
+
+    @abstractmethod
+    def put(self, peer_did: Union[str, DID], format: KeyFormat, did_doc: DIDDocument):
+        """Store a resolved DID Document."""
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries."""
+
+
+class ResolutionCache(CacheBackend):
+    """Bounded LRU cache of resolved DID Documents.
+
+    Peer DIDs are self-certifying, so a resolved document never goes stale;
+    the optional TTL only bounds how long rarely used entries are retained.
+
+    Documents are stored as pickled snapshots: every hit returns a fresh copy,
+    so callers cannot corrupt the shared entry, and the snapshot size is what
+    is accounted against the memory budget.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initializer.
+
+        :param maxsize: maximum number of cached documents, None for no limit
+        :param ttl: number of seconds an entry is kept, None to keep entries until evicted
+        :param max_bytes: memory budget for the cached snapshots, None for no limit
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("Cache size can not be negative")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("Cache memory budget can not be negative")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[Optional[float], bytes]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(
+        self, peer_did: Union[str, DID], format: KeyFormat
+    ) -> Optional[DIDDocument]:
+        """Get a copy of the cached DID Document, or None if it is not cached."""
+        key = (str(peer_did), format)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, blob = entry
+                if expires is not None and expires <= time.monotonic():
+                    self._remove(key)
+                    self._evictions += 1
+                    entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return pickle.loads(blob)
+
+    def put(self, peer_did: Union[str, DID], format: KeyFormat, did_doc: DIDDocument):
+        """Store a resolved DID Document, evicting the least recently used entries."""
+        if self.maxsize == 0:
+            return
+        blob = pickle.dumps(did_doc, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(blob) > self.max_bytes:
+            return
+        key = (str(peer_did), format)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, blob)
+            self._nbytes += len(blob)
+            while (self.maxsize is not None and len(self._entries) > self.maxsize) or (
+                self.max_bytes is not None and self._nbytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self):
+        """Remove all entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> CacheStats:
+        """Get the cache counters."""
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._nbytes,
+            )
+
+    def __len__(self) -> int:
+        """Get the number of cached documents."""
+        return len(self._entries)
+
+    def _remove(self, key: CacheKey):
+        _, blob = self._entries.pop(key)
+        self._nbytes -= len(blob)
+
+
+class SegmentCache:
+    """Bounded LRU memo of decoded Peer DID segments.
+
+    Peer DIDs sharing a key or a service segment, such as all the DIDs behind
+    one mediator, only need that segment decoded once. Entries are keyed on the
+    raw segment string and the key format (None for services). Decoded keys are
+    immutable and shared as is; services are stored as pickled snapshots, so
+    every hit returns fresh models that callers may modify.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        """Initializer.
+
+        :param maxsize: maximum number of memoized segments
+        """
+        if maxsize < 0:
+            raise ValueError("Cache size can not be negative")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[SegmentKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, segment: str, format: Optional[KeyFormat]) -> Optional[Any]:
+        """Get the memoized value of a segment, or None if it is not memoized."""
+        key = (segment, format)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return value
+
+    def put(self, segment: str, format: Optional[KeyFormat], value: Any):
+        """Memoize the value of a segment, evicting the least recently used ones."""
+        if self.maxsize == 0:
+            return
+        key = (segment, format)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            if isinstance(value, bytes):
+                self._nbytes += len(value)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self):
+        """Remove all entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> CacheStats:
+        """Get the cache counters, nbytes being the size of the service snapshots."""
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._nbytes,
+            )
+
+    def __len__(self) -> int:
+        """Get the number of memoized segments."""
+        return len(self._entries)
+
+    def _remove(self, key: SegmentKey):
+        value = self._entries.pop(key)
+        if isinstance(value, bytes):
+            self._nbytes -= len(value)
+
+
+_segment_cache: Optional[SegmentCache] = None
+
+
+def set_segment_cache(cache: Optional[SegmentCache]) -> Optional[SegmentCache]:
+    """
+    Install the process-wide segment memo.
+
+    Once installed, key and service segments are looked up in the memo before they
+    are decoded, by resolution and by the lazy documents alike. Segments that fail
+    to decode are not memoized.
+
+    :param cache: the memo, or None to decode every segment
+    :return: the previously installed memo
+    """
+    global _segment_cache
+    previous = _segment_cache
+    _segment_cache = cache
+    return previous
+
+
+def get_segment_cache() -> Optional[SegmentCache]:
+    """Get the installed segment memo."""
+    return _segment_cache
+
+
+@contextmanager
+def segment_cache(cache: SegmentCache) -> Iterator[SegmentCache]:
+    """Install a segment memo for the duration of a with block."""
+    previous = set_segment_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_segment_cache(previous)
+
+
+class SQLiteResolutionCache(CacheBackend):
+    """On-disk cache of resolved DID Documents in a SQLite database.
+
+    Documents are stored serialized to JSON per (DID, format), keeping the
+    null members of services, and survive restarts. The database is used in WAL mode, so worker processes on one host
+    can share a warm cache through the same file without readers blocking each
+    other or the writer. A cache object can be passed to worker processes, which
+    open their own connection.
+
+    Writes are buffered and committed in batches of `batch_size` documents. Call
+    `flush` or `close`, or use the cache as a context manager, to commit pending
+    writes. Documents are rebuilt from their JSON on reads; an entry which is not
+    a serialized Peer DID Document is evicted instead.
+
+    The cache keeps its entries in a `peerdid_documents` table, marked as its own
+    by a `peerdid_cache` metadata table, so the database may hold other tables.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, timeout: float = 5.0):
+        """Initializer.
+
+        :param path: path of the database file, created if it does not exist
+        :param batch_size: number of documents buffered before they are written
+        :param timeout: number of seconds to wait for a lock held by another process
+        """
+        if batch_size < 1:
+            raise ValueError("Cache batch size must be positive")
+        self.path = os.fspath(path)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pending: Dict[CacheKey, str] = {}
+        self._connection = None
+        self._pid = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        with self._lock:
+            self._connect()
+
+    def get(
+        self, peer_did: Union[str, DID], format: KeyFormat
+    ) -> Optional[DIDDocument]:
+        """Get a copy of the cached DID Document, or None if it is not cached."""
+        from .core.segments import construct_did_doc_from_dict
+
+        key = (str(peer_did), format)
+        with self._lock:
+            document = self._pending.get(key)
+            if document is None:
+                row = (
+                    self._connect()
+                    .execute(
+                        "SELECT document FROM peerdid_documents "
+                        "WHERE did = ? AND format = ?",
+                        (key[0], format.value),
+                    )
+                    .fetchone()
+                )
+                document = row[0] if row else None
+            if document is None:
+                self._misses += 1
+                return None
+            try:
+                did_doc = construct_did_doc_from_dict(json.loads(document))
+                if did_doc.id != key[0]:
+                    raise ValueError("Cached DID Document of another DID")
+            except Exception:
+                # not a serialized Peer DID Document
+                self._pending.pop(key, None)
+                with self._connection:
+                    self._connection.execute(
+                        "DELETE FROM peerdid_documents WHERE did = ? AND format = ?",
+                        (key[0], format.value),
+                    )
+                self._evictions += 1
+                self._misses += 1
+                return None
+            self._hits += 1
+        return did_doc
+
+    def put(self, peer_did: Union[str, DID], format: KeyFormat, did_doc: DIDDocument):
+        """Store a resolved DID Document, writing the batch once it is full."""
+        document = json.dumps(_serialize_did_doc(did_doc))
+        with self._lock:
+            self._connect()
+            self._pending[(str(peer_did), format)] = document
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        """Write the pending documents."""
+        with self._lock:
+            self._connect()
+            self._flush()
+
+    def clear(self):
+        """Remove all entries, keeping the counters."""
+        with self._lock:
+            self._pending.clear()
+            with self._connect():
+                self._connection.execute("DELETE FROM peerdid_documents")
+
+    def close(self):
+        """Write the pending documents and close the database connection."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._flush()
+                self._connection.close()
+            self._connection = None
+
+    def stats(self) -> CacheStats:
+        """Get the counters of this cache object and the size of the database."""
+        with self._lock:
+            self._connect()
+            self._flush()
+            entries, nbytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(document AS BLOB))), 0) "
+                "FROM peerdid_documents"
+            ).fetchone()
+            return CacheStats(
+                self._hits, self._misses, self._evictions, entries, nbytes
+            )
+
+    def __len__(self) -> int:
+        """Get the number of cached documents."""
+        return self.stats().entries
+
+    def __enter__(self) -> "SQLiteResolutionCache":
+        """Use the cache as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the cache."""
+        self.close()
+
+    def __reduce__(self):
+        """Pickle the cache settings only, every process opens its own connection."""
+        return (self.__class__, (self.path, self.batch_size, self.timeout))
+
+    def _connect(self):
+        # connections are not shared with forked processes, nor are the writes
+        # buffered by the parent process
+        if self._connection is None or self._pid != os.getpid():
+            import sqlite3
+
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            try:
+                with connection:
+                    # one process at a time checks and creates the schema
+                    connection.execute("BEGIN IMMEDIATE")
+                    _create_sqlite_schema(connection, self.path)
+            except BaseException:
+                connection.close()
+                raise
+            self._connection = connection
+            self._pid = os.getpid()
+            self._pending.clear()
+        return self._connection
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO peerdid_documents (did, format, document) "
+                "VALUES (?, ?, ?)",
+                [
+                    (did, format.value, document)
+                    for (did, format), document in self._pending.items()
+                ],
+            )
+        self._pending.clear()
+
+
+def _create_sqlite_schema(connection, path: str):
+    tables = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name IN ('peerdid_cache', 'peerdid_documents')"
+        )
+    }
+    if "peerdid_cache" in tables:
+        row = connection.execute(
+            "SELECT value FROM peerdid_cache WHERE name = 'schema_version'"
+        ).fetchone()
+        if row is None or row[0] != SQLITE_SCHEMA_VERSION:
+            raise ValueError(
+                "{} has an unsupported cache schema version: {}".format(
+                    path, row and row[0]
+                )
+            )
+    elif "peerdid_documents" in tables:
+        raise ValueError(
+            "{} has a peerdid_documents table not created by the cache".format(path)
+        )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS peerdid_cache ("
+        "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+    )
+    connection.execute(
+        "INSERT OR IGNORE INTO peerdid_cache (name, value) "
+        "VALUES ('schema_version', ?)",
+        (SQLITE_SCHEMA_VERSION,),
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS peerdid_documents ("
+        "did TEXT NOT NULL, format INTEGER NOT NULL, "
+        "document TEXT NOT NULL, PRIMARY KEY (did, format)"
+        ") WITHOUT ROWID"
+    )
+
+
+def _serialize_did_doc(did_doc: DIDDocument) -> dict:
+    # Resource.serialize drops None members, including null service extras
+    document = did_doc.serialize()
+    if did_doc.service:
+        document["service"] = [
+            service.dict(by_alias=True) for service in did_doc.service
+        ]
+    return document
@@ -0,0 +1,210 @@
+"""Command-line interface for Peer DID creation, validation and resolution."""
+
+import argparse
+import json
+import sys
+
+from contextlib import ExitStack
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+)
+
+from .core.parallel import map_chunks
+from .dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    resolve_peer_did_dict,
+)
+from .errors import PeerDIDError
+from .keys import BaseKey, KeyFormat
+
+FORMATS = {format.name.lower(): format for format in KeyFormat}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the command-line interface.
+
+    Input is read line by line from the given files or stdin: either one value per
+    line or one JSON value per line (NDJSON). One JSON object is written per input
+    line, in input order. Blank lines are skipped.
+
+    :param argv: command-line arguments, None for sys.argv
+    :return: exit status, 1 if any input line failed
+    """
+    args = _parser().parse_args(argv)
+    if args.jobs < 0:
+        args.parser.error("--jobs must not be negative")
+    if args.chunksize < 1:
+        args.parser.error("--chunksize must be positive")
+    if args.command == "create":
+        chunk_args = ()
+    else:
+        chunk_args = (FORMATS[args.format],)
+
+    with ExitStack() as stack:
+        output = sys.stdout
+        if args.output != "-":
+            output = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        failed = False
+        for ok, record in map_chunks(
+            args.handler,
+            _read_lines(args.inputs, stack),
+            *chunk_args,
+            workers=args.jobs or None,
+            chunksize=args.chunksize,
+        ):
+            failed = failed or not ok
+            output.write(record)
+            output.write("\n")
+        output.flush()
+    return 1 if failed else 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m peerdid",
+        description="Create, validate and resolve Peer DIDs, writing NDJSON output.",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+    commands = [
+        (
+            "resolve",
+            _resolve_lines,
+            "resolve Peer DIDs, one DID or JSON object with a 'did' member per line",
+        ),
+        (
+            "validate",
+            _validate_lines,
+            "validate Peer DIDs, one DID or JSON object with a 'did' member per line",
+        ),
+        (
+            "create",
+            _create_lines,
+            "create Peer DIDs, one JSON object per line with an 'inceptionKey' or "
+            "'encryptionKeys', 'signingKeys' and 'service' members, keys in multibase",
+        ),
+    ]
+    for name, handler, help in commands:
+        command = subparsers.add_parser(name, help=help, description=help)
+        command.set_defaults(handler=handler, parser=command)
+        command.add_argument(
+            "inputs",
+            nargs="*",
+            default=["-"],
+            metavar="FILE",
+            help="input files, '-' or none for stdin",
+        )
+        command.add_argument(
+            "-o", "--output", default="-", help="output file, '-' for stdout"
+        )
+        if name != "create":
+            command.add_argument(
+                "-f",
+                "--format",
+                choices=list(FORMATS),
+                default="multibase",
+                help="format of public keys in the DID Documents",
+            )
+        command.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="number of worker processes, 0 for the CPU count (default: 1)",
+        )
+        command.add_argument(
+            "--chunksize",
+            type=int,
+            default=256,
+            help="number of lines sent to a worker at once (default: 256)",
+        )
+    return parser
+
+
+def _read_lines(inputs: Iterable[str], stack: ExitStack) -> Iterator[str]:
+    for path in inputs:
+        if path == "-":
+            lines: TextIO = sys.stdin
+        else:
+            lines = stack.enter_context(open(path, encoding="utf-8"))
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def _parse_did(line: str) -> str:
+    if line[0] in '{"':
+        value = json.loads(line)
+        if isinstance(value, dict):
+            value = value.get("did")
+        if not isinstance(value, str):
+            raise ValueError("Expected a DID string or an object with a 'did' member")
+        return value
+    return line
+
+
+def _process_lines(
+    lines: List[str], process: Callable[[str], Tuple[bool, dict]]
+) -> List[Tuple[bool, str]]:
+    results = []
+    for line in lines:
+        try:
+            ok, record = process(line)
+        except (PeerDIDError, TypeError, ValueError) as e:
+            ok, record = False, {"input": line, "error": str(e)}
+        results.append((ok, json.dumps(record)))
+    return results
+
+
+def _resolve_lines(lines: List[str], format: KeyFormat) -> List[Tuple[bool, str]]:
+    def resolve(line: str) -> Tuple[bool, dict]:
+        peer_did = _parse_did(line)
+        try:
+            did_doc = resolve_peer_did_dict(peer_did, format)
+        except (PeerDIDError, TypeError, ValueError) as e:
+            return False, {"did": peer_did, "error": str(e)}
+        return True, {"did": peer_did, "didDocument": did_doc}
+
+    return _process_lines(lines, resolve)
+
+
+def _validate_lines(lines: List[str], format: KeyFormat) -> List[Tuple[bool, str]]:
+    def validate(line: str) -> Tuple[bool, dict]:
+        peer_did = _parse_did(line)
+        try:
+            resolve_peer_did_dict(peer_did, format)
+        except (PeerDIDError, TypeError, ValueError) as e:
+            return False, {"did": peer_did, "valid": False, "error": str(e)}
+        return True, {"did": peer_did, "valid": True}
+
+    return _process_lines(lines, validate)
+
+
+def _create_lines(lines: List[str]) -> List[Tuple[bool, str]]:
+    def create(line: str) -> Tuple[bool, dict]:
+        spec = json.loads(line)
+        if not isinstance(spec, dict):
+            raise ValueError("Expected a JSON object")
+        if "inceptionKey" in spec:
+            peer_did = create_peer_did_numalgo_0(
+                BaseKey.from_multibase(spec["inceptionKey"])
+            )
+        else:
+            peer_did = create_peer_did_numalgo_2(
+                [BaseKey.from_multibase(k) for k in spec.get("encryptionKeys", [])],
+                [BaseKey.from_multibase(k) for k in spec.get("signingKeys", [])],
+                spec.get("service"),
+            )
+        return True, {"did": str(peer_did)}
+
+    return _process_lines(lines, create)
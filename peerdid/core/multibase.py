@@ -1,10 +1,31 @@
 """Multibase utility methods."""
 
+from __future__ import annotations
+
 from enum import Enum
-from typing import Tuple
+from typing import TYPE_CHECKING, List, Tuple
 
 import base58
 
+if TYPE_CHECKING:
+    import numpy as np
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Key-sized values (32 byte keys, 34 byte multicodec keys) take the chunked path
+# below; anything larger falls back to the generic base58 package.
+_B58_FAST_MAX_BYTES = 64
+_B58_FAST_MAX_CHARS = 88
+_B58_INVALID = 0xFF
+_B58_DECODE_TABLE = bytes(
+    BASE58_ALPHABET.index(chr(c)) if chr(c) in BASE58_ALPHABET else _B58_INVALID
+    for c in range(256)
+)
+_B58_PAIRS = tuple(a + b for a in BASE58_ALPHABET for b in BASE58_ALPHABET)
+_B58_POW2 = 58**2
+_B58_POW4 = 58**4
+_B58_POW5 = 58**5
+
 
 class MultibaseFormat(Enum):
     """Supported multibase formats."""
@@ -15,6 +36,8 @@ class MultibaseFormat(Enum):
 def from_base58(base58encoded: str) -> bytes:
     """Convert from base58 to bytes."""
     try:
+        if len(base58encoded) <= _B58_FAST_MAX_CHARS:
+            return _b58decode(base58encoded)
         return base58.b58decode(base58encoded)
     except ValueError:
         raise ValueError(
@@ -24,6 +47,8 @@ def from_base58(base58encoded: str) -> bytes:
 
 def to_base58(value: bytes) -> str:
     """Convert a bytes value to base58 encoding."""
+    if len(value) <= _B58_FAST_MAX_BYTES:
+        return _b58encode(value)
     return base58.b58encode(value).decode("utf-8")
 
 
@@ -46,3 +71,100 @@ def to_multibase(value: bytes, format: MultibaseFormat = None) -> str:
     if not format or format == MultibaseFormat.BASE58:
         return MultibaseFormat.BASE58.value + to_base58(value)
     raise ValueError("Unsupported multibase format")
+
+
+def to_base58_rows(rows: np.ndarray, prefix: str = "") -> List[str]:
+    """
+    Convert every row of a 2D uint8 NumPy array to base58 encoding.
+
+    All the rows are encoded at once: each pass divides the whole array, read
+    as one big-endian number per row, by 58^5 with vectorised operations.
+
+    :param rows: array of shape (N, width) and dtype uint8
+    :param prefix: ASCII string prepended to every encoding
+    :raises ImportError: if NumPy is not installed
+    :return: prefix and base58 encoding of each row, the same as
+        `prefix + to_base58(bytes(row))`
+    """
+    import numpy as np
+
+    count, width = rows.shape
+    if not count:
+        return []
+    # 32-bit limbs, so that (remainder << 32) + limb fits in 64 bits
+    nlimbs = (width + 3) // 4
+    padded = np.zeros((count, nlimbs * 4), dtype=np.uint8)
+    padded[:, nlimbs * 4 - width :] = rows
+    limbs = padded.view(">u4").astype(np.uint64).T.copy()
+    # 58^5 < 2^32, so every pass yields five digits
+    npasses = -(-(width * 8 * 1000 // 5857 + 1) // 5)
+    digits = np.empty((count, npasses * 5), dtype=np.uint8)
+    divisor = np.uint64(_B58_POW5)
+    shift = np.uint64(32)
+    start = 0
+    for p in range(npasses):
+        # leading limbs become zero as the quotient shrinks
+        while start < nlimbs and not limbs[start].any():
+            start += 1
+        rem = np.zeros(count, dtype=np.uint64)
+        for limb in limbs[start:]:
+            limb |= rem << shift
+            np.divmod(limb, divisor, out=(limb, rem))
+        for k in range(npasses * 5 - 1 - p * 5, npasses * 5 - 6 - p * 5, -1):
+            digits[:, k] = rem % np.uint64(58)
+            rem //= np.uint64(58)
+    # each leading zero byte is encoded as a "1", the zero digit
+    zeros = np.where(rows.any(axis=1), (rows != 0).argmax(axis=1), width)
+    lead = np.where(digits.any(axis=1), (digits != 0).argmax(axis=1), digits.shape[1])
+    starts = lead - zeros
+    alphabet = np.frombuffer(BASE58_ALPHABET.encode("ascii"), dtype=np.uint8)
+    if starts.min() >= 0 and starts.min() == starts.max():
+        # all the encodings have the same length: slice them out of one string
+        encoded = np.empty(
+            (count, len(prefix) + digits.shape[1] - int(starts[0])), dtype=np.uint8
+        )
+        encoded[:, : len(prefix)] = np.frombuffer(prefix.encode("ascii"), np.uint8)
+        encoded[:, len(prefix) :] = alphabet[digits[:, int(starts[0]) :]]
+        size = encoded.shape[1]
+        text = encoded.tobytes().decode("ascii")
+        return [text[i : i + size] for i in range(0, len(text), size)]
+    size = digits.shape[1]
+    text = alphabet[digits].tobytes().decode("ascii")
+    zeros = zeros.tolist()
+    return [
+        prefix + "1" * zeros[i] + text[i * size : (i + 1) * size].lstrip("1")
+        for i in range(count)
+    ]
+
+
+def _b58encode(value: bytes) -> str:
+    # divide by 58^4 and emit two digits per table lookup, instead of
+    # one bignum divmod per digit
+    n = int.from_bytes(value, "big")
+    digits = []
+    while n:
+        n, rem = divmod(n, _B58_POW4)
+        hi, lo = divmod(rem, _B58_POW2)
+        digits.append(_B58_PAIRS[lo])
+        digits.append(_B58_PAIRS[hi])
+    zeros = len(value) - len(value.lstrip(b"\0"))
+    return "1" * zeros + "".join(reversed(digits)).lstrip("1")
+
+
+def _b58decode(encoded: str) -> bytes:
+    # map characters to digit values in one pass, then fold five digits at a
+    # time with small-int arithmetic before each bignum multiply
+    encoded = encoded.rstrip()
+    digits = encoded.encode("ascii").translate(_B58_DECODE_TABLE)
+    if digits and max(digits) == _B58_INVALID:
+        raise ValueError("Invalid base58 character")
+    size = len(digits)
+    head = size % 5
+    n = 0
+    for d in digits[:head]:
+        n = n * 58 + d
+    for i in range(head, size, 5):
+        d0, d1, d2, d3, d4 = digits[i : i + 5]
+        n = n * _B58_POW5 + (((d0 * 58 + d1) * 58 + d2) * 58 + d3) * 58 + d4
+    zeros = size - len(encoded.lstrip("1"))
+    return b"\0" * zeros + n.to_bytes((n.bit_length() + 7) // 8, "big")
@@ -0,0 +1,72 @@
+"""Process pool helpers."""
+
+import os
+
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most size items.
+
+    :param iterable: items to split
+    :param size: maximum number of items in a chunk
+    :return: iterator over the chunks
+    """
+    if size < 1:
+        raise ValueError("Chunk size must be positive")
+    it = iter(iterable)
+    chunk = list(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(it, size))
+
+
+def map_chunks(
+    fn: Callable[..., List[R]],
+    iterable: Iterable[T],
+    *args,
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+) -> Iterator[R]:
+    """
+    Apply a chunk function in worker processes, yielding the results in input order.
+
+    The input is consumed lazily: at most two chunks per worker are in flight at any
+    time, so memory stays bounded on arbitrarily large inputs.
+
+    :param fn: picklable function taking a list of items and the extra args,
+        returning one result per item
+    :param iterable: items to process
+    :param args: extra positional arguments passed to fn with every chunk
+    :param workers: number of worker processes, None for the CPU count.
+        With a single worker the chunks are processed in the calling process.
+    :param chunksize: number of items sent to a worker at once
+    :return: iterator over the results
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Number of workers must be positive")
+    chunks = chunked(iterable, chunksize)
+    if workers == 1:
+        for chunk in chunks:
+            yield from fn(chunk, *args)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(fn, chunk, *args) for chunk in islice(chunks, workers * 2)
+        )
+        while pending:
+            results = pending.popleft().result()
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(fn, chunk, *args))
+            yield from results
@@ -1,16 +1,24 @@
 """Peer DID helper methods."""
 
+from __future__ import annotations
+
 import json
+import pickle
 
 from enum import Enum
-from typing import List, Optional, Union
-
-from pydid import Service
+from typing import TYPE_CHECKING, List, Optional, Union
 
-from ..core.utils import urlsafe_b64encode, urlsafe_b64decode
+from ..cache import get_segment_cache
+from ..core.utils import lazy_import, urlsafe_b64encode, urlsafe_b64decode
 from ..errors import MalformedPeerDIDError
+from ..instrumentation import Phase, timed
 from ..keys import KeyFormat, BaseKey
 
+if TYPE_CHECKING:
+    from pydid import Service
+
+__getattr__ = lazy_import(__name__, {"Service": "pydid"})
+
 SERVICE_ID = "id"
 SERVICE_TYPE = "type"
 SERVICE_ENDPOINT = "serviceEndpoint"
@@ -18,6 +26,8 @@ SERVICE_DIDCOMM_MESSAGING = "DIDCommMessaging"
 SERVICE_ROUTING_KEYS = "routingKeys"
 SERVICE_ACCEPT = "accept"
 
+_SERVICE_FIELD_NAMES = {"id", "type", "service_endpoint"}
+
 ServiceJson = Union[str, dict, list]
 
 
@@ -73,6 +83,8 @@ def encode_service(service: ServiceJson) -> str:
 
 
 def _encode_service_entry(service: dict) -> dict:
+    if not isinstance(service, dict):
+        raise ValueError("Service is not valid JSON")
     result = {}
     for k, v in service.items():
         if k == SERVICE_TYPE:
@@ -98,16 +110,41 @@ def decode_service(service: str) -> Optional[List[Service]]:
     Reference: https://identity.foundation/peer-did-method-spec/index.html#example-2-abnf-for-peer-dids
 
     :param service: service to decode
-    :param peer_did: peer_did which will be used as an ID
-    :raises ValueError: if peer_did parameter is not valid
-    :return: decoded service (list of dict)
+    :raises MalformedPeerDIDError: if service is not valid
+    :return: decoded services, memoized if a segment cache is installed
     """
     if not service:
         return None
+    cache = get_segment_cache()
+    if cache is not None:
+        blob = cache.get(service, None)
+        if blob is not None:
+            return pickle.loads(blob)
+    entries = timed(Phase.SERVICE_DECODE, decode_service_entries, service)
+    services = [timed(Phase.SERVICE_MODEL, make_service, entry) for entry in entries]
+    if cache is not None:
+        cache.put(
+            service, None, pickle.dumps(services, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+    return services
+
+
+def decode_service_entries(service: str) -> List[dict]:
+    """
+    Decode service according to Peer DID spec into Service keyword arguments.
+
+    Reference: https://identity.foundation/peer-did-method-spec/index.html#example-2-abnf-for-peer-dids
+
+    :param service: service to decode
+    :raises MalformedPeerDIDError: if service is not valid
+    :return: list of Service.make keyword arguments, one per service entry
+    """
+    if not service:
+        return []
     try:
         decoded_service = urlsafe_b64decode(service.encode())
         list_of_service_dict = json.loads(decoded_service.decode("utf-8"))
-    except (ValueError, json.JSONDecodeError) as e:
+    except (ValueError, RecursionError) as e:
         raise MalformedPeerDIDError("Invalid service") from e
 
     if not isinstance(list_of_service_dict, list):
@@ -117,28 +154,80 @@ def decode_service(service: str) -> Optional[List[Service]]:
     for i, svc_def in enumerate(list_of_service_dict):
         if not isinstance(svc_def, dict):
             raise MalformedPeerDIDError("Service entry is not an object")
-        service_type = svc_def.pop(ServicePrefix.SERVICE_TYPE.value, "").replace(
+        service_type = svc_def.pop(ServicePrefix.SERVICE_TYPE.value, "")
+        if not isinstance(service_type, str):
+            raise MalformedPeerDIDError("Service type is not a string")
+        service_type = service_type.replace(
             ServicePrefix.SERVICE_DIDCOMM_MESSAGING.value, SERVICE_DIDCOMM_MESSAGING
         )
         if not service_type:
             raise MalformedPeerDIDError("Service doesn't contain a type")
         ident = "#" + service_type.lower() + "-" + str(i)
         endpoint = svc_def.pop(ServicePrefix.SERVICE_ENDPOINT.value, None)
-        extra = {}
+        if not _is_service_endpoint(endpoint):
+            raise MalformedPeerDIDError("Invalid service endpoint")
+        entry = {"id": ident, "type": service_type, "service_endpoint": endpoint}
         for k, v in svc_def.items():
             if k == ServicePrefix.SERVICE_ACCEPT.value:
                 k = SERVICE_ACCEPT
             elif k == ServicePrefix.SERVICE_ROUTING_KEYS.value:
                 k = SERVICE_ROUTING_KEYS
-            extra[k] = v
-        service = Service.make(
-            id=ident, type=service_type, service_endpoint=endpoint, **extra
-        )
-        result.append(service)
+            elif k == SERVICE_ENDPOINT:
+                # the short form endpoint takes precedence, as it always has
+                continue
+            elif k in _SERVICE_FIELD_NAMES:
+                raise MalformedPeerDIDError("Unexpected service key: {}".format(k))
+            entry[k] = v
+        result.append(entry)
 
     return result
 
 
+def make_service(entry: dict) -> Service:
+    """
+    Build a Service from a decoded service entry.
+
+    :param entry: Service keyword arguments returned by `decode_service_entries`
+    :raises MalformedPeerDIDError: if the entry is not a valid service
+    :return: the service
+    """
+    from pydid import Service
+
+    try:
+        return Service.make(**entry)
+    except ValueError as e:
+        raise MalformedPeerDIDError("Invalid service") from e
+
+
+def serialize_service_entry(entry: dict) -> dict:
+    """
+    Serialize a decoded service entry exactly as `Service.serialize` would.
+
+    :param entry: Service keyword arguments returned by `decode_service_entries`
+    :return: serialized service
+    """
+    result = {
+        SERVICE_ID: entry["id"],
+        SERVICE_TYPE: entry["type"],
+        SERVICE_ENDPOINT: entry["service_endpoint"],
+    }
+    # pydantic collects extra fields through a set difference, so their serialized
+    # order follows set iteration order: build the same set to match it
+    for k in entry.keys() - _SERVICE_FIELD_NAMES:
+        v = entry[k]
+        if v is not None:
+            result[k] = v
+    return result
+
+
+def _is_service_endpoint(endpoint) -> bool:
+    if isinstance(endpoint, (str, dict)):
+        return True
+    if isinstance(endpoint, list):
+        return all(isinstance(e, (str, dict)) for e in endpoint)
+    return False
+
+
 def decode_multibase_numbasis(
     multibase: str,
     key_format: KeyFormat,
@@ -150,7 +239,15 @@ def decode_multibase_numbasis(
     :param key_format: the format of public keys in the DID Document
     :return: decoded numeric basis as verification method for DID Document
     """
+    cache = get_segment_cache()
+    if cache is not None:
+        key = cache.get(multibase, key_format)
+        if key is not None:
+            return key
     try:
-        return BaseKey.from_multibase(multibase, format=key_format)
+        key = BaseKey.from_multibase(multibase, format=key_format)
     except (ValueError, TypeError) as e:
         raise MalformedPeerDIDError("Invalid key: {}".format(multibase)) from e
+    if cache is not None:
+        cache.put(multibase, key_format, key)
+    return key
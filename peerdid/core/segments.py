@@ -0,0 +1,652 @@
+"""Peer DID tokenizing, key decoding and DID Document construction.
+
+These helpers are shared by the resolvers of `peerdid.dids`, the lazy and indexed
+documents, the delivery planner and the SQLite cache.
+"""
+
+from __future__ import annotations
+
+import re
+
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple, Type, Union
+
+import varint
+
+from ..cache import get_segment_cache
+from ..errors import (
+    MalformedPeerDIDError,
+    PeerDIDErrorCode,
+    ResolutionFailure,
+)
+from ..instrumentation import Phase, timed
+from ..keys import BaseKey, KeyFormat, KeyRelationshipType
+from .multibase import from_base58
+from .multicodec import Codec
+from .peer_did_helper import (
+    Numalgo2Prefix,
+    decode_service,
+    make_service,
+    serialize_service_entry,
+)
+
+if TYPE_CHECKING:
+    from pydid import (
+        DID,
+        DIDDocument,
+        DIDDocumentBuilder,
+        DIDUrl,
+        Service,
+        VerificationMethod,
+    )
+
+    from ..policy import ResolverPolicy
+
+DID_CONTEXT = "https://www.w3.org/ns/did/v1"
+
+_BASE58_RUN = re.compile(r"[1-9a-km-zA-HJ-NP-Z]+")
+_NUMALGO_2_KEY_SEGMENT = re.compile(r"[AEVID]z[1-9a-km-zA-HJ-NP-Z]+")
+_NUMALGO_2_SERVICE_SEGMENT = re.compile(r"S[0-9a-zA-Z]*")
+
+KEY_PURPOSES = {
+    Numalgo2Prefix.AUTHENTICATION.value: KeyRelationshipType.AUTHENTICATION,
+    Numalgo2Prefix.KEY_AGREEMENT.value: KeyRelationshipType.KEY_AGREEMENT,
+}
+CODEC_PREFIXES = {codec.encode_multicodec(b""): codec for codec in Codec}
+_CODECS = {codec.value: codec for codec in Codec}
+# base58 takes less than two characters per byte: longer values can not be keys
+_MAX_KEY_CHARS = 2 * max(
+    len(prefix) + BaseKey.for_codec(codec).key_length
+    for prefix, codec in CODEC_PREFIXES.items()
+)
+# serialized public key members and the VerificationMethod fields holding them
+_PUBLIC_KEY_FIELDS = {
+    "publicKeyBase58": "public_key_base58",
+    "publicKeyMultibase": "public_key_multibase",
+    "publicKeyJwk": "public_key_jwk",
+}
+# verification method types of the DID Documents resolved from Peer DIDs
+_METHOD_TYPES = frozenset(
+    ["JsonWebKey2020"]
+    + [BaseKey.for_codec(codec).base58_method_type for codec in Codec]
+    + [BaseKey.for_codec(codec).multibase_method_type for codec in Codec]
+)
+
+PeerDIDSegment = NamedTuple(
+    "PeerDIDSegment",
+    [
+        ("prefix", str),
+        ("start", int),
+        ("end", int),
+    ],
+)
+
+
+def split_peer_did(peer_did: Union[str, DID]) -> Optional[List[str]]:
+    """
+    Validate a Peer DID against the spec grammar and split it into raw segments.
+
+    This accepts the same strings as `peerdid.dids.PEER_DID_PATTERN` (except for a
+    trailing newline).
+    The DID is split once on "." and every segment is checked against a single
+    character class, so the cost is linear in the DID length whatever the input.
+
+    :param peer_did: peer_did to split
+    :return: the multibase inception key for numalgo 0, the prefixed key and service
+        segments for numalgo 2, or None if peer_did does not match the spec
+    """
+    if not isinstance(peer_did, str) or not peer_did.startswith("did:peer:"):
+        return None
+    numalgo = peer_did[9:11]
+    if numalgo == "0z":
+        if _BASE58_RUN.fullmatch(peer_did, 11) is None:
+            return None
+        return [peer_did[10:]]
+    if numalgo != "2.":
+        return None
+    parts = peer_did[11:].split(".")
+    last = parts.pop()
+    # the service can only follow at least one key, at the end of the DID
+    if not all(map(_NUMALGO_2_KEY_SEGMENT.fullmatch, parts)) or not (
+        _NUMALGO_2_KEY_SEGMENT.fullmatch(last)
+        or (parts and _NUMALGO_2_SERVICE_SEGMENT.fullmatch(last))
+    ):
+        return None
+    parts.append(last)
+    return parts
+
+
+def tokenize_peer_did(peer_did: Union[str, DID]) -> Optional[List[PeerDIDSegment]]:
+    """
+    Validate a Peer DID and split it into typed segments.
+
+    :param peer_did: peer_did to tokenize
+    :return: segments holding the numalgo 2 purpose prefix (empty for numalgo 0) and the
+        offsets of the encoded value, or None if peer_did does not match the spec
+    """
+    parts = split_peer_did(peer_did)
+    if parts is None:
+        return None
+    if peer_did[9] == "0":
+        return [PeerDIDSegment("", 10, len(peer_did))]
+    segments = []
+    pos = 11
+    for part in parts:
+        end = pos + len(part)
+        segments.append(PeerDIDSegment(part[0], pos + 1, end))
+        pos = end + 1
+    return segments
+
+
+def grammar_failure(peer_did: Union[str, DID]) -> ResolutionFailure:
+    """
+    Describe why a Peer DID does not match the spec grammar.
+
+    :param peer_did: peer_did rejected by `tokenize_peer_did`
+    :return: the failure with the first segment breaking the grammar
+    """
+    # only called on failure: locate the first numalgo 2 segment breaking the grammar
+    segment = None
+    offset = 0
+    if isinstance(peer_did, str) and peer_did.startswith("did:peer:2."):
+        parts = peer_did[11:].split(".")
+        pos = 11
+        for index, part in enumerate(parts):
+            if not (
+                _NUMALGO_2_KEY_SEGMENT.fullmatch(part)
+                or (
+                    0 < index == len(parts) - 1
+                    and _NUMALGO_2_SERVICE_SEGMENT.fullmatch(part)
+                )
+            ):
+                segment, offset = index, pos + 1
+                break
+            pos += len(part) + 1
+    elif isinstance(peer_did, str) and peer_did.startswith("did:peer:0"):
+        segment, offset = 0, 10
+    return ResolutionFailure(
+        peer_did, PeerDIDErrorCode.MALFORMED, segment, offset, None
+    )
+
+
+def validate_peer_did(
+    peer_did: Union[str, DID], policy: Optional[ResolverPolicy]
+) -> Union[List[PeerDIDSegment], ResolutionFailure]:
+    """
+    Tokenize a Peer DID and check it against the policy, without raising errors.
+
+    :param peer_did: Peer DID to validate
+    :param policy: optional size limits to enforce
+    :return: the segments of the Peer DID, or the reason for it to be rejected
+    """
+    segments = timed(Phase.VALIDATE, tokenize_peer_did, peer_did)
+    if segments is None:
+        return grammar_failure(peer_did)
+    if policy is not None:
+        return policy.check_segments(peer_did, segments) or segments
+    return segments
+
+
+def checked_segments(
+    peer_did: Union[str, DID], policy: Optional[ResolverPolicy] = None
+) -> List[PeerDIDSegment]:
+    """
+    Tokenize a Peer DID and check it against the policy.
+
+    :param peer_did: Peer DID to validate
+    :param policy: optional size limits to enforce, including the length limit
+    :raises MalformedPeerDIDError: if peer_did does not match the spec or exceeds
+        a policy limit
+    :return: the segments of the Peer DID
+    """
+    segments = (policy and policy.check_length(peer_did)) or validate_peer_did(
+        peer_did, policy
+    )
+    if isinstance(segments, ResolutionFailure):
+        raise segments.to_error()
+    return segments
+
+
+def load_segment_keys(
+    peer_did: Union[str, DID], segments: List[PeerDIDSegment], format: KeyFormat
+) -> Union[List[BaseKey], ResolutionFailure]:
+    """
+    Decode the keys of a tokenized Peer DID, without raising errors.
+
+    Every key is checked for a supported codec, the key length of that codec and
+    a purpose supported by the key type. Decoded keys are looked up in and stored
+    to the segment cache, if one is set.
+
+    :param peer_did: Peer DID the segments come from
+    :param segments: segments returned by `tokenize_peer_did`
+    :param format: the format of the keys in the DID Document
+    :return: the keys in segment order, or the reason for a key to be rejected
+    """
+    cache = get_segment_cache()
+    keys = []
+    for index, segment in enumerate(segments):
+        prefix = segment.prefix
+        if prefix == Numalgo2Prefix.SERVICE.value:
+            continue
+        if prefix and prefix not in KEY_PURPOSES:
+            return ResolutionFailure(
+                peer_did, PeerDIDErrorCode.UNKNOWN_PREFIX, index, segment.start, None
+            )
+        multibase = peer_did[segment.start : segment.end]
+        key = cache.get(multibase, format) if cache is not None else None
+        if key is None:
+            decoded = decode_key(multibase)
+            if isinstance(decoded, PeerDIDErrorCode):
+                return ResolutionFailure(peer_did, decoded, index, segment.start, None)
+            key_cls, public_key = decoded
+            # the same key as BaseKey.from_multibase
+            key = key_cls(public_key, ident="#" + multibase[1:9], format=format)
+            if cache is not None:
+                cache.put(multibase, format, key)
+        relationship = KEY_PURPOSES.get(prefix)
+        if relationship is not None and relationship not in key.relationships:
+            return ResolutionFailure(
+                peer_did,
+                PeerDIDErrorCode.UNSUPPORTED_PURPOSE,
+                index,
+                segment.start,
+                None,
+            )
+        keys.append(key)
+    return keys
+
+
+def segment_keys(
+    peer_did: Union[str, DID], segments: List[PeerDIDSegment], format: KeyFormat
+) -> List[BaseKey]:
+    """
+    Decode the keys of a tokenized Peer DID.
+
+    :param peer_did: Peer DID the segments come from
+    :param segments: segments returned by `tokenize_peer_did`
+    :param format: the format of the keys in the DID Document
+    :raises MalformedPeerDIDError: if a key can not be decoded or used for its purpose
+    :return: the keys in segment order
+    """
+    keys = load_segment_keys(peer_did, segments, format)
+    if isinstance(keys, ResolutionFailure):
+        raise keys.to_error()
+    return keys
+
+
+def decode_key(multibase: str) -> Union[Tuple[Type[BaseKey], bytes], PeerDIDErrorCode]:
+    """
+    Decode a multibase key segment, without raising errors.
+
+    :param multibase: base58 multibase value of the key
+    :return: the key class and the public key, or the reason for the value not
+        to be a key
+    """
+    if len(multibase) > _MAX_KEY_CHARS:
+        return PeerDIDErrorCode.INVALID_KEY_LENGTH
+    # the grammar guarantees a base58 multibase value, which always decodes
+    value = timed(Phase.MULTIBASE_DECODE, from_base58, multibase[1:])
+    codec = timed(Phase.MULTICODEC_DECODE, decode_codec, value)
+    if codec is None:
+        return PeerDIDErrorCode.INVALID_MULTICODEC
+    key_cls = BaseKey.for_codec(codec)
+    # like from_multicodec, strip the canonical prefix whatever was decoded
+    public_key = value[len(varint.encode(codec.value)) :]
+    if len(public_key) != key_cls.key_length:
+        return PeerDIDErrorCode.INVALID_KEY_LENGTH
+    return key_cls, public_key
+
+
+def decode_codec(value: bytes) -> Optional[Codec]:
+    """
+    Read the multicodec prefix of a decoded key.
+
+    :param value: multicodec-encoded key
+    :return: the codec, or None if the prefix is not a supported codec
+    """
+    codec = CODEC_PREFIXES.get(value[:2])
+    if codec is not None:
+        return codec
+    # the varint decoding of from_multicodec, returning None instead of raising
+    number = 0
+    for i, byte in enumerate(value):
+        number |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return _CODECS.get(number)
+    return None
+
+
+def decode_services(
+    peer_did: Union[str, DID], segments: List[PeerDIDSegment]
+) -> List[Service]:
+    """
+    Decode the services of a tokenized Peer DID.
+
+    :param peer_did: Peer DID the segments come from
+    :param segments: segments returned by `tokenize_peer_did`
+    :raises MalformedPeerDIDError: if the service is malformed
+    :return: the services, shared with the segment cache if one is set
+    """
+    services = []
+    for segment in segments:
+        if segment.prefix == Numalgo2Prefix.SERVICE.value:
+            services.extend(decode_service(peer_did[segment.start : segment.end]) or ())
+    return services
+
+
+def build_did_doc(
+    peer_did: Union[str, DID],
+    keys: List[BaseKey],
+    segments: List[PeerDIDSegment],
+    trusted: bool = False,
+) -> DIDDocument:
+    """
+    Build the DID Document of a Peer DID from its decoded keys.
+
+    :param peer_did: Peer DID to build the DID Document of
+    :param keys: keys returned by `segment_keys`
+    :param segments: segments returned by `tokenize_peer_did`
+    :param trusted: construct the pydid models without validating them
+    :raises MalformedPeerDIDError: if the service is malformed
+    :return: the DID Document
+    """
+    services = decode_services(peer_did, segments)
+    return assemble_did_doc(peer_did, keys, services, trusted)
+
+
+def assemble_did_doc(
+    peer_did: Union[str, DID],
+    keys: List[BaseKey],
+    services: List[Service],
+    trusted: bool = False,
+    format: Optional[KeyFormat] = None,
+) -> DIDDocument:
+    """
+    Build a DID Document from decoded keys and services.
+
+    :param peer_did: Peer DID to build the DID Document of
+    :param keys: keys returned by `segment_keys`
+    :param services: services returned by `decode_services`
+    :param trusted: construct the pydid models without validating them
+    :param format: the format of the keys, None for the format of each key
+    :return: the DID Document
+    """
+    if trusted:
+        return construct_did_doc(peer_did, keys, services, format)
+    builder = did_document_builder(peer_did)
+    for key in keys:
+        timed(Phase.VERIFICATION_METHOD, add_key_to_document, builder, key, format)
+    builder.service.services.extend(services)
+    return timed(Phase.BUILD, builder.build)
+
+
+def did_document_builder(peer_did: Union[str, DID]) -> DIDDocumentBuilder:
+    """
+    Start a pydid DID Document builder for a Peer DID.
+
+    :param peer_did: Peer DID to build the DID Document of
+    :raises MalformedPeerDIDError: if pydid does not accept peer_did as a DID
+    :return: the builder
+    """
+    from pydid import DIDDocumentBuilder, InvalidDIDError
+
+    try:
+        return DIDDocumentBuilder(peer_did)
+    except InvalidDIDError as e:
+        raise MalformedPeerDIDError("Invalid peer DID") from e
+
+
+def add_key_to_document(
+    builder: DIDDocumentBuilder, key: BaseKey, format: Optional[KeyFormat] = None
+):
+    """
+    Add the verification method and the relationships of a key to a builder.
+
+    :param builder: builder returned by `did_document_builder`
+    :param key: key to add
+    :param format: the format of the key, None for the format of the key
+    """
+    from pydid import DIDUrl
+
+    ver_method_result = key.verification_method(builder.id, format)
+    builder.verification_method.methods.append(ver_method_result.method)
+    ver_ident = DIDUrl.parse(ver_method_result.method.id)
+    if ver_method_result.context and ver_method_result.context not in builder.context:
+        builder.context.append(ver_method_result.context)
+    for rel in key.relationships:
+        if rel == KeyRelationshipType.AUTHENTICATION:
+            builder.authentication.reference(ver_ident)
+            builder.assertion_method.reference(ver_ident)
+            builder.capability_delegation.reference(ver_ident)
+            builder.capability_invocation.reference(ver_ident)
+        elif rel == KeyRelationshipType.KEY_AGREEMENT:
+            builder.key_agreement.reference(ver_ident)
+
+
+def construct_did_doc(
+    peer_did: Union[str, DID],
+    keys: List[BaseKey],
+    services: List[Service],
+    format: Optional[KeyFormat] = None,
+) -> DIDDocument:
+    """
+    Construct a DID Document from decoded keys and services without validation.
+
+    :param peer_did: Peer DID matching the spec grammar
+    :param keys: keys returned by `segment_keys`
+    :param services: services returned by `decode_services`
+    :param format: the format of the keys, None for the format of each key
+    :return: a DID Document equal to the one built by `assemble_did_doc`
+    """
+    from pydid import DIDDocument
+
+    did = construct_did(peer_did)
+    context = [DID_CONTEXT]
+    methods = []
+    authentication = []
+    key_agreement = []
+    for key in keys:
+        method_context, method = timed(
+            Phase.VERIFICATION_METHOD, construct_verification_method, key, did, format
+        )
+        methods.append(method)
+        if method_context and method_context not in context:
+            context.append(method_context)
+        for rel in key.relationships:
+            if rel == KeyRelationshipType.AUTHENTICATION:
+                authentication.append(method.id)
+            elif rel == KeyRelationshipType.KEY_AGREEMENT:
+                key_agreement.append(method.id)
+    return timed(
+        Phase.BUILD,
+        DIDDocument.construct,
+        id=did,
+        context=context,
+        also_known_as=None,
+        controller=None,
+        verification_method=methods or None,
+        authentication=authentication or None,
+        assertion_method=list(authentication) or None,
+        key_agreement=key_agreement or None,
+        capability_invocation=list(authentication) or None,
+        capability_delegation=list(authentication) or None,
+        service=services or None,
+    )
+
+
+def construct_verification_method(
+    key: BaseKey, did: DID, format: Optional[KeyFormat] = None
+) -> Tuple[Optional[str], VerificationMethod]:
+    """
+    Construct the verification method of a key without validation.
+
+    :param key: key of the method
+    :param did: controller of the method
+    :param format: the format of the key, None for the format of the key
+    :return: the JSON-LD context the method needs, if any, and the method
+    """
+    from pydid import verification_method
+
+    context, method = key.serialize_verification_method(did, format)
+    method_cls = getattr(verification_method, method["type"])
+    material = {
+        field: method[name]
+        for name, field in _PUBLIC_KEY_FIELDS.items()
+        if name in method
+    }
+    return context, method_cls.construct(
+        id=construct_did_url(method["id"]),
+        type=method["type"],
+        controller=did,
+        **material,
+    )
+
+
+def construct_did(peer_did: Union[str, DID]) -> DID:
+    """
+    Construct a pydid DID from a Peer DID matching the spec grammar, without validation.
+
+    :param peer_did: Peer DID matching the spec grammar
+    :return: the DID
+    """
+    from pydid import DID
+
+    if isinstance(peer_did, DID):
+        return peer_did
+    # the attributes DID.__init__ sets once the DID matches its pattern
+    did = str.__new__(DID, peer_did)
+    did._method = "peer"
+    did._id = peer_did[len("did:peer:") :]
+    return did
+
+
+def construct_did_url(ident: str) -> DIDUrl:
+    """
+    Construct a pydid DID URL, without validation for a relative fragment.
+
+    :param ident: DID URL or fragment starting with "#"
+    :return: the DID URL
+    """
+    from pydid import DIDUrl
+
+    if not ident.startswith("#"):
+        return DIDUrl.parse(ident)
+    # the attributes DIDUrl.__init__ sets for a relative fragment
+    url = str.__new__(DIDUrl, ident)
+    url.did = None
+    url.path = None
+    url.query = None
+    url.fragment = ident[1:] or None
+    return url
+
+
+def construct_did_doc_from_dict(did_doc: dict) -> DIDDocument:
+    """
+    Rebuild a serialized DID Document resolved from a Peer DID.
+
+    The members are checked to have the shape `build_did_doc_dict` gives them,
+    and the models are constructed without validation.
+
+    :param did_doc: serialized DID Document
+    :raises ValueError: if did_doc is not shaped like a Peer DID Document
+    :return: the DID Document
+    """
+    from pydid import DIDDocument, verification_method
+
+    peer_did = did_doc["id"]
+    if split_peer_did(peer_did) is None:
+        raise ValueError("Not a Peer DID Document")
+    did = construct_did(peer_did)
+    context = did_doc["@context"]
+    if not all(isinstance(value, str) for value in context):
+        raise ValueError("Unexpected DID Document context")
+    methods = []
+    for method in did_doc.get("verificationMethod", ()):
+        method_type = method["type"]
+        if method_type not in _METHOD_TYPES or method["controller"] != peer_did:
+            raise ValueError("Unexpected verification method")
+        material = {
+            field: method[name]
+            for name, field in _PUBLIC_KEY_FIELDS.items()
+            if name in method
+        }
+        methods.append(
+            getattr(verification_method, method_type).construct(
+                id=_relative_did_url(method["id"]),
+                type=method_type,
+                controller=did,
+                **material,
+            )
+        )
+    references = {}
+    for member, name in (
+        ("authentication", "authentication"),
+        ("assertion_method", "assertionMethod"),
+        ("key_agreement", "keyAgreement"),
+        ("capability_invocation", "capabilityInvocation"),
+        ("capability_delegation", "capabilityDelegation"),
+    ):
+        references[member] = [
+            _relative_did_url(ref) for ref in did_doc.get(name, ())
+        ] or None
+    services = [make_service(entry) for entry in did_doc.get("service", ())]
+    return DIDDocument.construct(
+        id=did,
+        context=list(context),
+        also_known_as=None,
+        controller=None,
+        verification_method=methods or None,
+        service=services or None,
+        **references,
+    )
+
+
+def _relative_did_url(ident: str) -> DIDUrl:
+    # the keys of a Peer DID Document are identified by their fragment only
+    if not isinstance(ident, str) or not ident.startswith("#"):
+        raise ValueError("Unexpected key identifier: {}".format(ident))
+    return construct_did_url(ident)
+
+
+def build_did_doc_dict(
+    peer_did: Union[str, DID], keys: List[BaseKey], services: List[dict]
+) -> dict:
+    """
+    Build a serialized DID Document from decoded keys and service entries.
+
+    :param peer_did: Peer DID to build the DID Document of
+    :param keys: keys returned by `segment_keys`
+    :param services: service entries returned by `decode_service_entries`
+    :return: the same dict as `DIDDocument.serialize` of the built DID Document
+    """
+    context = [DID_CONTEXT]
+    methods = []
+    authentication = []
+    key_agreement = []
+    for key in keys:
+        method_context, method = timed(
+            Phase.VERIFICATION_METHOD, key.serialize_verification_method, peer_did
+        )
+        methods.append(method)
+        if method_context and method_context not in context:
+            context.append(method_context)
+        for rel in key.relationships:
+            if rel == KeyRelationshipType.AUTHENTICATION:
+                authentication.append(method["id"])
+            elif rel == KeyRelationshipType.KEY_AGREEMENT:
+                key_agreement.append(method["id"])
+
+    # same member order and omission of empty members as DIDDocument.serialize
+    did_doc = {"@context": context, "id": str(peer_did)}
+    if methods:
+        did_doc["verificationMethod"] = methods
+    if authentication:
+        did_doc["authentication"] = authentication
+        did_doc["assertionMethod"] = list(authentication)
+    if key_agreement:
+        did_doc["keyAgreement"] = key_agreement
+    if authentication:
+        did_doc["capabilityInvocation"] = list(authentication)
+        did_doc["capabilityDelegation"] = list(authentication)
+    if services:
+        did_doc["service"] = [serialize_service_entry(entry) for entry in services]
+    return did_doc
@@ -1,8 +1,9 @@
 """Utility methods."""
 
 import base64
+import importlib
 
-from typing import Union
+from typing import Any, Callable, Mapping, Union
 
 
 def urlsafe_b64encode(s: Union[str, bytes]) -> bytes:
@@ -34,3 +35,23 @@ def urlsafe_b64decode(s: Union[str, bytes]) -> bytes:
         return base64.urlsafe_b64decode(s)
     except Exception as e:
         raise ValueError("Can not decode base64 URL safe: " + str(s)) from e
+
+
+def lazy_import(module_name: str, names: Mapping[str, str]) -> Callable[[str], Any]:
+    """
+    Build a module `__getattr__` importing attributes from other modules on first use.
+
+    :param module_name: name of the module the `__getattr__` is defined in
+    :param names: attribute names mapped to the names of the modules providing them
+    :return: module `__getattr__` function
+    """
+
+    def __getattr__(name: str) -> Any:
+        source = names.get(name)
+        if source is None:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(module_name, name)
+            )
+        return getattr(importlib.import_module(source), name)
+
+    return __getattr__
@@ -1,26 +1,108 @@
 """Peer DID document generation and resolution."""
 
-import re
+from __future__ import annotations
 
-from typing import Optional, Sequence, Union
+import json
+import re
 
-from pydid import DID, DIDDocument, DIDDocumentBuilder, DIDUrl, InvalidDIDError
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+from .cache import CacheBackend
+from .core.multibase import MultibaseFormat, to_base58_rows, to_multibase
+from .core.multicodec import from_multicodec
+from .core.parallel import map_chunks
 from .core.peer_did_helper import (
     Numalgo2Prefix,
     ServiceJson,
+    decode_service_entries,
     encode_service,
-    decode_multibase_numbasis,
-    decode_service,
 )
-from .errors import MalformedPeerDIDError
-from .keys import KeyFormat, KeyRelationshipType, BaseKey
+from .core.segments import (
+    CODEC_PREFIXES,
+    KEY_PURPOSES,
+    assemble_did_doc,
+    build_did_doc,
+    build_did_doc_dict,
+    checked_segments,
+    construct_did_doc,
+    decode_services,
+    load_segment_keys,
+    segment_keys,
+    tokenize_peer_did,
+    validate_peer_did,
+)
+from .core.utils import lazy_import
+from .errors import (
+    MalformedPeerDIDError,
+    PeerDIDError,
+    PeerDIDErrorCode,
+    ResolutionFailure,
+)
+from .instrumentation import Phase, timed
+from .keys import BaseKey, Ed25519VerificationKey, KeyFormat, KeyRelationshipType
+from .policy import ResolverPolicy
+
+# part of this module's API, defined with the helpers shared by the resolvers
+from .core.segments import DID_CONTEXT, PeerDIDSegment  # noqa: F401
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    import numpy as np
+    from pydid import DID, DIDDocument
+
+# pydid is only loaded once a DID Document is built
+__getattr__ = lazy_import(
+    __name__,
+    {
+        name: "pydid"
+        for name in (
+            "DID",
+            "DIDDocument",
+            "DIDDocumentBuilder",
+            "DIDUrl",
+            "InvalidDIDError",
+        )
+    },
+)
 
 PEER_DID_PATTERN = re.compile(
     r"^did:peer:(([0](z)([1-9a-km-zA-HJ-NP-Z]+))|(2((\.[AEVID](z)([1-9a-km-zA-HJ-NP-Z]+))+"
     r"(\.(S)[0-9a-zA-Z]*)?)))$"
 )
 
+# PEER_DID_PATTERN without anchors, for fullmatch: "$" also matches before a
+# trailing newline
+_PEER_DID_GRAMMAR = re.compile(PEER_DID_PATTERN.pattern[1:-1])
+
+ValidationResult = NamedTuple(
+    "ValidationResult",
+    [
+        ("valid", bytearray),
+        ("reasons", Optional[bytearray]),
+    ],
+)
+
+_MULTICODEC_PREFIXES = {codec: prefix for prefix, codec in CODEC_PREFIXES.items()}
+# key classes by the two byte multicodec prefix of their raw keys
+_RAW_KEY_CLASSES = {
+    prefix: BaseKey.for_codec(codec) for prefix, codec in CODEC_PREFIXES.items()
+}
+# distinct service segments remembered by validate_peer_dids
+_MAX_CHECKED_SERVICES = 4096
+
 
 def is_peer_did(peer_did: Union[str, DID]) -> bool:
     """
@@ -31,9 +113,74 @@ def is_peer_did(peer_did: Union[str, DID]) -> bool:
     :param peer_did: peer_did to check
     :return: True if peer_did matches spec, otherwise False
     """
-    if peer_did is None:
-        return False
-    return bool(PEER_DID_PATTERN.match(peer_did))
+    # the pattern is linear: "." is not a base58 character, so it never
+    # backtracks across segments
+    return (
+        isinstance(peer_did, str) and _PEER_DID_GRAMMAR.fullmatch(peer_did) is not None
+    )
+
+
+def validate_peer_dids(
+    peer_dids: Iterable[Union[str, DID]],
+    deep: bool = False,
+    reasons: bool = False,
+) -> ValidationResult:
+    """
+    Validate a batch of Peer DIDs without raising errors.
+
+    Every Peer DID is checked against the spec grammar, like `is_peer_did`. With deep
+    checks, its keys are also decoded and checked for a supported codec, the key length
+    of that codec and a purpose supported by the key type, and its service is checked
+    to be well-formed service JSON. A Peer DID passing the deep checks can be resolved
+    with `resolve_peer_did_dict`. Each distinct service segment is decoded once.
+
+    :param peer_dids: Peer DIDs to validate
+    :param deep: decode the keys and services, not only check the grammar
+    :param reasons: also return a PeerDIDErrorCode for every Peer DID
+    :return: a mask with 1 for every valid Peer DID and 0 otherwise, in input order
+        (use `numpy.frombuffer(result.valid, dtype=bool)` for a NumPy array), and
+        the reason codes if requested
+    """
+    valid = bytearray()
+    codes = bytearray() if reasons else None
+    services: Dict[str, PeerDIDErrorCode] = {}
+    for peer_did in peer_dids:
+        code = _check_peer_did(peer_did, deep, services)
+        valid.append(code == PeerDIDErrorCode.VALID)
+        if codes is not None:
+            codes.append(code)
+    return ValidationResult(valid, codes)
+
+
+def _check_peer_did(
+    peer_did: Union[str, DID], deep: bool, services: Dict[str, PeerDIDErrorCode]
+) -> PeerDIDErrorCode:
+    segments = tokenize_peer_did(peer_did)
+    if segments is None:
+        return PeerDIDErrorCode.MALFORMED
+    if not deep:
+        return PeerDIDErrorCode.VALID
+    keys = load_segment_keys(peer_did, segments, KeyFormat.MULTIBASE)
+    if isinstance(keys, ResolutionFailure):
+        return keys.code
+    segment = segments[-1]
+    if segment.prefix != Numalgo2Prefix.SERVICE.value:
+        return PeerDIDErrorCode.VALID
+    service = peer_did[segment.start : segment.end]
+    code = services.get(service)
+    if code is None:
+        if len(services) >= _MAX_CHECKED_SERVICES:
+            services.clear()
+        code = services[service] = _check_service(service)
+    return code
+
+
+def _check_service(service: str) -> PeerDIDErrorCode:
+    try:
+        decode_service_entries(service)
+    except MalformedPeerDIDError:
+        return PeerDIDErrorCode.INVALID_SERVICE
+    return PeerDIDErrorCode.VALID
 
 
 def create_peer_did_numalgo_0(
@@ -53,7 +200,44 @@ def create_peer_did_numalgo_0(
         raise ValueError(
             "Authentication not supported for key: {}.".format(inception_key)
         )
-    return "did:peer:0" + inception_key.to_multibase()
+    return "did:peer:0" + timed(Phase.KEY_ENCODE, inception_key.to_multibase)
+
+
+def create_peer_dids_numalgo_0(public_keys: np.ndarray) -> List[str]:
+    """
+    Generate Peer DIDs according to the zero algorithm for an array of Ed25519 keys.
+
+    The multicodec prefix is added to all the keys at once and the prefixed keys are
+    base58-encoded together, without building a key object per row. Requires NumPy.
+
+    :param public_keys: raw Ed25519 public keys as a NumPy array of shape (N, 32)
+        and dtype uint8
+    :raises ImportError: if NumPy is not installed
+    :raises ValueError: if public_keys is not an array of Ed25519 public keys
+    :return: generated Peer DIDs as strings, the same as `create_peer_did_numalgo_0`
+    """
+    import numpy as np
+
+    public_keys = np.asarray(public_keys)
+    key_length = Ed25519VerificationKey.key_length
+    if (
+        public_keys.dtype != np.uint8
+        or public_keys.ndim != 2
+        or public_keys.shape[1] != key_length
+    ):
+        raise ValueError(
+            "Expected an array of shape (N, {}) and dtype uint8".format(key_length)
+        )
+    prefix = Ed25519VerificationKey.codec.encode_multicodec(b"")
+    rows = np.empty((len(public_keys), len(prefix) + key_length), dtype=np.uint8)
+    rows[:, : len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    rows[:, len(prefix) :] = public_keys
+    return timed(
+        Phase.KEY_ENCODE,
+        to_base58_rows,
+        rows,
+        "did:peer:0" + MultibaseFormat.BASE58.value,
+    )
 
 
 def create_peer_did_numalgo_2(
@@ -77,6 +261,202 @@ def create_peer_did_numalgo_2(
         3. if service is not valid JSON
     :return: generated Peer DID
     """
+    _check_numalgo_2_keys(encryption_keys, signing_keys)
+    from pydid import DID
+
+    peer_did = timed(
+        Phase.VALIDATE,
+        DID,
+        "did:peer:2"
+        + _encode_numalgo_2_keys(Numalgo2Prefix.KEY_AGREEMENT, encryption_keys)
+        + _encode_numalgo_2_keys(Numalgo2Prefix.AUTHENTICATION, signing_keys)
+        + timed(Phase.SERVICE_ENCODE, encode_service, service),
+    )
+    return peer_did
+
+
+class PeerDIDNumalgo2Factory:
+    """
+    Generate numalgo 2 Peer DIDs sharing their signing keys and service.
+
+    The signing keys and the service are validated and encoded once, when the
+    factory is created; minting a Peer DID only encodes the new encryption keys.
+    The minted Peer DIDs are the same as those of `create_peer_did_numalgo_2`.
+    """
+
+    def __init__(
+        self,
+        signing_keys: Sequence[BaseKey] = (),
+        service: Optional[ServiceJson] = None,
+    ):
+        """
+        Initializer.
+
+        :param signing_keys: list of signing keys shared by the minted Peer DIDs
+        :param service: JSON conforming to the DID specification (https://www.w3.org/TR/did-core/#services)
+            or None if there is no services expected for the minted Peer DIDs
+        :raises ValueError:
+            1. if at least one of signing keys is not a BaseKey supporting authentication
+            2. if service is not valid JSON
+        """
+        _check_numalgo_2_keys((), signing_keys)
+        self._suffix = _encode_numalgo_2_keys(
+            Numalgo2Prefix.AUTHENTICATION, signing_keys
+        ) + timed(Phase.SERVICE_ENCODE, encode_service, service)
+
+    def mint(self, encryption_keys: Sequence[BaseKey]) -> DID:
+        """
+        Generate a Peer DID with the given encryption keys.
+
+        :param encryption_keys: list of encryption keys
+        :raises ValueError: if at least one of encryption keys is not a BaseKey
+            supporting key agreement
+        :return: generated Peer DID
+        """
+        from pydid import DID
+
+        return timed(Phase.VALIDATE, DID, self.mint_str(encryption_keys))
+
+    def mint_str(self, encryption_keys: Sequence[BaseKey]) -> str:
+        """
+        Generate a Peer DID with the given encryption keys as a string.
+
+        The Peer DID is only built from validated keys and the encoded service, so
+        it is returned without the pydid DID validation of `mint`.
+
+        :param encryption_keys: list of encryption keys
+        :raises ValueError: if at least one of encryption keys is not a BaseKey
+            supporting key agreement
+        :return: generated Peer DID
+        """
+        _check_numalgo_2_keys(encryption_keys, ())
+        return (
+            "did:peer:2"
+            + _encode_numalgo_2_keys(Numalgo2Prefix.KEY_AGREEMENT, encryption_keys)
+            + self._suffix
+        )
+
+
+def create_peer_dids_numalgo_2(
+    batch: Iterable[Tuple[Sequence[BaseKey], Sequence[BaseKey], Optional[ServiceJson]]],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+) -> List[Union[str, ValueError]]:
+    """
+    Generate a batch of Peer DIDs according to the second algorithm using a pool of worker processes.
+
+    Only the multicodec-encoded public keys and the services are sent to the
+    workers, and each service object is encoded once per chunk. An item which
+    can not be created does not fail the batch: the error is returned in its place.
+
+    :param batch: (encryption_keys, signing_keys, service) arguments of
+        `create_peer_did_numalgo_2`, one tuple per Peer DID
+    :param workers: number of worker processes, None for the CPU count.
+        With a single worker the DIDs are created in the calling process, as
+        a single chunk.
+    :param chunksize: number of Peer DIDs sent to a worker at once
+    :return: generated Peer DIDs as strings or errors, in input order
+    """
+    if workers == 1:
+        return _create_numalgo_2_chunk([_raw_numalgo_2_item(item) for item in batch])
+    return list(
+        map_chunks(
+            _create_numalgo_2_chunk,
+            map(_raw_numalgo_2_item, batch),
+            workers=workers,
+            chunksize=chunksize,
+        )
+    )
+
+
+def _raw_numalgo_2_item(
+    item: Tuple[Sequence[BaseKey], Sequence[BaseKey], Optional[ServiceJson]],
+) -> Union[Tuple[List[bytes], List[bytes], Optional[ServiceJson]], ValueError]:
+    try:
+        encryption_keys, signing_keys, service = item
+        return (
+            [
+                _MULTICODEC_PREFIXES[key.codec] + key.public_key
+                for key in encryption_keys
+            ],
+            [_MULTICODEC_PREFIXES[key.codec] + key.public_key for key in signing_keys],
+            service,
+        )
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        err = ValueError("Invalid batch item: {}".format(e))
+        err.__cause__ = e
+        return err
+
+
+def _create_numalgo_2_chunk(
+    items: List[
+        Union[Tuple[List[bytes], List[bytes], Optional[ServiceJson]], Exception]
+    ],
+) -> List[Union[str, ValueError]]:
+    # the items of a chunk are alive until it is done, so the id of a service
+    # object is not reused; strings are keyed on their value, and can not be
+    # equal to an id
+    services = {}
+    results = []
+    for item in items:
+        if isinstance(item, Exception):
+            results.append(item)
+            continue
+        try:
+            encryption_keys, signing_keys, service = item
+            peer_did = (
+                "did:peer:2"
+                + _encode_raw_numalgo_2_keys(
+                    Numalgo2Prefix.KEY_AGREEMENT, encryption_keys
+                )
+                + _encode_raw_numalgo_2_keys(
+                    Numalgo2Prefix.AUTHENTICATION, signing_keys
+                )
+            )
+            memo_key = service if isinstance(service, str) else id(service)
+            service_str = services.get(memo_key)
+            if service_str is None:
+                service_str = timed(Phase.SERVICE_ENCODE, encode_service, service)
+                services[memo_key] = service_str
+            results.append(peer_did + service_str)
+        except ValueError as e:
+            results.append(e)
+        except TypeError as e:
+            err = ValueError(str(e))
+            err.__cause__ = e
+            results.append(err)
+    return results
+
+
+def _encode_raw_numalgo_2_keys(prefix: Numalgo2Prefix, keys: List[bytes]) -> str:
+    purpose = KEY_PURPOSES[prefix.value]
+    sep = "." + prefix.value
+    encoded = []
+    for value in keys:
+        key_cls = _RAW_KEY_CLASSES.get(value[:2])
+        if (
+            key_cls is None
+            or len(value) != 2 + key_cls.key_length
+            or purpose not in key_cls.relationships
+        ):
+            # build the key for the errors of create_peer_did_numalgo_2
+            key = _key_from_multicodec(value)
+            if prefix == Numalgo2Prefix.KEY_AGREEMENT:
+                _check_numalgo_2_keys([key], ())
+            else:
+                _check_numalgo_2_keys((), [key])
+        encoded.append(sep + timed(Phase.KEY_ENCODE, to_multibase, value))
+    return "".join(encoded)
+
+
+def _key_from_multicodec(value: bytes) -> BaseKey:
+    public_key, codec = from_multicodec(value)
+    return BaseKey.for_codec(codec)(public_key)
+
+
+def _check_numalgo_2_keys(
+    encryption_keys: Sequence[BaseKey], signing_keys: Sequence[BaseKey]
+):
     for k in encryption_keys:
         if KeyRelationshipType.KEY_AGREEMENT not in k.relationships:
             raise ValueError("Key agreement not supported for key: {}.".format(k))
@@ -84,106 +464,325 @@ def create_peer_did_numalgo_2(
         if KeyRelationshipType.AUTHENTICATION not in k.relationships:
             raise ValueError("Authentication not supported for key: {}.".format(k))
 
-    enc_sep = "." + Numalgo2Prefix.KEY_AGREEMENT.value
-    auth_sep = "." + Numalgo2Prefix.AUTHENTICATION.value
-    encryption_keys_str = (
-        enc_sep + enc_sep.join(key.to_multibase() for key in encryption_keys)
-        if encryption_keys
-        else ""
-    )
-    auth_keys_str = (
-        auth_sep + auth_sep.join(key.to_multibase() for key in signing_keys)
-        if signing_keys
-        else ""
-    )
-    service_str = encode_service(service)
 
-    peer_did = DID("did:peer:2" + encryption_keys_str + auth_keys_str + service_str)
-    return peer_did
+def _encode_numalgo_2_keys(prefix: Numalgo2Prefix, keys: Sequence[BaseKey]) -> str:
+    sep = "." + prefix.value
+    return "".join(sep + timed(Phase.KEY_ENCODE, key.to_multibase) for key in keys)
 
 
 def resolve_peer_did(
     peer_did: Union[str, DID],
     format: KeyFormat = KeyFormat.MULTIBASE,
+    cache: Optional[CacheBackend] = None,
+    policy: Optional[ResolverPolicy] = None,
+    trusted: bool = False,
 ) -> DIDDocument:
     """
     Resolve a DID Document from a Peer DID.
 
     :param peer_did: Peer DID to resolve
     :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param cache: optional cache to look the DID Document up in and to store it to
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :param trusted: build the pydid models without validating them again,
+        see `try_resolve_peer_did`
     :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or exceeds a policy limit
     :return: resolved DID Document as a JSON string
     """
-    if not is_peer_did(peer_did):
-        raise MalformedPeerDIDError("Does not match peer DID regexp")
-    if peer_did[9] == "0":
-        did_doc = _build_did_doc_numalgo_0(peer_did, format)
-    else:
-        did_doc = _build_did_doc_numalgo_2(peer_did, format)
-    return did_doc
+    result = try_resolve_peer_did(peer_did, format, cache, policy, trusted)
+    if isinstance(result, ResolutionFailure):
+        raise result.to_error()
+    return result
+
+
+def try_resolve_peer_did(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    cache: Optional[CacheBackend] = None,
+    policy: Optional[ResolverPolicy] = None,
+    trusted: bool = False,
+) -> Union[DIDDocument, ResolutionFailure]:
+    """
+    Resolve a DID Document from a Peer DID, returning the failure instead of raising.
+
+    The grammar and every key are checked before anything is decoded, without
+    raising errors internally, so rejecting a malformed Peer DID is cheap. Only a
+    malformed service, whose JSON has to be parsed, raises and catches an error.
 
+    In trusted mode the DID, the key identifiers, the verification methods and
+    the DID Document are constructed without pydantic validation. The Peer DID
+    is still checked against the grammar and its keys and service are decoded,
+    so the DID Document equals the validated one; only the services are still
+    validated, as the type of their endpoint depends on it.
 
-def _did_document_builder(peer_did: Union[str, DID]) -> DIDDocumentBuilder:
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param cache: optional cache to look the DID Document up in and to store it to
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :param trusted: build the pydid models without validating them again
+    :return: resolved DID Document, or the reason for the Peer DID not to resolve
+        with the failing segment
+    """
+    if policy is not None:
+        failure = policy.check_length(peer_did)
+        if failure is not None:
+            return failure
+    if cache is not None:
+        did_doc = cache.get(peer_did, format)
+        if did_doc is not None:
+            return did_doc
+    segments = validate_peer_did(peer_did, policy)
+    if isinstance(segments, ResolutionFailure):
+        return segments
+    keys = load_segment_keys(peer_did, segments, format)
+    if isinstance(keys, ResolutionFailure):
+        return keys
     try:
-        return DIDDocumentBuilder(peer_did)
-    except InvalidDIDError as e:
-        raise MalformedPeerDIDError("Invalid peer DID") from e
-
-
-def _add_key_to_document(builder: DIDDocumentBuilder, key: BaseKey):
-    ver_method_result = key.verification_method(builder.id)
-    builder.verification_method.methods.append(ver_method_result.method)
-    ver_ident = DIDUrl.parse(ver_method_result.method.id)
-    if ver_method_result.context and ver_method_result.context not in builder.context:
-        builder.context.append(ver_method_result.context)
-    for rel in key.relationships:
-        if rel == KeyRelationshipType.AUTHENTICATION:
-            builder.authentication.reference(ver_ident)
-            builder.assertion_method.reference(ver_ident)
-            builder.capability_delegation.reference(ver_ident)
-            builder.capability_invocation.reference(ver_ident)
-        elif rel == KeyRelationshipType.KEY_AGREEMENT:
-            builder.key_agreement.reference(ver_ident)
-
-
-def _build_did_doc_numalgo_0(
-    peer_did: Union[str, DID], format: KeyFormat
-) -> DIDDocument:
-    decoded_key = decode_multibase_numbasis(peer_did[10:], format)
-    builder = _did_document_builder(peer_did)
-    _add_key_to_document(builder, decoded_key)
-    return builder.build()
+        did_doc = build_did_doc(peer_did, keys, segments, trusted)
+    except MalformedPeerDIDError as e:
+        # keys are checked above, only the service can still be malformed
+        return ResolutionFailure(
+            peer_did,
+            PeerDIDErrorCode.INVALID_SERVICE,
+            len(segments) - 1,
+            segments[-1].start,
+            e.msg,
+        )
+    if cache is not None:
+        cache.put(peer_did, format, did_doc)
+    return did_doc
 
 
-def _build_did_doc_numalgo_2(
-    peer_did: Union[str, DID], format: KeyFormat
-) -> DIDDocument:
-    keys = peer_did[11:]
-    keys = keys.split(".")
-    builder = _did_document_builder(peer_did)
-
-    for key in keys:
-        if not key:
-            raise MalformedPeerDIDError("Blank key entry")
-        prefix = key[0]
-        if prefix == Numalgo2Prefix.SERVICE.value:
-            for svc in decode_service(key[1:]):
-                builder.service.services.append(svc)
-        elif prefix == Numalgo2Prefix.AUTHENTICATION.value:
-            decoded_key = decode_multibase_numbasis(key[1:], format)
-            if KeyRelationshipType.AUTHENTICATION not in decoded_key.relationships:
-                raise MalformedPeerDIDError(
-                    "Authentication not supported for key: {}.".format(key)
-                )
-            _add_key_to_document(builder, decoded_key)
-        elif prefix == Numalgo2Prefix.KEY_AGREEMENT.value:
-            decoded_key = decode_multibase_numbasis(key[1:], format)
-            if KeyRelationshipType.KEY_AGREEMENT not in decoded_key.relationships:
-                raise MalformedPeerDIDError(
-                    "Key agreement not supported for key: {}.".format(key)
+def resolve_peer_did_formats(
+    peer_did: Union[str, DID],
+    formats: Iterable[KeyFormat] = tuple(KeyFormat),
+    policy: Optional[ResolverPolicy] = None,
+    trusted: bool = False,
+) -> Dict[KeyFormat, DIDDocument]:
+    """
+    Resolve DID Documents in several key formats from a Peer DID.
+
+    The Peer DID is validated and its keys and service are decoded once. The
+    first document is built like `resolve_peer_did(peer_did, format)`, and
+    every further format is constructed from the same keys and services
+    without validating them again. Each document equals
+    `resolve_peer_did(peer_did, format)`, but the documents share their
+    `Service` models, so copy a service before changing it.
+
+    :param peer_did: Peer DID to resolve
+    :param formats: the formats of public keys to resolve DID Documents in.
+        Default is every format.
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :param trusted: build the pydid models without validating them again,
+        see `try_resolve_peer_did`
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or exceeds a policy limit
+    :raises ValueError: if no format is given
+    :return: resolved DID Documents by key format, in the order of `formats`
+    """
+    formats = list(dict.fromkeys(formats))
+    if not formats:
+        raise ValueError("At least one key format is required")
+    first, others = formats[0], formats[1:]
+    segments = checked_segments(peer_did, policy)
+    keys = segment_keys(peer_did, segments, first)
+    services = decode_services(peer_did, segments)
+    did_docs = {first: assemble_did_doc(peer_did, keys, services, trusted, first)}
+    for format in others:
+        did_docs[format] = construct_did_doc(peer_did, keys, services, format)
+    return did_docs
+
+
+def resolve_peer_did_dict(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    policy: Optional[ResolverPolicy] = None,
+) -> dict:
+    """
+    Resolve a serialized DID Document from a Peer DID, without building pydid models.
+
+    The result equals `resolve_peer_did(peer_did, format).serialize()`.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or exceeds a policy limit
+    :return: resolved DID Document as a dict
+    """
+    segments = checked_segments(peer_did, policy)
+    keys = segment_keys(peer_did, segments, format)
+    services = []
+    for segment in segments:
+        if segment.prefix == Numalgo2Prefix.SERVICE.value:
+            services.extend(
+                timed(
+                    Phase.SERVICE_DECODE,
+                    decode_service_entries,
+                    peer_did[segment.start : segment.end],
                 )
-            _add_key_to_document(builder, decoded_key)
-        else:
-            raise MalformedPeerDIDError("Unknown prefix: {}.".format(prefix))
+            )
+    return build_did_doc_dict(peer_did, keys, services)
+
+
+def resolve_peer_did_json(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    policy: Optional[ResolverPolicy] = None,
+) -> str:
+    """
+    Resolve a DID Document from a Peer DID directly to JSON, without building pydid models.
+
+    The result equals `resolve_peer_did(peer_did, format).to_json()`.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        or exceeds a policy limit
+    :return: resolved DID Document as a JSON string
+    """
+    return json.dumps(resolve_peer_did_dict(peer_did, format, policy))
+
 
-    return builder.build()
+def resolve_peer_dids(
+    peer_dids: Iterable[Union[str, DID]],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    policy: Optional[ResolverPolicy] = None,
+    trusted: bool = False,
+) -> List[Union[DIDDocument, PeerDIDError]]:
+    """
+    Resolve a batch of Peer DIDs using a pool of worker processes.
+
+    A Peer DID which can not be resolved does not fail the batch: the error is
+    returned in its place instead of a DID Document.
+
+    :param peer_dids: Peer DIDs to resolve
+    :param format: the format of public keys in the DID Documents. Default format is multibase.
+    :param workers: number of worker processes, None for the CPU count.
+        With a single worker the DIDs are resolved in the calling process.
+    :param chunksize: number of Peer DIDs sent to a worker at once
+    :param policy: optional size limits to enforce on untrusted Peer DIDs
+    :param trusted: build the pydid models without validating them again,
+        see `try_resolve_peer_did`
+    :return: resolved DID Documents or errors, in input order
+    """
+    return list(
+        map_chunks(
+            _resolve_chunk,
+            peer_dids,
+            format,
+            policy,
+            trusted,
+            workers=workers,
+            chunksize=chunksize,
+        )
+    )
+
+
+def _resolve_chunk(
+    peer_dids: List[Union[str, DID]],
+    format: KeyFormat,
+    policy: Optional[ResolverPolicy] = None,
+    trusted: bool = False,
+) -> List[Union[DIDDocument, PeerDIDError]]:
+    results = []
+    for peer_did in peer_dids:
+        try:
+            results.append(
+                resolve_peer_did(peer_did, format, policy=policy, trusted=trusted)
+            )
+        except PeerDIDError as e:
+            results.append(e)
+        except (TypeError, ValueError) as e:
+            err = MalformedPeerDIDError(str(e))
+            err.__cause__ = e
+            results.append(err)
+    return results
+
+
+async def aresolve_peer_did(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    executor: Optional[Executor] = None,
+) -> DIDDocument:
+    """
+    Resolve a DID Document from a Peer DID without blocking the event loop.
+
+    Resolution is CPU-bound: with the default thread pool executor it still competes
+    with the event loop for the GIL, so pass a ProcessPoolExecutor to fully offload it.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param executor: executor to resolve in, None for the event loop's default executor
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :return: resolved DID Document
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, resolve_peer_did, peer_did, format)
+
+
+async def aresolve_many(
+    peer_dids: Union[AsyncIterable[Union[str, DID]], Iterable[Union[str, DID]]],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    concurrency: int = 8,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Tuple[Union[str, DID], Union[DIDDocument, PeerDIDError]]]:
+    """
+    Resolve Peer DIDs concurrently, yielding DID Documents as they complete.
+
+    At most `concurrency` resolutions are in flight, and the next Peer DID is only
+    taken from the input once a result has been consumed. A Peer DID which can not
+    be resolved yields the error in place of a DID Document.
+
+    :param peer_dids: Peer DIDs to resolve
+    :param format: the format of public keys in the DID Documents. Default format is multibase.
+    :param concurrency: maximum number of resolutions in flight
+    :param executor: executor to resolve in, None for the event loop's default executor
+    :return: async iterator over (Peer DID, DID Document or error) pairs in completion order
+    """
+    import asyncio
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be positive")
+    loop = asyncio.get_running_loop()
+    pending = set()
+
+    async def resolve(peer_did):
+        results = await loop.run_in_executor(
+            executor, _resolve_chunk, [peer_did], format
+        )
+        return peer_did, results[0]
+
+    try:
+        async for peer_did in _aiter(peer_dids):
+            pending.add(asyncio.ensure_future(resolve(peer_did)))
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _aiter(items: Union[AsyncIterable, Iterable]) -> AsyncIterator:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
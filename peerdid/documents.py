@@ -0,0 +1,391 @@
+"""Peer DID document views."""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+from pydid import DID, DIDDocument, DIDUrl, Service, VerificationMethod
+
+from .cache import CacheBackend
+from .core.peer_did_helper import Numalgo2Prefix, decode_service
+from .core.segments import (
+    DID_CONTEXT,
+    PeerDIDSegment,
+    checked_segments,
+    did_document_builder,
+    segment_keys,
+)
+from .dids import resolve_peer_did
+from .errors import PeerDIDErrorCode, ResolutionFailure
+from .instrumentation import Phase, timed
+from .keys import BaseKey, KeyFormat, KeyRelationshipType, VerificationMethodResult
+
+_RELATIONSHIP_PREFIXES = {
+    KeyRelationshipType.AUTHENTICATION: Numalgo2Prefix.AUTHENTICATION.value,
+    KeyRelationshipType.KEY_AGREEMENT: Numalgo2Prefix.KEY_AGREEMENT.value,
+}
+
+# verification relationships of a DID Document, by member name
+RELATIONSHIPS = (
+    "authentication",
+    "assertion_method",
+    "key_agreement",
+    "capability_invocation",
+    "capability_delegation",
+)
+_RELATIONSHIP_MEMBERS = {
+    KeyRelationshipType.AUTHENTICATION: "authentication",
+    KeyRelationshipType.KEY_AGREEMENT: "key_agreement",
+}
+
+
+class LazyPeerDIDDocument:
+    """
+    Read-only DID Document resolved from a Peer DID on demand.
+
+    The Peer DID is validated up front, but its key and service segments are only
+    decoded when a document member built from them is first read: reading
+    `key_agreement` decodes the `.E` keys, reading `service` decodes the `.S`
+    segment. Decoded members are kept, so repeated reads are free.
+
+    `serialize`, `to_json` and any attribute not provided here are served by the
+    full DID Document, which is built once, on first use, from the decoded members.
+    Since segments are decoded lazily, a malformed key or service segment raises
+    MalformedPeerDIDError when a member depending on it is read.
+    """
+
+    def __init__(
+        self, peer_did: Union[str, DID], format: KeyFormat = KeyFormat.MULTIBASE
+    ):
+        """
+        Initializer.
+
+        :param peer_did: Peer DID to resolve
+        :param format: the format of public keys in the DID Document. Default format is multibase.
+        :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+        """
+        segments = checked_segments(peer_did)
+        self._peer_did = peer_did
+        self._format = format
+        self._numalgo_0 = peer_did[9] == "0"
+        self._key_segments: List[PeerDIDSegment] = []
+        self._service_segments: List[PeerDIDSegment] = []
+        for index, segment in enumerate(segments):
+            if segment.prefix == Numalgo2Prefix.SERVICE.value:
+                self._service_segments.append(segment)
+            elif self._numalgo_0 or segment.prefix in _RELATIONSHIP_PREFIXES.values():
+                self._key_segments.append(segment)
+            else:
+                raise ResolutionFailure(
+                    peer_did,
+                    PeerDIDErrorCode.UNKNOWN_PREFIX,
+                    index,
+                    segment.start,
+                    None,
+                ).to_error()
+        self._keys: Dict[int, Tuple[BaseKey, VerificationMethodResult]] = {}
+        self._members: Dict[str, object] = {}
+        self._document: Optional[DIDDocument] = None
+
+    @property
+    def id(self) -> DID:
+        """The Peer DID."""
+        if "id" not in self._members:
+            self._members["id"] = DID(self._peer_did)
+        return self._members["id"]
+
+    @property
+    def context(self) -> List[str]:
+        """The JSON-LD contexts of the document, decoding every key."""
+        if "context" not in self._members:
+            context = [DID_CONTEXT]
+            for index in range(len(self._key_segments)):
+                method_context = self._decode_key(index)[1].context
+                if method_context and method_context not in context:
+                    context.append(method_context)
+            self._members["context"] = context
+        return self._members["context"]
+
+    @property
+    def also_known_as(self) -> None:
+        """Peer DID Documents have no alternative identifiers."""
+        return None
+
+    @property
+    def controller(self) -> None:
+        """Peer DID Documents have no controller."""
+        return None
+
+    @property
+    def verification_method(self) -> Optional[List[VerificationMethod]]:
+        """The verification methods of the document, decoding every key."""
+        if "verification_method" not in self._members:
+            self._members["verification_method"] = [
+                self._decode_key(index)[1].method
+                for index in range(len(self._key_segments))
+            ] or None
+        return self._members["verification_method"]
+
+    @property
+    def authentication(self) -> Optional[List[DIDUrl]]:
+        """Authentication references, decoding the authentication keys only."""
+        return self._references("authentication", KeyRelationshipType.AUTHENTICATION)
+
+    @property
+    def assertion_method(self) -> Optional[List[DIDUrl]]:
+        """Assertion method references, decoding the authentication keys only."""
+        return self._references("assertion_method", KeyRelationshipType.AUTHENTICATION)
+
+    @property
+    def key_agreement(self) -> Optional[List[DIDUrl]]:
+        """Key agreement references, decoding the key agreement keys only."""
+        return self._references("key_agreement", KeyRelationshipType.KEY_AGREEMENT)
+
+    @property
+    def capability_invocation(self) -> Optional[List[DIDUrl]]:
+        """Capability invocation references, decoding the authentication keys only."""
+        return self._references(
+            "capability_invocation", KeyRelationshipType.AUTHENTICATION
+        )
+
+    @property
+    def capability_delegation(self) -> Optional[List[DIDUrl]]:
+        """Capability delegation references, decoding the authentication keys only."""
+        return self._references(
+            "capability_delegation", KeyRelationshipType.AUTHENTICATION
+        )
+
+    @property
+    def service(self) -> Optional[List[Service]]:
+        """The services of the document, decoding the service segment only."""
+        if "service" not in self._members:
+            services = []
+            for segment in self._service_segments:
+                services.extend(
+                    decode_service(self._peer_did[segment.start : segment.end]) or ()
+                )
+            self._members["service"] = services or None
+        return self._members["service"]
+
+    @property
+    def document(self) -> DIDDocument:
+        """The full DID Document, built on first access."""
+        if self._document is None:
+            builder = did_document_builder(self._peer_did)
+            builder.context = list(self.context)
+            builder.verification_method.methods = list(self.verification_method or ())
+            builder.authentication.methods = list(self.authentication or ())
+            builder.assertion_method.methods = list(self.assertion_method or ())
+            builder.key_agreement.methods = list(self.key_agreement or ())
+            builder.capability_invocation.methods = list(
+                self.capability_invocation or ()
+            )
+            builder.capability_delegation.methods = list(
+                self.capability_delegation or ()
+            )
+            builder.service.services = list(self.service or ())
+            self._document = timed(Phase.BUILD, builder.build)
+        return self._document
+
+    def serialize(self) -> dict:
+        """Serialize the full DID Document."""
+        return self.document.serialize()
+
+    def to_json(self) -> str:
+        """Serialize the full DID Document to JSON."""
+        return self.document.to_json()
+
+    def __getattr__(self, name: str):
+        """Delegate any other attribute to the full DID Document."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.document, name)
+
+    def __repr__(self) -> str:
+        """Document representation."""
+        return "<{} {}>".format(self.__class__.__name__, self._peer_did)
+
+    def _decode_key(self, index: int) -> Tuple[BaseKey, VerificationMethodResult]:
+        decoded = self._keys.get(index)
+        if decoded is None:
+            segment = self._key_segments[index]
+            (key,) = segment_keys(self._peer_did, [segment], self._format)
+            result = timed(Phase.VERIFICATION_METHOD, key.verification_method, self.id)
+            decoded = self._keys[index] = (key, result)
+        return decoded
+
+    def _references(
+        self, member: str, relationship: KeyRelationshipType
+    ) -> Optional[List[DIDUrl]]:
+        if member not in self._members:
+            prefix = _RELATIONSHIP_PREFIXES[relationship]
+            references = []
+            for index, segment in enumerate(self._key_segments):
+                if self._numalgo_0 or segment.prefix == prefix:
+                    key, result = self._decode_key(index)
+                    if relationship in key.relationships:
+                        references.append(DIDUrl.parse(result.method.id))
+            self._members[member] = references or None
+        return self._members[member]
+
+
+def resolve_peer_did_lazy(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+) -> LazyPeerDIDDocument:
+    """
+    Resolve a DID Document from a Peer DID, decoding its segments on first access.
+
+    The document members read from the result equal those of
+    `resolve_peer_did(peer_did, format)`, but only the segments they depend on
+    are decoded.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :return: lazily resolved DID Document
+    """
+    return LazyPeerDIDDocument(peer_did, format)
+
+
+class IndexedPeerDIDDocument:
+    """
+    Read-only view of a resolved DID Document with constant time lookups.
+
+    Verification methods are indexed by identifier, relative (`#xxxxxxxx`) or
+    as a DID URL, verification relationships resolve to the methods they
+    reference and services are grouped by type, all once, when the view is
+    built. Any other attribute is served by the DID Document itself.
+    """
+
+    def __init__(self, document: DIDDocument):
+        """
+        Initializer.
+
+        :param document: resolved DID Document to index
+        """
+        self.document = document
+        self._did = str(document.id)
+        self._methods: Dict[str, VerificationMethod] = {}
+        for method in document.verification_method or ():
+            self._methods.setdefault(self._relative(method.id), method)
+        self._relationships: Dict[str, Tuple[VerificationMethod, ...]] = {}
+        for member in RELATIONSHIPS:
+            methods = []
+            for reference in getattr(document, member) or ():
+                if isinstance(reference, VerificationMethod):
+                    # an embedded method can be looked up by identifier too
+                    self._methods.setdefault(self._relative(reference.id), reference)
+                    methods.append(reference)
+                else:
+                    method = self._methods.get(self._relative(reference))
+                    if method is not None:
+                        methods.append(method)
+            self._relationships[member] = tuple(methods)
+        services: Dict[str, List[Service]] = {}
+        for service in document.service or ():
+            types = service.type if isinstance(service.type, list) else [service.type]
+            for service_type in types:
+                services.setdefault(service_type, []).append(service)
+        self._services = {
+            service_type: tuple(typed) for service_type, typed in services.items()
+        }
+
+    @property
+    def id(self) -> DID:
+        """The DID."""
+        return self.document.id
+
+    def method(self, ident: Union[str, DIDUrl]) -> Optional[VerificationMethod]:
+        """
+        Find a verification method by identifier.
+
+        :param ident: `#xxxxxxxx` identifier, or a DID URL of this DID
+        :return: the verification method, None if the document has none with this identifier
+        """
+        return self._methods.get(self._relative(ident))
+
+    def methods(
+        self, relationship: Union[str, KeyRelationshipType]
+    ) -> Tuple[VerificationMethod, ...]:
+        """
+        Get the verification methods of a verification relationship.
+
+        :param relationship: DID Document member name, e.g. `key_agreement`,
+            or key relationship type
+        :raises ValueError: if the relationship is unknown
+        :return: the verification methods referenced by the relationship, in document order
+        """
+        relationship = _RELATIONSHIP_MEMBERS.get(relationship, relationship)
+        methods = self._relationships.get(relationship)
+        if methods is None:
+            raise ValueError(
+                "Unknown verification relationship: {}".format(relationship)
+            )
+        return methods
+
+    def services(self, service_type: str) -> Tuple[Service, ...]:
+        """
+        Get the services of a type.
+
+        :param service_type: service type, e.g. `DIDCommMessaging`
+        :return: the services of this type, in document order
+        """
+        return self._services.get(service_type, ())
+
+    def encryption_key(self) -> Optional[VerificationMethod]:
+        """The first key agreement method, to encrypt DIDComm messages to, if any."""
+        methods = self._relationships["key_agreement"]
+        return methods[0] if methods else None
+
+    def signing_key(self) -> Optional[VerificationMethod]:
+        """The first authentication method, to verify signed messages with, if any."""
+        methods = self._relationships["authentication"]
+        return methods[0] if methods else None
+
+    def serialize(self) -> dict:
+        """Serialize the DID Document."""
+        return self.document.serialize()
+
+    def to_json(self) -> str:
+        """Serialize the DID Document to JSON."""
+        return self.document.to_json()
+
+    def __getattr__(self, name: str):
+        """Delegate any other attribute to the DID Document."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.document, name)
+
+    def __repr__(self) -> str:
+        """Document representation."""
+        return "<{} {}>".format(self.__class__.__name__, self._did)
+
+    def _relative(self, ident: str) -> str:
+        # a DID URL of this DID and its fragment identify the same method
+        if ident[:1] == "#":
+            return ident
+        did, sep, fragment = ident.partition("#")
+        if sep and did == self._did:
+            return sep + fragment
+        return ident
+
+
+def resolve_peer_did_indexed(
+    peer_did: Union[str, DID],
+    format: KeyFormat = KeyFormat.MULTIBASE,
+    cache: Optional[CacheBackend] = None,
+    trusted: bool = False,
+) -> IndexedPeerDIDDocument:
+    """
+    Resolve a DID Document from a Peer DID and index it for lookups.
+
+    :param peer_did: Peer DID to resolve
+    :param format: the format of public keys in the DID Document. Default format is multibase.
+    :param cache: optional cache to look the DID Document up in and to store it to
+    :param trusted: build the pydid models without validating them again,
+        see `try_resolve_peer_did`
+    :raises MalformedPeerDIDError: if peer_did parameter does not match Peer DID spec
+    :return: indexed DID Document
+    """
+    return IndexedPeerDIDDocument(
+        resolve_peer_did(peer_did, format, cache, trusted=trusted)
+    )
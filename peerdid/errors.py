@@ -1,5 +1,8 @@
 """Error classes."""
 
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
 
 class PeerDIDError(Exception):
     """Base class for Peer DID exceptions."""
@@ -11,3 +14,77 @@ class MalformedPeerDIDError(PeerDIDError):
     def __init__(self, msg: str) -> None:
         """Initializer."""
         super().__init__("Invalid peer DID provided. {}.".format(msg))
+        self.msg = msg
+
+    def __reduce__(self):
+        """Support pickling, as the message is reformatted on construction."""
+        return (self.__class__, (self.msg,))
+
+
+class PeerDIDErrorCode(IntEnum):
+    """Reasons for a Peer DID to be invalid, reported without raising errors."""
+
+    VALID = 0
+    # does not match the Peer DID grammar
+    MALFORMED = 1
+    # numalgo 2 key segment with a purpose other than V or E
+    UNKNOWN_PREFIX = 2
+    # key without a supported multicodec prefix
+    INVALID_MULTICODEC = 3
+    # public key of the wrong length for its codec
+    INVALID_KEY_LENGTH = 4
+    # key type not usable for its purpose, e.g. an X25519 authentication key
+    UNSUPPORTED_PURPOSE = 5
+    # service segment not encoding well-formed service JSON
+    INVALID_SERVICE = 6
+    # Peer DID exceeding a limit of the ResolverPolicy
+    LIMIT_EXCEEDED = 7
+
+
+class ResolutionFailure(
+    NamedTuple(
+        "ResolutionFailure",
+        [
+            ("peer_did", str),
+            ("code", PeerDIDErrorCode),
+            ("segment", Optional[int]),
+            ("offset", int),
+            ("detail", Optional[str]),
+        ],
+    )
+):
+    """
+    Reason for a Peer DID not to resolve, returned instead of raising an error.
+
+    `segment` is the index of the failing segment: 0 for the key of a numalgo 0
+    Peer DID, the position among the dot-separated segments for numalgo 2, or None
+    if the Peer DID can not be split into segments. `offset` is the position in the
+    Peer DID of the segment value, after its purpose prefix.
+    """
+
+    __slots__ = ()
+
+    @property
+    def message(self) -> str:
+        """The message of the error raised by `resolve_peer_did`."""
+        if self.detail is not None:
+            return self.detail
+        code = self.code
+        if code == PeerDIDErrorCode.MALFORMED:
+            return "Does not match peer DID regexp"
+        if code == PeerDIDErrorCode.INVALID_SERVICE:
+            return "Invalid service"
+        end = self.peer_did.find(".", self.offset)
+        value = self.peer_did[self.offset : end if end >= 0 else None]
+        prefix = self.peer_did[self.offset - 1]
+        if code == PeerDIDErrorCode.UNKNOWN_PREFIX:
+            return "Unknown prefix: {}.".format(prefix)
+        if code == PeerDIDErrorCode.UNSUPPORTED_PURPOSE:
+            return "{} not supported for key: {}.".format(
+                "Authentication" if prefix == "V" else "Key agreement", prefix + value
+            )
+        return "Invalid key: {}".format(value)
+
+    def to_error(self) -> MalformedPeerDIDError:
+        """Build the error raised by `resolve_peer_did`."""
+        return MalformedPeerDIDError(self.message)
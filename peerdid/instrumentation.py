@@ -0,0 +1,116 @@
+"""Opt-in timing instrumentation for Peer DID creation and resolution."""
+
+import threading
+
+from contextlib import contextmanager
+from enum import Enum
+from time import perf_counter
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, TypeVar
+
+R = TypeVar("R")
+
+
+class Phase(Enum):
+    """Instrumented phases of Peer DID creation and resolution."""
+
+    VALIDATE = "validate"
+    MULTIBASE_DECODE = "multibase_decode"
+    MULTICODEC_DECODE = "multicodec_decode"
+    SERVICE_DECODE = "service_decode"
+    SERVICE_MODEL = "service_model"
+    VERIFICATION_METHOD = "verification_method"
+    BUILD = "build"
+    KEY_ENCODE = "key_encode"
+    SERVICE_ENCODE = "service_encode"
+
+
+Listener = Callable[[Phase, float], None]
+
+PhaseStats = NamedTuple(
+    "PhaseStats",
+    [
+        ("count", int),
+        ("total", float),
+        ("min", float),
+        ("max", float),
+    ],
+)
+
+_listener: Optional[Listener] = None
+
+
+def set_listener(listener: Optional[Listener]) -> Optional[Listener]:
+    """
+    Install the process-wide instrumentation listener.
+
+    The listener is called with the phase and its duration in seconds every time an
+    instrumented phase completes, including when it raises. With no listener
+    installed the instrumented calls are made directly.
+
+    :param listener: callable receiving (phase, seconds), or None to disable
+    :return: the previously installed listener
+    """
+    global _listener
+    previous = _listener
+    _listener = listener
+    return previous
+
+
+def get_listener() -> Optional[Listener]:
+    """Get the installed instrumentation listener."""
+    return _listener
+
+
+@contextmanager
+def instrumented(listener: Listener) -> Iterator[Listener]:
+    """Install a listener for the duration of a with block."""
+    previous = set_listener(listener)
+    try:
+        yield listener
+    finally:
+        set_listener(previous)
+
+
+def timed(phase: Phase, fn: Callable[..., R], *args, **kwargs) -> R:
+    """Call fn, reporting its duration for phase to the installed listener."""
+    listener = _listener
+    if listener is None:
+        return fn(*args, **kwargs)
+    start = perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        listener(phase, perf_counter() - start)
+
+
+class PhaseMetrics:
+    """Listener aggregating call counts and durations per phase."""
+
+    def __init__(self):
+        """Initializer."""
+        self._lock = threading.Lock()
+        self._stats: Dict[Phase, PhaseStats] = {}
+
+    def __call__(self, phase: Phase, duration: float):
+        """Record a phase duration."""
+        with self._lock:
+            stats = self._stats.get(phase)
+            if stats is None:
+                self._stats[phase] = PhaseStats(1, duration, duration, duration)
+            else:
+                self._stats[phase] = PhaseStats(
+                    stats.count + 1,
+                    stats.total + duration,
+                    min(stats.min, duration),
+                    max(stats.max, duration),
+                )
+
+    def snapshot(self) -> Dict[Phase, PhaseStats]:
+        """Get the statistics of every phase recorded so far."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+        """Discard the recorded statistics."""
+        with self._lock:
+            self._stats.clear()
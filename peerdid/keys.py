@@ -1,18 +1,12 @@
 """Peer DID key handling."""
 
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import List, Optional, NamedTuple, Type, Union
+from typing import TYPE_CHECKING, List, Optional, NamedTuple, Tuple, Type, Union
 from uuid import uuid4
-
-from pydid import DID, DIDUrl, VerificationMethod
-from pydid.verification_method import (
-    Ed25519VerificationKey2018,
-    Ed25519VerificationKey2020,
-    JsonWebKey2020,
-    X25519KeyAgreementKey2019,
-    X25519KeyAgreementKey2020,
-)
+from weakref import WeakValueDictionary
 
 from .core.jwk_okp import jwk_to_public_key, public_key_to_jwk
 from .core.multibase import (
@@ -23,6 +17,26 @@ from .core.multibase import (
     to_multibase,
 )
 from .core.multicodec import Codec, from_multicodec
+from .core.utils import lazy_import
+from .instrumentation import Phase, timed
+
+if TYPE_CHECKING:
+    from pydid import DID, DIDUrl, VerificationMethod
+
+# pydid is only loaded once a verification method is built
+__getattr__ = lazy_import(
+    __name__,
+    {
+        "DID": "pydid",
+        "DIDUrl": "pydid",
+        "VerificationMethod": "pydid",
+        "Ed25519VerificationKey2018": "pydid.verification_method",
+        "Ed25519VerificationKey2020": "pydid.verification_method",
+        "JsonWebKey2020": "pydid.verification_method",
+        "X25519KeyAgreementKey2019": "pydid.verification_method",
+        "X25519KeyAgreementKey2020": "pydid.verification_method",
+    },
+)
 
 ED25519_KEY_LENGTH = 32
 ED25519_2020_CONTEXT = "https://w3id.org/security/suites/ed25519-2020/v1"
@@ -50,20 +64,32 @@ VerificationMethodResult = NamedTuple(
     "VerificationMethodResult",
     [
         ("context", Optional[str]),
-        ("method", VerificationMethod),
+        ("method", "VerificationMethod"),
     ],
 )
 
 
+_INTERNED_KEYS: WeakValueDictionary[tuple, BaseKey] = WeakValueDictionary()
+
+
 class BaseKey(ABC):
-    """Base class for key types."""
+    """Base class for key types.
+
+    Keys are immutable and hash on their codec and public key, so they can be
+    shared between documents and used in sets and as dictionary keys.
+    """
+
+    __slots__ = ("public_key", "ident", "format", "__weakref__")
 
     codec: Codec
     format: KeyFormat
-    ident: Optional[Union[str, DIDUrl]] = None
+    ident: Optional[Union[str, DIDUrl]]
     key_length: Optional[int] = None
     public_key: bytes
     relationships: List[KeyRelationshipType]
+    base58_method_type: str
+    multibase_method_type: str
+    multibase_context: str
 
     @classmethod
     def for_codec(cls, codec: Codec) -> Type["BaseKey"]:
@@ -100,12 +126,30 @@ class BaseKey(ABC):
 
     @classmethod
     def from_multibase(
-        cls, multibase: str, ident: Union[str, DIDUrl] = None, format: KeyFormat = None
+        cls,
+        multibase: str,
+        ident: Union[str, DIDUrl] = None,
+        format: KeyFormat = None,
+        intern: bool = False,
     ) -> "BaseKey":
-        """Load a multibase, multicodec-encoded key."""
-        encnumbasis, multicodec = from_multibase(multibase)
+        """Load a multibase, multicodec-encoded key.
+
+        With `intern` set, keys are looked up in a process-wide table of live keys
+        first, so that loading the same multibase value with the same identifier
+        and format returns the same object.
+        """
+        if intern:
+            cache_key = (multibase, ident, format)
+            key = _INTERNED_KEYS.get(cache_key)
+            if key is None or not isinstance(key, cls):
+                key = cls.from_multibase(multibase, ident, format)
+                _INTERNED_KEYS[cache_key] = key
+            return key
+        encnumbasis, multicodec = timed(
+            Phase.MULTIBASE_DECODE, from_multibase, multibase
+        )
         ident = ident or "#" + encnumbasis[:8]
-        public_key, codec = from_multicodec(multicodec)
+        public_key, codec = timed(Phase.MULTICODEC_DECODE, from_multicodec, multicodec)
         key_type_cls = cls.for_codec(codec)
         return key_type_cls(
             public_key, ident=ident, format=format or KeyFormat.MULTIBASE
@@ -130,9 +174,11 @@ class BaseKey(ABC):
         format: KeyFormat = None,
     ):
         """Initializer."""
-        self.public_key = public_key
-        self.ident = ident or "#" + str(uuid4)
-        self.format = format or KeyFormat.MULTIBASE
+        if isinstance(public_key, (bytearray, memoryview)):
+            public_key = bytes(public_key)
+        object.__setattr__(self, "public_key", public_key)
+        object.__setattr__(self, "ident", ident or "#" + str(uuid4))
+        object.__setattr__(self, "format", format or KeyFormat.MULTIBASE)
         self.validate()
 
     def validate(self):
@@ -151,6 +197,35 @@ class BaseKey(ABC):
     ) -> VerificationMethodResult:
         """Generate a VerificationMethod entry for this key."""
 
+    def serialize_verification_method(
+        self, controller: Union[str, DID], format: KeyFormat = None
+    ) -> Tuple[Optional[str], dict]:
+        """Generate a serialized VerificationMethod entry for this key.
+
+        The result matches the serialized `verification_method` result, without
+        building the pydid model.
+        """
+        context = None
+        format = format or self.format
+        method = {"id": str(self.ident)}
+        if format == KeyFormat.BASE58:
+            method["type"] = self.base58_method_type
+            method["controller"] = str(controller)
+            method["publicKeyBase58"] = to_base58(self.public_key)
+        elif format == KeyFormat.MULTIBASE:
+            context = self.multibase_context
+            method["type"] = self.multibase_method_type
+            method["controller"] = str(controller)
+            method["publicKeyMultibase"] = self.to_multibase()
+        elif format == KeyFormat.JWK:
+            context = JWS_2020_CONTEXT
+            method["type"] = "JsonWebKey2020"
+            method["controller"] = str(controller)
+            method["publicKeyJwk"] = public_key_to_jwk(self.public_key, self.codec)
+        else:
+            raise ValueError("Unsupported key format for export")
+        return context, method
+
     def to_multibase(self, format: MultibaseFormat = None) -> str:
         """Encode this key in multibase format."""
         return to_multibase(self.codec.encode_multicodec(self.public_key), format)
@@ -161,6 +236,22 @@ class BaseKey(ABC):
             return False
         return self.public_key == other.public_key
 
+    def __hash__(self) -> int:
+        """Hash on the codec and public key, consistent with equality."""
+        return hash((self.codec, self.public_key))
+
+    def __setattr__(self, name: str, value):
+        """Reject attribute assignment, keys are immutable."""
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __delattr__(self, name: str):
+        """Reject attribute deletion, keys are immutable."""
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def __reduce__(self):
+        """Support pickling and copying of immutable keys."""
+        return (self.__class__, (self.public_key, self.ident, self.format))
+
     def __repr__(self) -> str:
         """Key representation."""
         return "<{} {}>".format(self.__class__.__name__, self.to_multibase())
@@ -169,14 +260,25 @@ class BaseKey(ABC):
 class Ed25519VerificationKey(BaseKey):
     """Ed25519 verification key."""
 
+    __slots__ = ()
+
     codec = Codec.ED25519
     key_length = ED25519_KEY_LENGTH
     relationships = [KeyRelationshipType.AUTHENTICATION]
+    base58_method_type = "Ed25519VerificationKey2018"
+    multibase_method_type = "Ed25519VerificationKey2020"
+    multibase_context = ED25519_2020_CONTEXT
 
     def verification_method(
         self, controller: Union[str, DID], format: KeyFormat = None, **extra
     ) -> VerificationMethodResult:
         """Generate a VerificationMethod entry for this key."""
+        from pydid.verification_method import (
+            Ed25519VerificationKey2018,
+            Ed25519VerificationKey2020,
+            JsonWebKey2020,
+        )
+
         method = None
         context = None
 
@@ -186,7 +288,7 @@ class Ed25519VerificationKey(BaseKey):
                 id=self.ident,
                 controller=controller,
                 public_key_base58=to_base58(self.public_key),
-                **extra
+                **extra,
             )
         elif format == KeyFormat.MULTIBASE:
             context = ED25519_2020_CONTEXT
@@ -196,7 +298,7 @@ class Ed25519VerificationKey(BaseKey):
                 public_key_multibase=to_multibase(
                     self.codec.encode_multicodec(self.public_key)
                 ),
-                **extra
+                **extra,
             )
         elif format == KeyFormat.JWK:
             context = JWS_2020_CONTEXT
@@ -213,14 +315,25 @@ class Ed25519VerificationKey(BaseKey):
 class X25519KeyAgreementKey(BaseKey):
     """X25519 public encryption key."""
 
+    __slots__ = ()
+
     codec = Codec.X25519
     key_length = X25519_KEY_LENGTH
     relationships = [KeyRelationshipType.KEY_AGREEMENT]
+    base58_method_type = "X25519KeyAgreementKey2019"
+    multibase_method_type = "X25519KeyAgreementKey2020"
+    multibase_context = X25519_2020_CONTEXT
 
     def verification_method(
         self, controller: Union[str, DID], format: KeyFormat = None, **extra
     ) -> VerificationMethodResult:
         """Generate a VerificationMethod entry for this key."""
+        from pydid.verification_method import (
+            JsonWebKey2020,
+            X25519KeyAgreementKey2019,
+            X25519KeyAgreementKey2020,
+        )
+
         method = None
         context = None
 
@@ -230,7 +343,7 @@ class X25519KeyAgreementKey(BaseKey):
                 id=self.ident,
                 controller=controller,
                 public_key_base58=to_base58(self.public_key),
-                **extra
+                **extra,
             )
         elif format == KeyFormat.MULTIBASE:
             context = X25519_2020_CONTEXT
@@ -240,7 +353,7 @@ class X25519KeyAgreementKey(BaseKey):
                 public_key_multibase=to_multibase(
                     self.codec.encode_multicodec(self.public_key)
                 ),
-                **extra
+                **extra,
             )
         elif format == KeyFormat.JWK:
             context = JWS_2020_CONTEXT
@@ -0,0 +1,179 @@
+"""Limits on untrusted Peer DIDs, checked before anything is decoded."""
+
+from __future__ import annotations
+
+import re
+
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from .core.utils import urlsafe_b64decode
+from .errors import PeerDIDErrorCode, ResolutionFailure
+
+if TYPE_CHECKING:
+    from pydid import DID
+
+    from .core.segments import PeerDIDSegment
+
+# JSON strings, including an unterminated one, are skipped in linear time
+_JSON_STRINGS = re.compile(r'"(?:[^"\\]|\\.)*"?')
+_JSON_STRUCTURE = re.compile(r"[\[\]{},]")
+
+
+class ResolverPolicy:
+    """
+    Size limits for Peer DIDs received from untrusted sources.
+
+    A Peer DID breaking a limit is rejected before its keys or service are
+    decoded: the length is checked before the grammar, the number of keys and
+    the service size on the split segments, and the number of services and the
+    nesting depth of the service JSON with a linear scan before it is parsed.
+    Every limit can be disabled with None.
+    """
+
+    def __init__(
+        self,
+        max_length: Optional[int] = 4096,
+        max_keys: Optional[int] = 16,
+        max_service_bytes: Optional[int] = 2048,
+        max_services: Optional[int] = 8,
+        max_service_depth: Optional[int] = 8,
+    ):
+        """Initializer.
+
+        :param max_length: maximum number of characters of a Peer DID
+        :param max_keys: maximum number of keys of a numalgo 2 Peer DID
+        :param max_service_bytes: maximum size of the decoded service JSON
+        :param max_services: maximum number of service entries
+        :param max_service_depth: maximum nesting depth of the service JSON
+        """
+        limits = {
+            "max_length": max_length,
+            "max_keys": max_keys,
+            "max_service_bytes": max_service_bytes,
+            "max_services": max_services,
+            "max_service_depth": max_service_depth,
+        }
+        for name, value in limits.items():
+            if value is not None and value < 0:
+                raise ValueError("Policy limit {} can not be negative".format(name))
+        self.max_length = max_length
+        self.max_keys = max_keys
+        self.max_service_bytes = max_service_bytes
+        self.max_services = max_services
+        self.max_service_depth = max_service_depth
+
+    def check_length(self, peer_did: Union[str, DID]) -> Optional[ResolutionFailure]:
+        """
+        Check the length of a Peer DID, in constant time.
+
+        :param peer_did: Peer DID to check, not validated yet
+        :return: the failure if the Peer DID is too long, otherwise None
+        """
+        if (
+            self.max_length is not None
+            and isinstance(peer_did, str)
+            and len(peer_did) > self.max_length
+        ):
+            return _limit_exceeded(
+                peer_did,
+                None,
+                0,
+                "Peer DID is longer than {} characters".format(self.max_length),
+            )
+        return None
+
+    def check_segments(
+        self, peer_did: Union[str, DID], segments: List[PeerDIDSegment]
+    ) -> Optional[ResolutionFailure]:
+        """
+        Check the keys and service of a Peer DID, in linear time.
+
+        :param peer_did: Peer DID to check, matching the Peer DID grammar
+        :param segments: segments of the Peer DID
+        :return: the failure if a limit is exceeded, otherwise None
+        """
+        service = segments[-1]
+        has_service = service.prefix == "S"
+        if self.max_keys is not None and len(segments) - has_service > self.max_keys:
+            return _limit_exceeded(
+                peer_did,
+                self.max_keys,
+                segments[self.max_keys].start,
+                "Peer DID has more than {} keys".format(self.max_keys),
+            )
+        if not has_service:
+            return None
+        index = len(segments) - 1
+        size = (service.end - service.start) * 3 // 4
+        if self.max_service_bytes is not None and size > self.max_service_bytes:
+            return _limit_exceeded(
+                peer_did,
+                index,
+                service.start,
+                "Service is larger than {} bytes".format(self.max_service_bytes),
+            )
+        if self.max_services is None and self.max_service_depth is None:
+            return None
+        try:
+            text = urlsafe_b64decode(peer_did[service.start : service.end])
+        except ValueError:
+            # reported as an invalid service once decoded
+            return None
+        services, depth = _json_shape(text.decode("utf-8", "replace"))
+        if self.max_services is not None and services > self.max_services:
+            return _limit_exceeded(
+                peer_did,
+                index,
+                service.start,
+                "Service has more than {} entries".format(self.max_services),
+            )
+        if self.max_service_depth is not None and depth > self.max_service_depth:
+            return _limit_exceeded(
+                peer_did,
+                index,
+                service.start,
+                "Service is nested deeper than {} levels".format(
+                    self.max_service_depth
+                ),
+            )
+        return None
+
+    def __repr__(self) -> str:
+        """Policy representation."""
+        return (
+            "ResolverPolicy(max_length={}, max_keys={}, max_service_bytes={}, "
+            "max_services={}, max_service_depth={})".format(
+                self.max_length,
+                self.max_keys,
+                self.max_service_bytes,
+                self.max_services,
+                self.max_service_depth,
+            )
+        )
+
+
+def _json_shape(text: str) -> Tuple[int, int]:
+    # number of top-level array items (1 for any other value) and nesting depth
+    structure = _JSON_STRUCTURE.findall(_JSON_STRINGS.sub("", text))
+    items = 1
+    depth = max_depth = 0
+    array = structure[:1] == ["["]
+    for token in structure:
+        if token == "[" or token == "{":
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        elif token == ",":
+            if array and depth == 1:
+                items += 1
+        else:
+            depth -= 1
+    return items, max_depth
+
+
+def _limit_exceeded(
+    peer_did: Union[str, DID], segment: Optional[int], offset: int, message: str
+) -> ResolutionFailure:
+    return ResolutionFailure(
+        peer_did, PeerDIDErrorCode.LIMIT_EXCEEDED, segment, offset, message
+    )
@@ -0,0 +1,278 @@
+"""Peer DID lookup by public key and grouping by service for message routing."""
+
+from __future__ import annotations
+
+import sys
+
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .core.peer_did_helper import (
+    SERVICE_ACCEPT,
+    SERVICE_DIDCOMM_MESSAGING,
+    SERVICE_ROUTING_KEYS,
+    Numalgo2Prefix,
+    decode_service_entries,
+)
+from .core.segments import checked_segments, segment_keys, split_peer_did
+from .errors import MalformedPeerDIDError, PeerDIDError
+from .instrumentation import Phase, timed
+from .keys import BaseKey, KeyFormat
+
+if TYPE_CHECKING:
+    from pydid import DID, DIDDocument
+
+K = TypeVar("K")
+
+# a key owned by a single DID maps to the DID itself, shared keys to a tuple
+Owners = Union[str, Tuple[str, ...]]
+
+DeliveryRoute = NamedTuple(
+    "DeliveryRoute",
+    [
+        ("endpoint", str),
+        ("routing_keys", Tuple[str, ...]),
+        ("accept", Tuple[str, ...]),
+    ],
+)
+
+DeliveryPlan = NamedTuple(
+    "DeliveryPlan",
+    [
+        ("groups", Dict[DeliveryRoute, List[str]]),
+        ("unroutable", List[str]),
+        ("errors", Dict[str, PeerDIDError]),
+    ],
+)
+
+
+class KeyIndex:
+    """
+    Reverse index from public keys and key identifiers to the Peer DIDs owning them.
+
+    Every key of an indexed Peer DID can be looked up in constant time by its
+    raw public key bytes, its multibase encoding or its `#xxxxxxxx` identifier,
+    alone or as a DID URL. Keys are decoded from the Peer DID itself, so the
+    index only holds the public key bytes, the identifiers and one shared string
+    per DID. Removing a DID decodes it again instead of keeping its keys around.
+    """
+
+    def __init__(self, peer_dids: Iterable[Union[str, DID, DIDDocument, dict]] = ()):
+        """
+        Initializer.
+
+        :param peer_dids: Peer DIDs or resolved DID Documents to index
+        """
+        self._dids = set()
+        self._by_key: Dict[bytes, Owners] = {}
+        self._by_ident: Dict[str, Owners] = {}
+        self.update(peer_dids)
+
+    def add(self, peer_did: Union[str, DID, DIDDocument, dict]):
+        """
+        Index the keys of a Peer DID.
+
+        :param peer_did: Peer DID, or DID Document resolved from a Peer DID
+        :raises MalformedPeerDIDError: if the Peer DID is malformed
+        """
+        peer_did = _peer_did_of(peer_did)
+        if peer_did in self._dids:
+            return
+        keys = list(_decode_keys(peer_did))
+        peer_did = sys.intern(peer_did)
+        for key in keys:
+            _add_owner(self._by_key, key.public_key, peer_did)
+            _add_owner(self._by_ident, key.ident, peer_did)
+        self._dids.add(peer_did)
+
+    def update(self, peer_dids: Iterable[Union[str, DID, DIDDocument, dict]]):
+        """Index the keys of several Peer DIDs."""
+        for peer_did in peer_dids:
+            self.add(peer_did)
+
+    def remove(self, peer_did: Union[str, DID, DIDDocument, dict]):
+        """
+        Remove the keys of a Peer DID from the index.
+
+        :param peer_did: Peer DID, or DID Document resolved from a Peer DID
+        :raises KeyError: if the Peer DID is not indexed
+        """
+        peer_did = _peer_did_of(peer_did)
+        if peer_did not in self._dids:
+            raise KeyError(peer_did)
+        for key in _decode_keys(peer_did):
+            _remove_owner(self._by_key, key.public_key, peer_did)
+            _remove_owner(self._by_ident, key.ident, peer_did)
+        self._dids.remove(peer_did)
+
+    def discard(self, peer_did: Union[str, DID, DIDDocument, dict]):
+        """Remove the keys of a Peer DID from the index if it is indexed."""
+        if _peer_did_of(peer_did) in self._dids:
+            self.remove(peer_did)
+
+    def lookup(self, key: Union[bytes, str, BaseKey]) -> Tuple[str, ...]:
+        """
+        Find the Peer DIDs owning a key.
+
+        :param key: raw public key bytes, a BaseKey, a multibase-encoded key,
+            a `#xxxxxxxx` key identifier, or a DID URL with such a fragment
+        :raises ValueError: if a multibase-encoded key can not be decoded
+        :return: the owning Peer DIDs, empty if the key is unknown
+        """
+        if isinstance(key, BaseKey):
+            return _owners(self._by_key.get(key.public_key))
+        if isinstance(key, (bytes, bytearray, memoryview)):
+            return _owners(self._by_key.get(bytes(key)))
+        if key.startswith("#"):
+            return _owners(self._by_ident.get(key))
+        did, sep, fragment = key.partition("#")
+        if sep:
+            # a DID URL: the key must belong to that DID
+            owners = _owners(self._by_ident.get("#" + fragment))
+            return (did,) if did in owners else ()
+        return _owners(self._by_key.get(BaseKey.from_multibase(key).public_key))
+
+    def __contains__(self, peer_did: object) -> bool:
+        """Check if a Peer DID is indexed."""
+        return peer_did in self._dids
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the indexed Peer DIDs."""
+        return iter(self._dids)
+
+    def __len__(self) -> int:
+        """Get the number of indexed Peer DIDs."""
+        return len(self._dids)
+
+
+def _peer_did_of(value: Union[str, DID, DIDDocument, dict]) -> str:
+    if isinstance(value, dict):
+        value = value["id"]
+    elif not isinstance(value, str):
+        value = value.id
+    return str(value)
+
+
+def _decode_keys(peer_did: str) -> List[BaseKey]:
+    return segment_keys(peer_did, checked_segments(peer_did), KeyFormat.MULTIBASE)
+
+
+def _owners(owners: Optional[Owners]) -> Tuple[str, ...]:
+    if owners is None:
+        return ()
+    if isinstance(owners, str):
+        return (owners,)
+    return owners
+
+
+def _add_owner(index: Dict[K, Owners], key: K, peer_did: str):
+    owners = index.get(key)
+    if owners is None:
+        index[key] = peer_did
+    elif peer_did not in _owners(owners):
+        index[key] = _owners(owners) + (peer_did,)
+
+
+def _remove_owner(index: Dict[K, Owners], key: K, peer_did: str):
+    owners = _owners(index.get(key))
+    if peer_did not in owners:
+        return
+    remaining = tuple(owner for owner in owners if owner != peer_did)
+    if not remaining:
+        del index[key]
+    elif len(remaining) == 1:
+        index[key] = remaining[0]
+    else:
+        index[key] = remaining
+
+
+def plan_delivery(
+    peer_dids: Iterable[Union[str, DID]],
+    service_type: str = SERVICE_DIDCOMM_MESSAGING,
+) -> DeliveryPlan:
+    """
+    Group Peer DIDs by the service endpoint messages to them are delivered to.
+
+    Only the service segment of every Peer DID is decoded, never its keys, and
+    each distinct service segment is decoded once: all the DIDs behind the same
+    mediator share the same segment. The first service of the given type with a
+    URI endpoint is used, either a string or the `uri` of an endpoint object,
+    whose `routingKeys` and `accept` take precedence over those of the service.
+
+    :param peer_dids: Peer DIDs to group
+    :param service_type: type of the services to deliver to
+    :return: the Peer DIDs grouped by (endpoint, routing keys, accept) in input
+        order, the Peer DIDs without a usable service, and the malformed Peer DIDs
+        with their error
+    """
+    plan = DeliveryPlan({}, [], {})
+    routes: Dict[str, Union[DeliveryRoute, PeerDIDError, None]] = {}
+    for peer_did in peer_dids:
+        peer_did = str(peer_did)
+        parts = timed(Phase.VALIDATE, split_peer_did, peer_did)
+        if parts is None:
+            plan.errors[peer_did] = MalformedPeerDIDError(
+                "Does not match peer DID regexp"
+            )
+            continue
+        if peer_did[9] == "0" or parts[-1][0] != Numalgo2Prefix.SERVICE.value:
+            plan.unroutable.append(peer_did)
+            continue
+        service = parts[-1][1:]
+        if service in routes:
+            route = routes[service]
+        else:
+            try:
+                route = _delivery_route(decode_service_entries(service), service_type)
+            except PeerDIDError as e:
+                route = e
+            routes[service] = route
+        if route is None:
+            plan.unroutable.append(peer_did)
+        elif isinstance(route, PeerDIDError):
+            plan.errors[peer_did] = route
+        else:
+            plan.groups.setdefault(route, []).append(peer_did)
+    return plan
+
+
+def _delivery_route(entries: List[dict], service_type: str) -> Optional[DeliveryRoute]:
+    for entry in entries:
+        if entry["type"] != service_type:
+            continue
+        endpoint = entry["service_endpoint"]
+        routing_keys = entry.get(SERVICE_ROUTING_KEYS)
+        accept = entry.get(SERVICE_ACCEPT)
+        if isinstance(endpoint, list):
+            endpoint = endpoint[0] if endpoint else None
+        if isinstance(endpoint, dict):
+            routing_keys = endpoint.get(SERVICE_ROUTING_KEYS, routing_keys)
+            accept = endpoint.get(SERVICE_ACCEPT, accept)
+            endpoint = endpoint.get("uri")
+        routing_keys = _strings(routing_keys)
+        accept = _strings(accept)
+        if (
+            isinstance(endpoint, str)
+            and routing_keys is not None
+            and accept is not None
+        ):
+            return DeliveryRoute(endpoint, routing_keys, accept)
+    return None
+
+
+def _strings(value: object) -> Optional[Tuple[str, ...]]:
+    if value is None:
+        return ()
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return tuple(value)
+    return None
@@ -0,0 +1,70 @@
+import asyncio
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.dids import aresolve_many, aresolve_peer_did, resolve_peer_did
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_BASE58,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+)
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+def test_aresolve_peer_did():
+    did_doc = asyncio.run(aresolve_peer_did(PEER_DID_NUMALGO_2, KeyFormat.BASE58))
+    assert did_doc == DIDDocument.from_json(DID_DOC_NUMALGO_2_BASE58)
+
+
+def test_aresolve_peer_did_malformed():
+    with pytest.raises(MalformedPeerDIDError):
+        asyncio.run(aresolve_peer_did("did:peer:1z6Mkq"))
+
+
+def test_aresolve_peer_did_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        did_doc = asyncio.run(aresolve_peer_did(PEER_DID_NUMALGO_0, executor=executor))
+    assert did_doc == resolve_peer_did(PEER_DID_NUMALGO_0)
+
+
+def test_aresolve_many():
+    peer_dids = [PEER_DID_NUMALGO_0, "did:peer:2.Ez6L", PEER_DID_NUMALGO_2] * 3
+    results = asyncio.run(_collect(aresolve_many(peer_dids, concurrency=2)))
+    assert len(results) == len(peer_dids)
+    for peer_did, result in results:
+        if peer_did == "did:peer:2.Ez6L":
+            assert isinstance(result, MalformedPeerDIDError)
+        else:
+            assert result == resolve_peer_did(peer_did)
+
+
+def test_aresolve_many_async_iterable_backpressure():
+    pulled = []
+    consumed = []
+
+    async def source():
+        for peer_did in [PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_2_SERVICES] * 5:
+            pulled.append(peer_did)
+            assert len(pulled) - len(consumed) <= 3
+            yield peer_did
+
+    async def run():
+        async for item in aresolve_many(source(), concurrency=3):
+            consumed.append(item)
+
+    asyncio.run(run())
+    assert len(consumed) == 10
+
+
+def test_aresolve_many_invalid_concurrency():
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(aresolve_many([PEER_DID_NUMALGO_0], concurrency=0)))
@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.__main__ import main
+from benchmarks.runner import compare, measure, run
+from benchmarks.scenarios import SCENARIOS
+
+
+def test_scenarios_run():
+    for fn in SCENARIOS.values():
+        fn()
+
+
+def test_measure():
+    result = measure(lambda: None, samples=3, sample_time=0.001)
+    assert result.samples == 3 and result.loops >= 1
+    assert result.p50 <= result.p90 <= result.p99
+    assert result.ops_per_sec > 0
+
+
+def test_compare():
+    baseline = run({"a": lambda: None, "b": lambda: None}, 3, 0.001)
+    current = json.loads(json.dumps(baseline))
+    current["results"]["a"]["p50"] = baseline["results"]["a"]["p50"] * 2
+    current["results"]["c"] = current["results"]["b"]
+    comparisons = {c.name: c for c in compare(baseline, current)}
+    assert set(comparisons) == {"a", "b"}
+    assert comparisons["a"].regression and not comparisons["b"].regression
+
+
+def test_main(tmp_path, capsys):
+    output = str(tmp_path / "results.json")
+    argv = ["-k", "to_multibase", "--samples", "2", "--sample-time", "0.001"]
+    assert main(argv + ["-o", output]) == 0
+    with open(output) as f:
+        assert list(json.load(f)["results"]) == ["to_multibase"]
+    assert main(argv + ["-b", output, "--threshold", "100"]) == 0
+    assert "to_multibase" in capsys.readouterr().out
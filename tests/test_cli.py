@@ -0,0 +1,128 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from peerdid.cli import main
+from peerdid.dids import resolve_peer_did_dict
+from peerdid.keys import KeyFormat
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+INVALID_PEER_DID = "did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od"
+
+
+def _run(argv, stdin, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+    status = main(argv)
+    return status, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+def test_resolve(format, monkeypatch, capsys):
+    status, records = _run(
+        ["resolve", "--format", format.name.lower()],
+        "{}\n\n{}\n".format(
+            PEER_DID_NUMALGO_0, json.dumps({"did": PEER_DID_NUMALGO_2})
+        ),
+        monkeypatch,
+        capsys,
+    )
+    assert status == 0
+    assert records == [
+        {
+            "did": peer_did,
+            "didDocument": resolve_peer_did_dict(peer_did, format),
+        }
+        for peer_did in (PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2)
+    ]
+
+
+def test_validate(monkeypatch, capsys):
+    status, records = _run(
+        ["validate"],
+        "\n".join([PEER_DID_NUMALGO_2, INVALID_PEER_DID, '{"id": 1}']),
+        monkeypatch,
+        capsys,
+    )
+    assert status == 1
+    assert records[0] == {"did": PEER_DID_NUMALGO_2, "valid": True}
+    assert records[1]["did"] == INVALID_PEER_DID
+    assert records[1]["valid"] is False
+    assert "Does not match peer DID regexp" in records[1]["error"]
+    assert records[2]["input"] == '{"id": 1}'
+
+
+def test_create(monkeypatch, capsys):
+    specs = [
+        {"inceptionKey": "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"},
+        {
+            "encryptionKeys": ["z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"],
+            "signingKeys": ["z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"],
+            "service": None,
+        },
+        {"signingKeys": ["z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"]},
+    ]
+    status, records = _run(
+        ["create"], "\n".join(map(json.dumps, specs)), monkeypatch, capsys
+    )
+    assert status == 1
+    assert records[0] == {"did": PEER_DID_NUMALGO_0}
+    assert records[1] == {
+        "did": "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+        ".Vz6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+    }
+    assert "Authentication not supported" in records[2]["error"]
+
+
+def test_create_invalid_service(monkeypatch, capsys):
+    spec = {"encryptionKeys": ["z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"]}
+    lines = [
+        json.dumps(spec),
+        json.dumps(dict(spec, service=[1])),
+        json.dumps(dict(spec, service=[{"t": "dm"}, "x"])),
+        json.dumps(spec),
+    ]
+    status, records = _run(["create"], "\n".join(lines), monkeypatch, capsys)
+    assert status == 1
+    did = "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+    assert records == [
+        {"did": did},
+        {"input": lines[1], "error": "Service is not valid JSON"},
+        {"input": lines[2], "error": "Service is not valid JSON"},
+        {"did": did},
+    ]
+
+
+def test_files_and_jobs(tmp_path):
+    inputs = []
+    for i, peer_did in enumerate([PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2]):
+        path = tmp_path / "in{}.txt".format(i)
+        path.write_text((peer_did + "\n") * 5 + INVALID_PEER_DID + "\n")
+        inputs.append(str(path))
+    output = tmp_path / "out.ndjson"
+    result = subprocess.run(
+        [sys.executable, "-m", "peerdid", "validate", "-j", "2", "--chunksize", "2"]
+        + inputs
+        + ["-o", str(output)],
+        capture_output=True,
+    )
+    assert result.returncode == 1
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["did"] for r in records] == (
+        [PEER_DID_NUMALGO_0] * 5
+        + [INVALID_PEER_DID]
+        + [PEER_DID_NUMALGO_2] * 5
+        + [INVALID_PEER_DID]
+    )
+    assert [r["valid"] for r in records].count(False) == 2
+
+
+def test_invalid_arguments(capsys):
+    with pytest.raises(SystemExit):
+        main(["resolve", "--jobs", "-1"])
+    with pytest.raises(SystemExit):
+        main(["resolve", "--format", "pem"])
+    with pytest.raises(SystemExit):
+        main([])
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from peerdid.dids import create_peer_did_numalgo_0, create_peer_dids_numalgo_0
+from peerdid.keys import Ed25519VerificationKey
+
+np = pytest.importorskip("numpy")
+
+
+def test_create_peer_dids_numalgo_0_matches_create_peer_did_numalgo_0():
+    rnd = random.Random(0)
+    public_keys = np.array(
+        [[rnd.getrandbits(8) for _ in range(32)] for _ in range(100)],
+        dtype=np.uint8,
+    )
+    public_keys[1] = 0
+    public_keys[2] = 255
+    assert create_peer_dids_numalgo_0(public_keys) == [
+        create_peer_did_numalgo_0(Ed25519VerificationKey(key.tobytes()))
+        for key in public_keys
+    ]
+
+
+def test_create_peer_dids_numalgo_0_readme_key():
+    key = Ed25519VerificationKey.from_base58(
+        "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7"
+    )
+    public_keys = np.frombuffer(key.public_key, dtype=np.uint8).reshape(1, 32)
+    assert create_peer_dids_numalgo_0(public_keys) == [
+        "did:peer:0z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+    ]
+    assert create_peer_dids_numalgo_0(np.empty((0, 32), dtype=np.uint8)) == []
+
+
+@pytest.mark.parametrize(
+    "public_keys",
+    [
+        np.zeros((2, 31), dtype=np.uint8),
+        np.zeros((2, 32), dtype=np.int64),
+        np.zeros(32, dtype=np.uint8),
+    ],
+)
+def test_create_peer_dids_numalgo_0_invalid_array(public_keys):
+    with pytest.raises(ValueError, match=r"Expected an array of shape \(N, 32\)"):
+        create_peer_dids_numalgo_0(public_keys)
@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+import peerdid.dids
+from peerdid.dids import (
+    _create_numalgo_2_chunk,
+    _raw_numalgo_2_item,
+    create_peer_did_numalgo_2,
+    create_peer_dids_numalgo_2,
+)
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from tests.test_create_peer_did_numalgo_2 import (
+    VALID_ED25519_VERIFICATION_KEY_2018_1,
+    VALID_ED25519_VERIFICATION_KEY_2020_1,
+    VALID_ED25519_VERIFICATION_KEY_2020_2,
+    VALID_SERVICE,
+    VALID_X25519_KEY_AGREEMENT_KEY_2019,
+    VALID_X25519_KEY_AGREEMENT_KEY_2020,
+    VALID_X25519_KEY_AGREEMENT_KEY_JWK,
+)
+
+BATCH = [
+    (
+        [VALID_X25519_KEY_AGREEMENT_KEY_2019],
+        [VALID_ED25519_VERIFICATION_KEY_2018_1],
+        VALID_SERVICE,
+    ),
+    (
+        [VALID_X25519_KEY_AGREEMENT_KEY_2020, VALID_X25519_KEY_AGREEMENT_KEY_JWK],
+        [VALID_ED25519_VERIFICATION_KEY_2020_1, VALID_ED25519_VERIFICATION_KEY_2020_2],
+        None,
+    ),
+    (
+        [VALID_ED25519_VERIFICATION_KEY_2020_1],
+        [VALID_ED25519_VERIFICATION_KEY_2020_2],
+        None,
+    ),
+    (
+        [VALID_X25519_KEY_AGREEMENT_KEY_2020],
+        [VALID_ED25519_VERIFICATION_KEY_2020_1],
+        [{"type": "DIDCommMessaging", "serviceEndpoint": "https://example.com"}],
+    ),
+    ([VALID_X25519_KEY_AGREEMENT_KEY_2020], [], 42),
+    ([VALID_X25519_KEY_AGREEMENT_KEY_2020], ["z6MkqRYqQ"], None),
+    ([VALID_X25519_KEY_AGREEMENT_KEY_2020], [VALID_ED25519_VERIFICATION_KEY_2020_1]),
+    (
+        [VALID_X25519_KEY_AGREEMENT_KEY_JWK],
+        [VALID_ED25519_VERIFICATION_KEY_2020_2],
+        VALID_SERVICE,
+    ),
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_create_peer_dids_numalgo_2_in_order_with_errors(workers):
+    results = create_peer_dids_numalgo_2(BATCH, workers=workers, chunksize=3)
+    assert len(results) == len(BATCH)
+    for item, result in zip(BATCH, results):
+        try:
+            expected = create_peer_did_numalgo_2(*item)
+        except (AttributeError, TypeError, ValueError) as e:
+            assert isinstance(result, ValueError)
+            if isinstance(e, ValueError):
+                assert str(result) == str(e)
+        else:
+            assert type(result) is str
+            assert result == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("service", [[1], [{"t": "dm"}, "x"], '[{"t": "dm"}, 1]'])
+def test_create_peer_dids_numalgo_2_non_object_service_entry(workers, service):
+    batch = [BATCH[0], ([VALID_X25519_KEY_AGREEMENT_KEY_2020], [], service), BATCH[7]]
+    results = create_peer_dids_numalgo_2(batch, workers=workers, chunksize=3)
+    assert results[0] == create_peer_did_numalgo_2(*BATCH[0])
+    assert isinstance(results[1], ValueError)
+    assert str(results[1]) == "Service is not valid JSON"
+    assert results[2] == create_peer_did_numalgo_2(*BATCH[7])
+    with pytest.raises(ValueError, match="Service is not valid JSON"):
+        create_peer_did_numalgo_2(*batch[1])
+
+
+def test_create_peer_dids_numalgo_2_sends_raw_key_bytes():
+    item = _raw_numalgo_2_item(BATCH[0])
+    assert item == (
+        [b"\xec\x01" + VALID_X25519_KEY_AGREEMENT_KEY_2019.public_key],
+        [b"\xed\x01" + VALID_ED25519_VERIFICATION_KEY_2018_1.public_key],
+        VALID_SERVICE,
+    )
+    assert isinstance(_raw_numalgo_2_item(BATCH[5]), ValueError)
+
+
+def test_create_peer_dids_numalgo_2_encodes_each_service_once_per_chunk():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        results = _create_numalgo_2_chunk(
+            [_raw_numalgo_2_item(BATCH[0]), _raw_numalgo_2_item(BATCH[7])] * 5
+        )
+    assert results[:2] == [create_peer_did_numalgo_2(*BATCH[i]) for i in (0, 7)]
+    assert metrics.snapshot()[Phase.SERVICE_ENCODE].count == 1
+
+
+def test_create_peer_dids_numalgo_2_encodes_each_service_object_once():
+    service = json.loads(VALID_SERVICE)
+    batch = [BATCH[0][:2] + (service,)] * 5 + [BATCH[0][:2] + (dict(service),)]
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        results = create_peer_dids_numalgo_2(batch, workers=1)
+    assert results == [create_peer_did_numalgo_2(*BATCH[0])] * 6
+    assert metrics.snapshot()[Phase.SERVICE_ENCODE].count == 2
+
+
+def test_create_peer_dids_numalgo_2_single_worker_in_process(monkeypatch):
+    def map_chunks(*args, **kwargs):
+        raise AssertionError("no pool with a single worker")
+
+    monkeypatch.setattr(peerdid.dids, "map_chunks", map_chunks)
+    assert create_peer_dids_numalgo_2(BATCH[:1], workers=1) == [
+        create_peer_did_numalgo_2(*BATCH[0])
+    ]
+
+
+@pytest.mark.parametrize(
+    "services",
+    [
+        [[], "[]"],
+        [None, "null"],
+        [VALID_SERVICE, json.loads(VALID_SERVICE)],
+        [{"t": "dm", "s": "x"}, [{"t": "dm", "s": "x"}], ({"t": "dm", "s": "x"},)],
+    ],
+)
+def test_create_peer_dids_numalgo_2_services_with_the_same_json(services):
+    batch = [
+        ([VALID_X25519_KEY_AGREEMENT_KEY_2020], [], service) for service in services
+    ]
+    for item, result in zip(batch, create_peer_dids_numalgo_2(batch, workers=1)):
+        try:
+            expected = create_peer_did_numalgo_2(*item)
+        except ValueError as e:
+            assert isinstance(result, ValueError)
+            assert str(result) == str(e)
+        else:
+            assert result == expected
+
+
+def test_create_peer_dids_numalgo_2_empty():
+    assert create_peer_dids_numalgo_2([], workers=2) == []
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+import pytest
+
+import peerdid
+from benchmarks.runner import measure_import
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout.split()
+
+
+def test_pydid_not_imported():
+    loaded = _run(
+        "import sys\n"
+        "import peerdid\n"
+        "from peerdid.dids import create_peer_did_numalgo_0, is_peer_did\n"
+        "from peerdid.dids import resolve_peer_did_json\n"
+        "from peerdid.keys import Ed25519VerificationKey\n"
+        "key = Ed25519VerificationKey.from_base58(\n"
+        "    'ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7'\n"
+        ")\n"
+        "peer_did = create_peer_did_numalgo_0(key)\n"
+        "assert is_peer_did(peer_did)\n"
+        "resolve_peer_did_json(peer_did)\n"
+        "print(*sorted(\n"
+        "    m for m in ('asyncio', 'pydantic', 'pydid') if m in sys.modules\n"
+        "))\n"
+    )
+    assert loaded == []
+
+
+def test_pydid_imported_on_first_use():
+    loaded = _run(
+        "import sys\n"
+        "from peerdid.dids import resolve_peer_did\n"
+        "resolve_peer_did('did:peer:0z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V')\n"
+        "print('pydid' in sys.modules)\n"
+    )
+    assert loaded == ["True"]
+
+
+def test_lazy_attributes():
+    from pydid import DID, DIDDocument, DIDUrl, Service, VerificationMethod
+
+    assert peerdid.DID is DID
+    assert peerdid.DIDDocument is DIDDocument
+    assert peerdid.documents.LazyPeerDIDDocument
+    assert peerdid.dids.DIDUrl is DIDUrl
+    assert peerdid.keys.VerificationMethod is VerificationMethod
+    assert peerdid.core.peer_did_helper.Service is Service
+    with pytest.raises(AttributeError):
+        peerdid.missing
+    with pytest.raises(AttributeError):
+        peerdid.dids.missing
+
+
+def test_measure_import():
+    result = measure_import("peerdid.errors", samples=2)
+    assert result.samples == 2 and result.loops == 1
+    assert 0 < result.p50 <= result.p99
@@ -0,0 +1,100 @@
+import pytest
+
+from pydid import DIDDocument, DIDUrl
+
+from peerdid.dids import resolve_peer_did
+from peerdid.documents import (
+    RELATIONSHIPS,
+    IndexedPeerDIDDocument,
+    resolve_peer_did_indexed,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat, KeyRelationshipType
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+        PEER_DID_NUMALGO_2_2_SERVICES,
+        PEER_DID_NUMALGO_2_NO_SERVICES,
+    ],
+)
+def test_indexed_document_matches_linear_lookups(peer_did, format, trusted):
+    expected = resolve_peer_did(peer_did, format)
+    did_doc = resolve_peer_did_indexed(peer_did, format, trusted=trusted)
+    assert did_doc.document == expected
+    assert did_doc.id == expected.id
+    assert did_doc.serialize() == expected.serialize()
+    assert did_doc.to_json() == expected.to_json()
+    for method in expected.verification_method:
+        assert did_doc.method(method.id) == method
+        assert did_doc.method(str(method.id)) == method
+        assert did_doc.method(peer_did + method.id) == expected.dereference(
+            peer_did + method.id
+        )
+    for member in RELATIONSHIPS:
+        assert did_doc.methods(member) == tuple(
+            expected.dereference(ref) for ref in getattr(expected, member) or ()
+        )
+    services = did_doc.services("DIDCommMessaging")
+    assert list(services) == [
+        s for s in expected.service or () if s.type == "DIDCommMessaging"
+    ]
+
+
+def test_indexed_document_helpers():
+    did_doc = resolve_peer_did_indexed(PEER_DID_NUMALGO_2)
+    assert did_doc.encryption_key().id == "#6LSbysY2"
+    assert did_doc.signing_key().id == "#6MkqRYqQ"
+    assert did_doc.methods(KeyRelationshipType.KEY_AGREEMENT) == did_doc.methods(
+        "key_agreement"
+    )
+    assert [m.id for m in did_doc.methods(KeyRelationshipType.AUTHENTICATION)] == [
+        "#6MkqRYqQ",
+        "#6MkgoLTn",
+    ]
+    assert did_doc.method("#unknown") is None
+    assert did_doc.method("did:peer:2.Ez6LSother#6MkqRYqQ") is None
+    assert did_doc.services("unknown") == ()
+    with pytest.raises(ValueError, match="Unknown verification relationship"):
+        did_doc.methods("keyAgreement")
+    # other attributes are served by the DID Document
+    assert did_doc.context == did_doc.document.context
+    assert did_doc.verification_method == did_doc.document.verification_method
+
+    numalgo_0 = resolve_peer_did_indexed(PEER_DID_NUMALGO_0)
+    assert numalgo_0.encryption_key() is None
+    assert numalgo_0.signing_key().id == "#6MkqRYqQ"
+    assert numalgo_0.services("DIDCommMessaging") == ()
+
+
+def test_indexed_document_embedded_methods():
+    document = resolve_peer_did(PEER_DID_NUMALGO_2)
+    method = document.verification_method[0]
+    embedded = DIDDocument.construct(
+        id=document.id,
+        verification_method=None,
+        authentication=[DIDUrl.parse("#6MkqRYqQ")],
+        key_agreement=[method],
+        service=[],
+    )
+    did_doc = IndexedPeerDIDDocument(embedded)
+    assert did_doc.encryption_key() is method
+    assert did_doc.method("#6LSbysY2") is method
+    # references to unknown methods are skipped
+    assert did_doc.signing_key() is None
+
+
+def test_resolve_peer_did_indexed_malformed():
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did_indexed("did:peer:2.Vz6Mkq")
@@ -0,0 +1,101 @@
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_0,
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import (
+    Phase,
+    PhaseMetrics,
+    get_listener,
+    instrumented,
+    set_listener,
+    timed,
+)
+from peerdid.keys import Ed25519VerificationKey, X25519KeyAgreementKey
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+
+def test_resolve_phases():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+    stats = metrics.snapshot()
+    assert {phase: s.count for phase, s in stats.items()} == {
+        Phase.VALIDATE: 1,
+        Phase.MULTIBASE_DECODE: 3,
+        Phase.MULTICODEC_DECODE: 3,
+        Phase.SERVICE_DECODE: 1,
+        Phase.SERVICE_MODEL: 1,
+        Phase.VERIFICATION_METHOD: 3,
+        Phase.BUILD: 1,
+    }
+    for s in stats.values():
+        assert 0 <= s.min <= s.max <= s.total
+
+
+def test_resolve_json_phases():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        resolve_peer_did_json(PEER_DID_NUMALGO_0)
+    assert set(metrics.snapshot()) == {
+        Phase.VALIDATE,
+        Phase.MULTIBASE_DECODE,
+        Phase.MULTICODEC_DECODE,
+        Phase.VERIFICATION_METHOD,
+    }
+
+
+def test_create_phases():
+    metrics = PhaseMetrics()
+    signing_key = Ed25519VerificationKey.from_base58(
+        "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7"
+    )
+    encryption_key = X25519KeyAgreementKey.from_base58(
+        "DmgBSHMqaZiYqwNMEJJuxWzsGGC8jUYADrfSdBrC6L8s"
+    )
+    with instrumented(metrics):
+        create_peer_did_numalgo_0(signing_key)
+        create_peer_did_numalgo_2(
+            [encryption_key],
+            [signing_key],
+            {"type": "DIDCommMessaging", "serviceEndpoint": "https://example.com"},
+        )
+    stats = metrics.snapshot()
+    assert stats[Phase.KEY_ENCODE].count == 3
+    assert stats[Phase.SERVICE_ENCODE].count == 1
+    assert stats[Phase.VALIDATE].count == 1
+
+
+def test_failed_phase_is_reported():
+    events = []
+    with instrumented(lambda phase, duration: events.append(phase)):
+        with pytest.raises(MalformedPeerDIDError):
+            resolve_peer_did(
+                "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc.SeyJ"
+            )
+    assert events[-1] == Phase.SERVICE_DECODE
+
+
+def test_listener_restored():
+    metrics = PhaseMetrics()
+    assert get_listener() is None
+    with instrumented(metrics):
+        assert get_listener() is metrics
+        resolve_peer_did(PEER_DID_NUMALGO_0)
+    assert get_listener() is None
+    resolve_peer_did(PEER_DID_NUMALGO_0)
+    assert metrics.snapshot()[Phase.BUILD].count == 1
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_timed_disabled_calls_through():
+    previous = set_listener(None)
+    try:
+        assert timed(Phase.BUILD, max, 1, 2) == 2
+    finally:
+        set_listener(previous)
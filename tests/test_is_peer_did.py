@@ -0,0 +1,92 @@
+import random
+import time
+
+import pytest
+
+from peerdid.core.segments import PeerDIDSegment, tokenize_peer_did
+from peerdid.dids import PEER_DID_PATTERN, is_peer_did
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+VALID = [
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc",
+    "did:peer:2.Az1.Dz2.Iz3.Vz4.Ez5.S",
+    "did:peer:2.Vz6Mkq.SeyJ0IjoiZG0ifQ",
+]
+
+INVALID = [
+    None,
+    "",
+    "did:peer:",
+    "did:peer:0",
+    "did:peer:0z",
+    "did:peer:1z6MkqRYqQ",
+    "did:peer:0a6MkqRYqQ",
+    "did:peer:0z6Mkq0RYqQ",
+    "did:peer:0z6Mkq.Vz6Mkq",
+    "did:peer:2",
+    "did:peer:2.",
+    "did:peer:2.S",
+    "did:peer:2.SeyJ0IjoiZG0ifQ",
+    "did:peer:2.Vz6Mkq.",
+    "did:peer:2.Vz6Mkq..Ez6LS",
+    "did:peer:2.Vz",
+    "did:peer:2.V6Mkq",
+    "did:peer:2.Xz6Mkq",
+    "did:peer:2.Vz6Mkq.Sabc.Ez6LS",
+    "did:peer:2.Vz6Mkq.Sab-c",
+    "did:peer:2.Vz6Mkq.S.S",
+    "did:peer:2Vz6Mkq",
+    "did:peer:0z6MkqRYqQ\n",
+    "did:peer:2.Vz6Mkq.Sabc\n",
+    "xdid:peer:0z6Mkq",
+]
+
+
+@pytest.mark.parametrize("peer_did", VALID)
+def test_is_peer_did_valid(peer_did):
+    assert is_peer_did(peer_did)
+
+
+@pytest.mark.parametrize("peer_did", INVALID)
+def test_is_peer_did_invalid(peer_did):
+    assert not is_peer_did(peer_did)
+
+
+def test_tokenize_peer_did_segments():
+    peer_did = "did:peer:2.Ez6LS.Vz6Mkq.SeyJ0"
+    assert tokenize_peer_did(peer_did) == [
+        PeerDIDSegment("E", 12, 16),
+        PeerDIDSegment("V", 18, 23),
+        PeerDIDSegment("S", 25, 29),
+    ]
+    assert tokenize_peer_did(PEER_DID_NUMALGO_0) == [
+        PeerDIDSegment("", 10, len(PEER_DID_NUMALGO_0))
+    ]
+
+
+def test_tokenize_peer_did_matches_pattern():
+    rnd = random.Random(11)
+    alphabet = "did:peer:02.AEVIDSXz16lO0aZ-_"
+    for _ in range(20000):
+        peer_did = "did:peer:" + "".join(
+            rnd.choice(alphabet) for _ in range(rnd.randint(0, 14))
+        )
+        assert is_peer_did(peer_did) == bool(PEER_DID_PATTERN.match(peer_did))
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        "did:peer:2.Ez" + "a" * 1_000_000 + "!",
+        "did:peer:2" + ".Ez6" * 250_000 + "!",
+        "did:peer:2" + ".Ez6" * 100_000 + ".S" + "a" * 500_000 + "-",
+        "did:peer:0z" + "6" * 1_000_000 + ".",
+    ],
+    ids=["long-key", "many-keys", "long-service", "numalgo-0"],
+)
+def test_is_peer_did_adversarial_linear(peer_did):
+    start = time.perf_counter()
+    assert not is_peer_did(peer_did)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,82 @@
+import pytest
+
+from peerdid.dids import (
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+    resolve_peer_did_dict,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import Ed25519VerificationKey, X25519KeyAgreementKey
+from peerdid.routing import KeyIndex
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+ENCRYPTION_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+SIGNING_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+PEER_DID = "did:peer:2.E{}.V{}".format(ENCRYPTION_KEY, SIGNING_KEY)
+
+
+def test_lookup():
+    index = KeyIndex([PEER_DID, PEER_DID_NUMALGO_0])
+    key = X25519KeyAgreementKey.from_multibase(ENCRYPTION_KEY)
+    assert index.lookup(ENCRYPTION_KEY) == (PEER_DID,)
+    assert index.lookup(key) == (PEER_DID,)
+    assert index.lookup(key.public_key) == (PEER_DID,)
+    assert index.lookup(bytearray(key.public_key)) == (PEER_DID,)
+    assert index.lookup("#6LSbysY2") == (PEER_DID,)
+    assert index.lookup(PEER_DID + "#6LSbysY2") == (PEER_DID,)
+    assert index.lookup(PEER_DID_NUMALGO_0 + "#6LSbysY2") == ()
+    assert set(index.lookup(SIGNING_KEY)) == {PEER_DID, PEER_DID_NUMALGO_0}
+    assert index.lookup("#unknown") == ()
+    assert index.lookup(b"\0" * 32) == ()
+    with pytest.raises(ValueError):
+        index.lookup("zinvalid0")
+
+
+def test_add_documents():
+    index = KeyIndex()
+    index.add(resolve_peer_did(PEER_DID_NUMALGO_2))
+    index.add(resolve_peer_did_dict(PEER_DID_NUMALGO_0))
+    assert PEER_DID_NUMALGO_2 in index and PEER_DID_NUMALGO_0 in index
+    assert len(index) == 2
+    for method in resolve_peer_did(PEER_DID_NUMALGO_2).verification_method:
+        assert PEER_DID_NUMALGO_2 in index.lookup(method.id)
+
+
+def test_remove():
+    index = KeyIndex([PEER_DID, PEER_DID_NUMALGO_0])
+    index.add(PEER_DID)
+    index.remove(PEER_DID_NUMALGO_0)
+    assert index.lookup(SIGNING_KEY) == (PEER_DID,)
+    index.discard(PEER_DID_NUMALGO_0)
+    with pytest.raises(KeyError):
+        index.remove(PEER_DID_NUMALGO_0)
+    index.remove(PEER_DID)
+    assert len(index) == 0
+    assert index.lookup(SIGNING_KEY) == index.lookup("#6MkqRYqQ") == ()
+    assert index._by_key == index._by_ident == {}
+
+
+def test_shared_keys():
+    signing_key = Ed25519VerificationKey.from_multibase(SIGNING_KEY)
+    peer_dids = [
+        create_peer_did_numalgo_2(
+            [X25519KeyAgreementKey(bytes([i]) * 32)],
+            [signing_key],
+            None,
+        )
+        for i in range(5)
+    ]
+    index = KeyIndex(peer_dids)
+    assert index.lookup(signing_key) == tuple(peer_dids)
+    index.remove(peer_dids[2])
+    assert index.lookup(signing_key) == tuple(peer_dids[:2] + peer_dids[3:])
+    for peer_did in peer_dids[3:]:
+        index.remove(peer_did)
+    assert index.lookup(signing_key) == tuple(peer_dids[:2])
+
+
+def test_add_malformed():
+    index = KeyIndex()
+    with pytest.raises(MalformedPeerDIDError):
+        index.add("did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KC")
+    assert len(index) == 0
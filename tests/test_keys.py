@@ -0,0 +1,74 @@
+import copy
+import gc
+import pickle
+
+import pytest
+
+from peerdid.keys import (
+    _INTERNED_KEYS,
+    BaseKey,
+    Ed25519VerificationKey,
+    KeyFormat,
+    X25519KeyAgreementKey,
+)
+
+ED25519_MULTIBASE = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+X25519_MULTIBASE = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+
+
+def test_key_hashable():
+    key = BaseKey.from_multibase(ED25519_MULTIBASE)
+    same = Ed25519VerificationKey.from_multibase(ED25519_MULTIBASE, ident="#other")
+    other = BaseKey.from_multibase(X25519_MULTIBASE)
+    assert key == same and hash(key) == hash(same)
+    assert key != other
+    assert {key, same, other} == {key, other}
+    assert {key: 1}[same] == 1
+
+
+def test_key_immutable():
+    key = BaseKey.from_multibase(ED25519_MULTIBASE)
+    with pytest.raises(AttributeError):
+        key.public_key = b"\0" * 32
+    with pytest.raises(AttributeError):
+        key.extra = 1
+    with pytest.raises(AttributeError):
+        del key.ident
+    assert not hasattr(key, "__dict__")
+
+
+def test_key_public_key_copied_to_bytes():
+    public_key = bytearray(32)
+    key = X25519KeyAgreementKey(public_key)
+    public_key[0] = 1
+    assert key.public_key == bytes(32)
+
+
+@pytest.mark.parametrize(
+    "clone",
+    [lambda k: pickle.loads(pickle.dumps(k)), copy.copy, copy.deepcopy],
+    ids=["pickle", "copy", "deepcopy"],
+)
+def test_key_copy(clone):
+    key = BaseKey.from_multibase(X25519_MULTIBASE, ident="#k", format=KeyFormat.JWK)
+    result = clone(key)
+    assert type(result) is X25519KeyAgreementKey
+    assert result == key
+    assert (result.ident, result.format) == ("#k", KeyFormat.JWK)
+
+
+def test_from_multibase_intern():
+    key = BaseKey.from_multibase(ED25519_MULTIBASE, intern=True)
+    assert BaseKey.from_multibase(ED25519_MULTIBASE, intern=True) is key
+    assert Ed25519VerificationKey.from_multibase(ED25519_MULTIBASE, intern=True) is key
+    assert BaseKey.from_multibase(ED25519_MULTIBASE) is not key
+    other = BaseKey.from_multibase(ED25519_MULTIBASE, ident="#k", intern=True)
+    assert other is not key and other.ident == "#k"
+    with pytest.raises(ValueError, match="Codec mismatch"):
+        X25519KeyAgreementKey.from_multibase(ED25519_MULTIBASE, intern=True)
+
+
+def test_from_multibase_intern_releases_unused_keys():
+    BaseKey.from_multibase(X25519_MULTIBASE, ident="#tmp", intern=True)
+    gc.collect()
+    assert (X25519_MULTIBASE, "#tmp", None) not in _INTERNED_KEYS
@@ -0,0 +1,67 @@
+import random
+
+import base58
+import pytest
+
+from peerdid.core.multibase import from_base58, to_base58, to_base58_rows
+
+
+def _samples():
+    rnd = random.Random(58)
+    yield b""
+    for size in list(range(1, 40)) + [44, 48, 64, 65, 100]:
+        yield bytes(rnd.getrandbits(8) for _ in range(size))
+        yield b"\0" * rnd.randint(1, 3) + bytes(rnd.getrandbits(8) for _ in range(size))
+        yield b"\0" * size
+        yield b"\xff" * size
+    for prefix in (b"\xed\x01", b"\xec\x01"):
+        for _ in range(200):
+            yield prefix + bytes(rnd.getrandbits(8) for _ in range(32))
+
+
+def test_base58_matches_reference():
+    for value in _samples():
+        encoded = base58.b58encode(value).decode("utf-8")
+        assert to_base58(value) == encoded
+        assert from_base58(encoded) == value
+        assert from_base58(encoded + " \n") == value
+
+
+@pytest.mark.parametrize(
+    "encoded",
+    [
+        "6MkqRYqQiSgvZQdnBytw86Qbs0ZWUkGv22od935YF4s8M7V",
+        "6MkqRYqQiSgvZQdnBytw86QbsOZWUkGv22od935YF4s8M7V",
+        "6MkqRYqQiSgvZQdnBytw86Qbs ZWUkGv22od935YF4s8M7V",
+        "6MkqRYqQiSgvZQdnBytw86QbséZWUkGv22od935YF4s8M7V",
+        "6MkqRYqQiSgvZQdnBytw86Qbs一ZWUkGv22od935YF4s8M7V",
+        "l" * 100,
+    ],
+)
+def test_from_base58_invalid(encoded):
+    with pytest.raises(ValueError):
+        base58.b58decode(encoded)
+    with pytest.raises(ValueError, match="Invalid key: Invalid base58 encoding"):
+        from_base58(encoded)
+
+
+@pytest.mark.parametrize("width", [1, 2, 3, 4, 5, 32, 34, 35, 64, 100])
+def test_base58_rows_match_reference(width):
+    np = pytest.importorskip("numpy")
+    rnd = random.Random(width)
+    rows = np.array(
+        [[rnd.getrandbits(8) for _ in range(width)] for _ in range(50)],
+        dtype=np.uint8,
+    )
+    rows[1] = 0
+    rows[2] = 255
+    rows[3, : min(2, width)] = 0
+    assert to_base58_rows(rows) == [
+        base58.b58encode(row.tobytes()).decode() for row in rows
+    ]
+    # all rows of the same encoded length
+    rows[:, 0] = 0xED
+    assert to_base58_rows(rows, "z") == [
+        "z" + base58.b58encode(row.tobytes()).decode() for row in rows
+    ]
+    assert to_base58_rows(rows[:0]) == []
@@ -0,0 +1,74 @@
+import pytest
+
+from pydid import DID
+
+from peerdid.dids import (
+    PeerDIDNumalgo2Factory,
+    create_peer_did_numalgo_2,
+    is_peer_did,
+)
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from tests.test_create_peer_did_numalgo_2 import (
+    VALID_ED25519_VERIFICATION_KEY_2020_1,
+    VALID_ED25519_VERIFICATION_KEY_2020_2,
+    VALID_SERVICE,
+    VALID_X25519_KEY_AGREEMENT_KEY_2019,
+    VALID_X25519_KEY_AGREEMENT_KEY_2020,
+    VALID_X25519_KEY_AGREEMENT_KEY_JWK,
+)
+
+
+@pytest.mark.parametrize(
+    "signing_keys",
+    [
+        [],
+        [VALID_ED25519_VERIFICATION_KEY_2020_1],
+        [VALID_ED25519_VERIFICATION_KEY_2020_1, VALID_ED25519_VERIFICATION_KEY_2020_2],
+    ],
+)
+@pytest.mark.parametrize("service", [None, VALID_SERVICE])
+@pytest.mark.parametrize(
+    "encryption_keys",
+    [
+        [],
+        [VALID_X25519_KEY_AGREEMENT_KEY_2019],
+        [VALID_X25519_KEY_AGREEMENT_KEY_2020, VALID_X25519_KEY_AGREEMENT_KEY_JWK],
+    ],
+)
+def test_factory_mints_the_same_peer_dids(encryption_keys, signing_keys, service):
+    if not encryption_keys and not signing_keys:
+        return
+    expected = create_peer_did_numalgo_2(encryption_keys, signing_keys, service)
+    factory = PeerDIDNumalgo2Factory(signing_keys=signing_keys, service=service)
+    peer_did = factory.mint(encryption_keys)
+    assert isinstance(peer_did, DID)
+    assert peer_did == expected
+    peer_did_str = factory.mint_str(encryption_keys)
+    assert type(peer_did_str) is str
+    assert peer_did_str == expected
+    assert is_peer_did(peer_did_str)
+
+
+def test_factory_encodes_static_segments_once():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        factory = PeerDIDNumalgo2Factory(
+            [VALID_ED25519_VERIFICATION_KEY_2020_1], VALID_SERVICE
+        )
+        for _ in range(3):
+            factory.mint_str([VALID_X25519_KEY_AGREEMENT_KEY_2020])
+    counts = {phase: s.count for phase, s in metrics.snapshot().items()}
+    assert counts == {Phase.KEY_ENCODE: 4, Phase.SERVICE_ENCODE: 1}
+
+
+def test_factory_invalid_keys():
+    with pytest.raises(ValueError, match="Authentication not supported for key"):
+        PeerDIDNumalgo2Factory([VALID_X25519_KEY_AGREEMENT_KEY_2020])
+    with pytest.raises(ValueError, match="Service is not valid JSON"):
+        PeerDIDNumalgo2Factory([VALID_ED25519_VERIFICATION_KEY_2020_1], 42)
+
+    factory = PeerDIDNumalgo2Factory([VALID_ED25519_VERIFICATION_KEY_2020_1])
+    with pytest.raises(ValueError, match="Key agreement not supported for key"):
+        factory.mint([VALID_ED25519_VERIFICATION_KEY_2020_2])
+    with pytest.raises(ValueError, match="Key agreement not supported for key"):
+        factory.mint_str([VALID_ED25519_VERIFICATION_KEY_2020_2])
@@ -0,0 +1,117 @@
+import os
+
+from peerdid.dids import create_peer_did_numalgo_2
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from peerdid.keys import Ed25519VerificationKey, X25519KeyAgreementKey
+from peerdid.routing import DeliveryRoute, plan_delivery
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+SIGNING_KEY = Ed25519VerificationKey.from_base58(
+    "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7"
+)
+
+
+def _peer_did(service):
+    return create_peer_did_numalgo_2(
+        [X25519KeyAgreementKey(os.urandom(32))], [SIGNING_KEY], service
+    )
+
+
+def test_plan_delivery_groups():
+    mediator = {
+        "type": "DIDCommMessaging",
+        "serviceEndpoint": "https://mediator.example.com",
+        "routingKeys": ["did:example:mediator#key-1"],
+        "accept": ["didcomm/v2"],
+    }
+    behind_mediator = [_peer_did(mediator) for _ in range(3)]
+    endpoint_object = _peer_did(
+        [
+            {"type": "LinkedDomains", "serviceEndpoint": "https://example.com"},
+            {
+                "type": "DIDCommMessaging",
+                "serviceEndpoint": {
+                    "uri": "https://mediator.example.com",
+                    "routingKeys": ["did:example:mediator#key-1"],
+                    "accept": ["didcomm/v2"],
+                },
+            },
+        ]
+    )
+    direct = _peer_did(
+        {"type": "DIDCommMessaging", "serviceEndpoint": ["https://direct.example.com"]}
+    )
+    plan = plan_delivery(
+        behind_mediator[:2] + [direct, endpoint_object] + behind_mediator[2:]
+    )
+    assert plan.groups == {
+        DeliveryRoute(
+            "https://mediator.example.com",
+            ("did:example:mediator#key-1",),
+            ("didcomm/v2",),
+        ): behind_mediator[:2]
+        + [endpoint_object]
+        + behind_mediator[2:],
+        DeliveryRoute("https://direct.example.com", (), ()): [direct],
+    }
+    assert (plan.unroutable, plan.errors) == ([], {})
+
+
+def test_plan_delivery_test_vectors():
+    plan = plan_delivery(
+        [
+            PEER_DID_NUMALGO_0,
+            PEER_DID_NUMALGO_2,
+            PEER_DID_NUMALGO_2_2_SERVICES,
+            PEER_DID_NUMALGO_2_NO_SERVICES,
+        ]
+    )
+    assert plan.groups == {
+        DeliveryRoute(
+            "https://example.com/endpoint",
+            ("did:example:somemediator#somekey",),
+            ("didcomm/v2", "didcomm/aip2;env=rfc587"),
+        ): [PEER_DID_NUMALGO_2],
+        DeliveryRoute(
+            "https://example.com/endpoint",
+            ("did:example:somemediator#somekey",),
+            (),
+        ): [PEER_DID_NUMALGO_2_2_SERVICES],
+    }
+    assert plan.unroutable == [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2_NO_SERVICES]
+
+
+def test_plan_delivery_unroutable_and_errors():
+    other_type = _peer_did({"type": "LinkedDomains", "serviceEndpoint": "https://x"})
+    no_uri = _peer_did({"type": "DIDCommMessaging", "serviceEndpoint": {"x": 1}})
+    bad_keys = _peer_did(
+        {"type": "DIDCommMessaging", "serviceEndpoint": "https://x", "routingKeys": [1]}
+    )
+    malformed_service = PEER_DID_NUMALGO_2_NO_SERVICES + ".SeyJ"
+    plan = plan_delivery(
+        [other_type, no_uri, bad_keys, malformed_service, "did:peer:1z6Mk"]
+    )
+    assert plan.groups == {}
+    assert plan.unroutable == [other_type, no_uri, bad_keys]
+    assert list(plan.errors) == [malformed_service, "did:peer:1z6Mk"]
+    assert all(isinstance(e, MalformedPeerDIDError) for e in plan.errors.values())
+    assert plan_delivery([other_type], "LinkedDomains").groups == {
+        DeliveryRoute("https://x", (), ()): [other_type]
+    }
+
+
+def test_plan_delivery_decodes_each_service_once():
+    service = {"type": "DIDCommMessaging", "serviceEndpoint": "https://x"}
+    peer_dids = [_peer_did(service) for _ in range(10)]
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        plan = plan_delivery(peer_dids)
+    assert list(plan.groups.values()) == [peer_dids]
+    assert Phase.MULTIBASE_DECODE not in metrics.snapshot()
+    assert metrics.snapshot()[Phase.VALIDATE].count == 10
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.cache import ResolutionCache
+from peerdid.dids import resolve_peer_did
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_BASE58,
+    DID_DOC_NUMALGO_2_MULTIBASE,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+)
+
+
+def test_resolve_with_cache_hit():
+    cache = ResolutionCache()
+    first = resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    second = resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    assert first == second == DIDDocument.from_json(DID_DOC_NUMALGO_2_MULTIBASE)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.nbytes > 0
+
+
+def test_resolve_with_cache_keyed_on_format():
+    cache = ResolutionCache()
+    resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_2, KeyFormat.BASE58, cache=cache)
+    assert did_doc == DIDDocument.from_json(DID_DOC_NUMALGO_2_BASE58)
+    assert cache.stats().misses == 2
+    assert len(cache) == 2
+
+
+def test_resolve_with_cache_returns_copies():
+    cache = ResolutionCache()
+    resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    did_doc.verification_method.clear()
+    did_doc.service[0].routingKeys.append("did:example:evil#key")
+    assert resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache) == DIDDocument.from_json(
+        DID_DOC_NUMALGO_2_MULTIBASE
+    )
+
+
+def test_resolve_with_cache_malformed_not_cached():
+    cache = ResolutionCache()
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did("did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od", cache=cache)
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    cache = ResolutionCache(maxsize=2)
+    resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    resolve_peer_did(PEER_DID_NUMALGO_2_2_SERVICES, cache=cache)
+    assert cache.get(PEER_DID_NUMALGO_2, KeyFormat.MULTIBASE) is None
+    assert cache.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is not None
+    assert cache.stats().evictions == 1
+    assert len(cache) == 2
+
+
+def test_cache_memory_budget():
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_2)
+    unbounded = ResolutionCache()
+    unbounded.put(PEER_DID_NUMALGO_2, KeyFormat.MULTIBASE, did_doc)
+    entry_size = unbounded.stats().nbytes
+
+    cache = ResolutionCache(max_bytes=entry_size * 2)
+    for fmt in KeyFormat:
+        cache.put(PEER_DID_NUMALGO_2, fmt, resolve_peer_did(PEER_DID_NUMALGO_2, fmt))
+    stats = cache.stats()
+    assert stats.nbytes <= entry_size * 2
+    assert stats.evictions >= 1
+
+    cache = ResolutionCache(max_bytes=entry_size - 1)
+    cache.put(PEER_DID_NUMALGO_2, KeyFormat.MULTIBASE, did_doc)
+    assert len(cache) == 0
+
+
+def test_cache_ttl():
+    cache = ResolutionCache(ttl=0.05)
+    resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    assert cache.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is not None
+    time.sleep(0.1)
+    assert cache.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is None
+    stats = cache.stats()
+    assert (stats.evictions, stats.entries, stats.nbytes) == (1, 0, 0)
+
+
+def test_cache_clear():
+    cache = ResolutionCache()
+    resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats().nbytes == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"maxsize": -1}, {"ttl": 0}, {"max_bytes": -1}], ids=str
+)
+def test_cache_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        ResolutionCache(**kwargs)
@@ -0,0 +1,89 @@
+import pytest
+
+from peerdid.dids import resolve_peer_did, resolve_peer_did_formats
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from peerdid.keys import KeyFormat
+from peerdid.policy import ResolverPolicy
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        PEER_DID_NUMALGO_0,
+        PEER_DID_NUMALGO_2,
+        PEER_DID_NUMALGO_2_2_SERVICES,
+        PEER_DID_NUMALGO_2_NO_SERVICES,
+    ],
+)
+def test_resolve_peer_did_formats(peer_did, trusted):
+    did_docs = resolve_peer_did_formats(peer_did, trusted=trusted)
+    assert list(did_docs) == list(KeyFormat)
+    for format, did_doc in did_docs.items():
+        expected = resolve_peer_did(peer_did, format)
+        assert did_doc == expected
+        assert did_doc.to_json() == expected.to_json()
+
+
+def test_resolve_peer_did_formats_decodes_once():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        did_docs = resolve_peer_did_formats(
+            PEER_DID_NUMALGO_2, [KeyFormat.JWK, KeyFormat.MULTIBASE, KeyFormat.JWK]
+        )
+    assert list(did_docs) == [KeyFormat.JWK, KeyFormat.MULTIBASE]
+    counts = {phase: s.count for phase, s in metrics.snapshot().items()}
+    assert counts[Phase.VALIDATE] == 1
+    assert counts[Phase.MULTIBASE_DECODE] == 3
+    assert counts[Phase.SERVICE_DECODE] == 1
+    assert counts[Phase.SERVICE_MODEL] == 1
+    assert counts[Phase.VERIFICATION_METHOD] == 6
+    assert counts[Phase.BUILD] == 2
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_resolve_peer_did_formats_validates_once(trusted, monkeypatch):
+    import pydid
+
+    builds = []
+    build = pydid.DIDDocumentBuilder.build
+    monkeypatch.setattr(
+        pydid.DIDDocumentBuilder,
+        "build",
+        lambda builder: builds.append(builder) or build(builder),
+    )
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        resolve_peer_did_formats(PEER_DID_NUMALGO_2, trusted=trusted)
+    assert metrics.snapshot()[Phase.VALIDATE].count == 1
+    assert len(builds) == (0 if trusted else 1)
+
+
+def test_resolve_peer_did_formats_share_services():
+    did_docs = resolve_peer_did_formats(PEER_DID_NUMALGO_2)
+    jwk, multibase = did_docs[KeyFormat.JWK], did_docs[KeyFormat.MULTIBASE]
+    assert jwk.service[0] is multibase.service[0]
+
+
+def test_resolve_peer_did_formats_errors():
+    with pytest.raises(MalformedPeerDIDError, match="Does not match peer DID regexp"):
+        resolve_peer_did_formats("did:peer:2")
+    with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+        resolve_peer_did_formats("did:peer:2.Vz6Mkq")
+    with pytest.raises(MalformedPeerDIDError, match="Invalid service"):
+        resolve_peer_did_formats(
+            PEER_DID_NUMALGO_2[: PEER_DID_NUMALGO_2.index(".S")] + ".SeyJ0IjoiZG0i"
+        )
+    with pytest.raises(MalformedPeerDIDError, match="longer than 100 characters"):
+        resolve_peer_did_formats(
+            PEER_DID_NUMALGO_2, policy=ResolverPolicy(max_length=100)
+        )
+    with pytest.raises(ValueError, match="At least one key format"):
+        resolve_peer_did_formats(PEER_DID_NUMALGO_0, [])
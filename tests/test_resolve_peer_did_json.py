@@ -0,0 +1,114 @@
+import pytest
+
+from peerdid.core.peer_did_helper import encode_service
+from peerdid.core.utils import urlsafe_b64encode
+from peerdid.dids import (
+    create_peer_did_numalgo_2,
+    resolve_peer_did,
+    resolve_peer_did_dict,
+    resolve_peer_did_json,
+)
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import Ed25519VerificationKey, KeyFormat, X25519KeyAgreementKey
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+PEER_DID_NUMALGO_2_EXTRA_SERVICE_FIELDS = create_peer_did_numalgo_2(
+    encryption_keys=[
+        X25519KeyAgreementKey.from_base58(
+            "DmgBSHMqaZiYqwNMEJJuxWzsGGC8jUYADrfSdBrC6L8s"
+        )
+    ],
+    signing_keys=[],
+    service=[
+        {
+            "type": "DIDCommMessaging",
+            "serviceEndpoint": ["https://example.com/1", {"uri": "ws://x", "n": None}],
+            "routingKeys": ["did:example:somemediator#somekey"],
+            "accept": ["didcomm/v2"],
+            "priority": 1,
+            "note": None,
+            "extra": {"nested": [1, None]},
+        },
+        {"type": "LinkedDomains", "serviceEndpoint": {"origins": ["x"]}},
+    ],
+)
+
+PEER_DIDS = [
+    PEER_DID_NUMALGO_0,
+    "did:peer:0z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc",
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+    PEER_DID_NUMALGO_2_EXTRA_SERVICE_FIELDS,
+]
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize("peer_did", PEER_DIDS)
+def test_resolve_peer_did_json_matches_to_json(peer_did, format):
+    did_doc = resolve_peer_did(peer_did, format)
+    assert resolve_peer_did_json(peer_did, format) == did_doc.to_json()
+    assert resolve_peer_did_dict(peer_did, format) == did_doc.serialize()
+
+
+@pytest.mark.parametrize(
+    "service",
+    [
+        {"type": "DIDCommMessaging"},
+        {"type": "DIDCommMessaging", "serviceEndpoint": 1},
+        {"type": "DIDCommMessaging", "serviceEndpoint": ["https://x", 1]},
+        {"type": 1, "serviceEndpoint": "https://example.com"},
+        {"type": "T", "serviceEndpoint": "https://example.com", "id": "#x"},
+    ],
+)
+def test_resolve_peer_did_json_invalid_service(service):
+    peer_did = PEER_DID_NUMALGO_2_NO_SERVICES + encode_service(service)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(peer_did)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did_json(peer_did)
+
+
+def test_resolve_peer_did_long_form_endpoint_ignored():
+    # a long form serviceEndpoint next to the short form one has always been dropped
+    service = encode_service(
+        {"type": "DIDCommMessaging", "serviceEndpoint": "https://example.com/1"}
+    )
+    peer_did = (
+        PEER_DID_NUMALGO_2_NO_SERVICES
+        + service[:2]
+        + urlsafe_b64encode(
+            b'{"t":"dm","s":"https://example.com/1","serviceEndpoint":"https://other"}'
+        ).decode()
+    )
+    expected = resolve_peer_did(PEER_DID_NUMALGO_2_NO_SERVICES + service)
+    assert resolve_peer_did(peer_did).service == expected.service
+    assert resolve_peer_did_dict(peer_did)["service"] == expected.serialize()["service"]
+
+
+def test_resolve_peer_did_json_malformed():
+    with pytest.raises(MalformedPeerDIDError, match="Does not match peer DID regexp"):
+        resolve_peer_did_json("did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od")
+    with pytest.raises(MalformedPeerDIDError, match="Authentication not supported"):
+        resolve_peer_did_json(
+            "did:peer:2.Vz6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+        )
+
+
+def test_serialize_verification_method_matches_pydid():
+    key = Ed25519VerificationKey.from_base58(
+        "ByHnpUCFb1vAfh9CFZ8ZkmUZguURW8nSw889hy6rD8L7", ident="#key-1"
+    )
+    for format in KeyFormat:
+        result = key.verification_method(PEER_DID_NUMALGO_0, format)
+        assert key.serialize_verification_method(PEER_DID_NUMALGO_0, format) == (
+            result.context,
+            result.method.serialize(),
+        )
@@ -0,0 +1,101 @@
+import pytest
+
+from peerdid.core.peer_did_helper import encode_service
+from peerdid.dids import resolve_peer_did
+from peerdid.documents import LazyPeerDIDDocument, resolve_peer_did_lazy
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+MEMBERS = [
+    "id",
+    "context",
+    "also_known_as",
+    "controller",
+    "verification_method",
+    "authentication",
+    "assertion_method",
+    "key_agreement",
+    "capability_invocation",
+    "capability_delegation",
+    "service",
+]
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        PEER_DID_NUMALGO_0,
+        "did:peer:0z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc",
+        PEER_DID_NUMALGO_2,
+        PEER_DID_NUMALGO_2_2_SERVICES,
+        PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+        PEER_DID_NUMALGO_2_NO_SERVICES,
+    ],
+)
+def test_resolve_peer_did_lazy_matches_resolve(peer_did, format):
+    did_doc = resolve_peer_did(peer_did, format)
+    lazy = resolve_peer_did_lazy(peer_did, format)
+    for member in MEMBERS:
+        assert getattr(lazy, member) == getattr(did_doc, member), member
+    assert lazy.document == did_doc
+    assert lazy.to_json() == did_doc.to_json()
+    assert lazy.serialize() == did_doc.serialize()
+
+
+def test_resolve_peer_did_lazy_decodes_on_access():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        lazy = resolve_peer_did_lazy(PEER_DID_NUMALGO_2)
+        assert set(metrics.snapshot()) == {Phase.VALIDATE}
+
+        assert lazy.service[0].service_endpoint == "https://example.com/endpoint"
+        assert set(metrics.snapshot()) == {
+            Phase.VALIDATE,
+            Phase.SERVICE_DECODE,
+            Phase.SERVICE_MODEL,
+        }
+
+        assert len(lazy.key_agreement) == 1
+        assert metrics.snapshot()[Phase.MULTIBASE_DECODE].count == 1
+        lazy.key_agreement
+        lazy.authentication
+        assert metrics.snapshot()[Phase.MULTIBASE_DECODE].count == 3
+        assert Phase.BUILD not in metrics.snapshot()
+
+        assert lazy.dereference(lazy.key_agreement[0]) is not None
+        assert metrics.snapshot()[Phase.BUILD].count == 1
+        assert metrics.snapshot()[Phase.MULTIBASE_DECODE].count == 3
+
+
+def test_resolve_peer_did_lazy_malformed():
+    with pytest.raises(MalformedPeerDIDError, match="Does not match peer DID regexp"):
+        resolve_peer_did_lazy("did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od")
+    with pytest.raises(MalformedPeerDIDError, match="Unknown prefix: A."):
+        resolve_peer_did_lazy("did:peer:2.Az6MkqRYqQ")
+
+    # a segment is only reported as malformed once it is decoded
+    lazy = resolve_peer_did_lazy(
+        "did:peer:2.Vz6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+        + encode_service({"type": "DIDCommMessaging", "serviceEndpoint": "x"})
+    )
+    assert lazy.service[0].type == "DIDCommMessaging"
+    assert lazy.key_agreement is None
+    with pytest.raises(MalformedPeerDIDError, match="Authentication not supported"):
+        lazy.authentication
+    with pytest.raises(AttributeError):
+        lazy._missing
+
+
+def test_lazy_peer_did_document_repr():
+    assert repr(LazyPeerDIDDocument(PEER_DID_NUMALGO_0)) == (
+        "<LazyPeerDIDDocument {}>".format(PEER_DID_NUMALGO_0)
+    )
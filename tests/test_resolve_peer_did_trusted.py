@@ -0,0 +1,92 @@
+import pytest
+
+from pydid import DID, DIDDocument, DIDUrl
+
+from peerdid.dids import resolve_peer_did, resolve_peer_dids, try_resolve_peer_did
+from peerdid.errors import MalformedPeerDIDError, PeerDIDErrorCode
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+PEER_DIDS = [
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+]
+
+
+def _assert_same_document(trusted: DIDDocument, validated: DIDDocument):
+    assert type(trusted) is type(validated)
+    assert trusted == validated
+    assert trusted.serialize() == validated.serialize()
+    assert trusted.to_json() == validated.to_json()
+    assert trusted.__fields_set__ == validated.__fields_set__
+    assert trusted.id.method == validated.id.method
+    assert trusted.id.method_specific_id == validated.id.method_specific_id
+    for method, expected in zip(
+        trusted.verification_method, validated.verification_method
+    ):
+        assert type(method) is type(expected)
+        assert method.__fields_set__ == expected.__fields_set__
+        assert vars(method.id) == vars(expected.id)
+        assert type(method.controller) is DID
+        assert trusted.dereference(method.id) == expected
+        assert trusted.dereference(method.id.as_absolute(trusted.id)) == expected
+    for ref, expected in zip(
+        trusted.authentication or (), validated.authentication or ()
+    ):
+        assert type(ref) is DIDUrl
+        assert vars(ref) == vars(expected)
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize("peer_did", PEER_DIDS)
+def test_resolve_peer_did_trusted_equals_validated(peer_did, format):
+    validated = resolve_peer_did(peer_did, format)
+    _assert_same_document(resolve_peer_did(peer_did, format, trusted=True), validated)
+    _assert_same_document(
+        resolve_peer_did(DID(peer_did), format, trusted=True), validated
+    )
+
+
+def test_resolve_peer_did_trusted_skips_no_phase():
+    metrics = PhaseMetrics()
+    with instrumented(metrics):
+        resolve_peer_did(PEER_DID_NUMALGO_2, trusted=True)
+    counts = {phase: s.count for phase, s in metrics.snapshot().items()}
+    assert counts[Phase.VERIFICATION_METHOD] == 3
+    assert counts[Phase.SERVICE_MODEL] == 1
+    assert counts[Phase.BUILD] == 1
+
+
+@pytest.mark.parametrize(
+    "peer_did, code",
+    [
+        ("did:peer:2.Vz6Mkq", PeerDIDErrorCode.INVALID_MULTICODEC),
+        (
+            PEER_DID_NUMALGO_2[: PEER_DID_NUMALGO_2.index(".S")] + ".SeyJ0IjoiZG0i",
+            PeerDIDErrorCode.INVALID_SERVICE,
+        ),
+        ("did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V", None),
+    ],
+)
+def test_resolve_peer_did_trusted_still_checks_peer_did(peer_did, code):
+    failure = try_resolve_peer_did(peer_did, trusted=True)
+    assert failure.code == (code or PeerDIDErrorCode.MALFORMED)
+    with pytest.raises(MalformedPeerDIDError):
+        resolve_peer_did(peer_did, trusted=True)
+
+
+def test_resolve_peer_dids_trusted():
+    results = resolve_peer_dids(PEER_DIDS + ["did:peer:2"], workers=1, trusted=True)
+    for peer_did, result in zip(PEER_DIDS, results):
+        _assert_same_document(result, resolve_peer_did(peer_did))
+    assert isinstance(results[-1], MalformedPeerDIDError)
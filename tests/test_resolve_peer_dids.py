@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from peerdid import DIDDocument
+from peerdid.core.parallel import chunked
+from peerdid.dids import resolve_peer_did, resolve_peer_dids
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    DID_DOC_NUMALGO_2_JWK,
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+PEER_DIDS = [
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    "did:peer:2.Ez6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc.Vz6Mkq",
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    "did:peer:1z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V",
+    None,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_resolve_peer_dids_in_order_with_errors(workers):
+    results = resolve_peer_dids(PEER_DIDS, workers=workers, chunksize=2)
+    assert len(results) == len(PEER_DIDS)
+    for peer_did, result in zip(PEER_DIDS, results):
+        try:
+            expected = resolve_peer_did(peer_did)
+        except MalformedPeerDIDError as e:
+            assert isinstance(result, MalformedPeerDIDError)
+            assert str(result) == str(e)
+        else:
+            assert result == expected
+
+
+def test_resolve_peer_dids_format():
+    results = resolve_peer_dids(
+        iter([PEER_DID_NUMALGO_2] * 5), format=KeyFormat.JWK, workers=2, chunksize=1
+    )
+    assert results == [DIDDocument.from_json(DID_DOC_NUMALGO_2_JWK)] * 5
+
+
+def test_resolve_peer_dids_empty():
+    assert resolve_peer_dids([], workers=2) == []
+
+
+def test_resolve_peer_dids_invalid_workers():
+    with pytest.raises(ValueError):
+        resolve_peer_dids([PEER_DID_NUMALGO_0], workers=0)
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    with pytest.raises(ValueError):
+        list(chunked([], 0))
+
+
+def test_malformed_peer_did_error_pickle():
+    err = pickle.loads(pickle.dumps(MalformedPeerDIDError("Blank key entry")))
+    assert str(err) == "Invalid peer DID provided. Blank key entry."
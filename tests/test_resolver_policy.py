@@ -0,0 +1,147 @@
+import json
+import pickle
+import time
+
+import pytest
+
+from peerdid.core.peer_did_helper import encode_service
+from peerdid.core.utils import urlsafe_b64encode
+from peerdid.dids import (
+    resolve_peer_did,
+    resolve_peer_did_dict,
+    resolve_peer_did_json,
+    resolve_peer_dids,
+    try_resolve_peer_did,
+)
+from peerdid.errors import MalformedPeerDIDError, PeerDIDErrorCode, ResolutionFailure
+from peerdid.policy import ResolverPolicy
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+)
+
+X25519_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+ED25519_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+PREFIX = "did:peer:2.E" + X25519_KEY
+
+# rejecting an adversarial input must not take longer than this, in seconds
+TIME_BUDGET = 0.05
+
+
+def _raw_service(text: str) -> str:
+    return ".S" + urlsafe_b64encode(text.encode()).decode()
+
+
+ADVERSARIAL = [
+    # 10 MB Peer DIDs
+    ("did:peer:2.Vz" + "6" * 10_000_000, None),
+    ("did:peer:0z" + "6" * 10_000_000, None),
+    (PREFIX + ".S" + "e" * 10_000_000, None),
+    ("did:peer:2" + ".V" * 5_000_000, None),
+    # many keys
+    ("did:peer:2" + (".E" + X25519_KEY) * 60, 16),
+    ("did:peer:2" + ".Vz6" * 500, 16),
+    # large service
+    (PREFIX + _raw_service(json.dumps({"t": "dm", "s": "x" * 3000})), 1),
+    # deeply nested service
+    (PREFIX + _raw_service("[" * 1000 + "]" * 1000), 1),
+    (PREFIX + _raw_service('{"a":' * 300 + "1" + "}" * 300), 1),
+    # many services
+    (PREFIX + _raw_service(json.dumps([{"t": "dm", "s": "x"}] * 100)), 1),
+]
+
+
+@pytest.mark.parametrize(
+    "peer_did, segment", ADVERSARIAL, ids=[str(i) for i in range(len(ADVERSARIAL))]
+)
+def test_policy_rejects_adversarial_input_within_budget(peer_did, segment):
+    policy = ResolverPolicy()
+    start = time.perf_counter()
+    failure = try_resolve_peer_did(peer_did, policy=policy)
+    elapsed = time.perf_counter() - start
+    assert isinstance(failure, ResolutionFailure)
+    assert failure.code == PeerDIDErrorCode.LIMIT_EXCEEDED
+    assert failure.segment == segment
+    assert elapsed < TIME_BUDGET
+    with pytest.raises(MalformedPeerDIDError, match=failure.message):
+        resolve_peer_did_dict(peer_did, policy=policy)
+
+
+@pytest.mark.parametrize(
+    "peer_did",
+    [
+        "did:peer:2.Vz" + "6" * 100_000,
+        "did:peer:0z" + "6" * 100_000,
+        PREFIX + _raw_service("[" * 100_000 + "]" * 100_000),
+        PREFIX + _raw_service('"' * 2000),
+        PREFIX + _raw_service('["\\' + '\\"' * 1000),
+    ],
+)
+def test_malformed_input_rejected_within_budget_without_policy(peer_did):
+    start = time.perf_counter()
+    failure = try_resolve_peer_did(peer_did)
+    assert time.perf_counter() - start < TIME_BUDGET * 10
+    assert isinstance(failure, ResolutionFailure)
+    assert failure.code in (
+        PeerDIDErrorCode.INVALID_KEY_LENGTH,
+        PeerDIDErrorCode.INVALID_SERVICE,
+    )
+
+
+@pytest.mark.parametrize(
+    "peer_did", [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_2_SERVICES]
+)
+def test_policy_accepts_valid_peer_dids(peer_did):
+    policy = ResolverPolicy()
+    assert resolve_peer_did(peer_did, policy=policy) == resolve_peer_did(peer_did)
+    assert resolve_peer_did_json(peer_did, policy=policy) == resolve_peer_did_json(
+        peer_did
+    )
+
+
+def test_policy_limits():
+    service = encode_service(
+        [
+            {"type": "DIDCommMessaging", "serviceEndpoint": {"uri": "x", "r": ["y"]}},
+            {"type": "DIDCommMessaging", "serviceEndpoint": "z"},
+        ]
+    )
+    peer_did = PREFIX + ".V" + ED25519_KEY + service
+    limits = {
+        "max_length": len(peer_did),
+        "max_keys": 2,
+        "max_service_bytes": (len(service) - 2) * 3 // 4,
+        "max_services": 2,
+        "max_service_depth": 4,
+    }
+    assert not isinstance(
+        try_resolve_peer_did(peer_did, policy=ResolverPolicy(**limits)),
+        ResolutionFailure,
+    )
+    for name, limit in limits.items():
+        policy = ResolverPolicy(**dict(limits, **{name: limit - 1}))
+        failure = try_resolve_peer_did(peer_did, policy=policy)
+        assert failure.code == PeerDIDErrorCode.LIMIT_EXCEEDED, name
+    failure = try_resolve_peer_did(peer_did, policy=ResolverPolicy(max_keys=1))
+    assert (failure.segment, failure.offset) == (1, len(PREFIX) + 2)
+    assert failure.message == "Peer DID has more than 1 keys"
+
+    unlimited = ResolverPolicy(None, None, None, None, None)
+    assert not isinstance(
+        try_resolve_peer_did(peer_did, policy=unlimited), ResolutionFailure
+    )
+    with pytest.raises(ValueError, match="max_keys"):
+        ResolverPolicy(max_keys=-1)
+
+
+def test_policy_in_batches():
+    policy = ResolverPolicy(max_length=100)
+    results = resolve_peer_dids(
+        [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2], workers=1, policy=policy
+    )
+    assert results[0] == resolve_peer_did(PEER_DID_NUMALGO_0)
+    assert isinstance(results[1], MalformedPeerDIDError)
+    assert "longer than 100 characters" in str(results[1])
+    restored = pickle.loads(pickle.dumps(policy))
+    assert repr(restored) == repr(policy)
@@ -0,0 +1,126 @@
+import pytest
+
+from peerdid.cache import (
+    SegmentCache,
+    get_segment_cache,
+    segment_cache,
+    set_segment_cache,
+)
+from peerdid.core.peer_did_helper import decode_multibase_numbasis, decode_service
+from peerdid.dids import resolve_peer_did, resolve_peer_did_dict
+from peerdid.documents import resolve_peer_did_lazy
+from peerdid.errors import MalformedPeerDIDError
+from peerdid.instrumentation import Phase, PhaseMetrics, instrumented
+from peerdid.keys import KeyFormat
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+)
+
+# same service segment as PEER_DID_NUMALGO_2, other keys
+PEER_DID_NUMALGO_2_SAME_SERVICE = (
+    "did:peer:2.Ez6LSpSrLxbAhg2SHwKk7kwpsH7DM7QjFS5iK6qP87eViohud"
+    + PEER_DID_NUMALGO_2[PEER_DID_NUMALGO_2.index(".Vz") :]
+)
+
+SERVICE = PEER_DID_NUMALGO_2[PEER_DID_NUMALGO_2.index(".S") + 2 :]
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize(
+    "peer_did",
+    [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2, PEER_DID_NUMALGO_2_2_SERVICES],
+)
+def test_segment_cache_resolves_the_same_documents(peer_did, format):
+    expected = resolve_peer_did(peer_did, format)
+    expected_dict = resolve_peer_did_dict(peer_did, format)
+    with segment_cache(SegmentCache()) as cache:
+        for _ in range(2):
+            assert resolve_peer_did(peer_did, format) == expected
+            assert resolve_peer_did_dict(peer_did, format) == expected_dict
+            assert resolve_peer_did_lazy(peer_did, format).document == expected
+        assert cache.stats().hits > 0
+
+
+def test_segment_cache_decodes_shared_segments_once():
+    metrics = PhaseMetrics()
+    with segment_cache(SegmentCache()) as cache, instrumented(metrics):
+        resolve_peer_did(PEER_DID_NUMALGO_2)
+        resolve_peer_did(PEER_DID_NUMALGO_2_SAME_SERVICE)
+    counts = {phase: s.count for phase, s in metrics.snapshot().items()}
+    # the key agreement key differs, the authentication keys and service are shared
+    assert counts[Phase.MULTIBASE_DECODE] == 4
+    assert counts[Phase.SERVICE_DECODE] == 1
+    assert counts[Phase.SERVICE_MODEL] == 1
+    assert counts[Phase.BUILD] == 2
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 5, 5)
+    assert stats.nbytes > 0
+
+
+def test_segment_cache_shares_keys_and_copies_services():
+    with segment_cache(SegmentCache()):
+        key = decode_multibase_numbasis(
+            "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V", KeyFormat.JWK
+        )
+        assert (
+            decode_multibase_numbasis(
+                "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V", KeyFormat.JWK
+            )
+            is key
+        )
+        assert (
+            decode_multibase_numbasis(
+                "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V", KeyFormat.BASE58
+            ).format
+            == KeyFormat.BASE58
+        )
+
+        services = decode_service(SERVICE)
+        services[0].accept.append("didcomm/v1")
+        again = decode_service(SERVICE)
+        assert again[0] is not services[0]
+        assert again[0].accept == ["didcomm/v2", "didcomm/aip2;env=rfc587"]
+        assert resolve_peer_did(PEER_DID_NUMALGO_2).service == again
+
+
+def test_segment_cache_does_not_memoize_errors():
+    with segment_cache(SegmentCache()) as cache:
+        for _ in range(2):
+            with pytest.raises(MalformedPeerDIDError, match="Invalid service"):
+                decode_service("eyJ0IjoiZG0i")
+            with pytest.raises(MalformedPeerDIDError, match="Invalid key"):
+                decode_multibase_numbasis("z6MkqRYqQ", KeyFormat.MULTIBASE)
+        assert len(cache) == 0
+
+
+def test_segment_cache_eviction():
+    cache = SegmentCache(maxsize=2)
+    cache.put("a", KeyFormat.JWK, "key a")
+    cache.put("b", None, b"service b")
+    assert cache.get("a", KeyFormat.JWK) == "key a"
+    assert cache.get("a", KeyFormat.BASE58) is None
+    cache.put("c", None, b"service c")
+    assert cache.get("b", None) is None
+    assert cache.get("c", None) == b"service c"
+    assert cache.stats() == (2, 2, 1, 2, len(b"service c"))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats().nbytes == 0
+
+    disabled = SegmentCache(maxsize=0)
+    disabled.put("a", None, b"service a")
+    assert len(disabled) == 0
+    with pytest.raises(ValueError):
+        SegmentCache(maxsize=-1)
+
+
+def test_set_segment_cache():
+    assert get_segment_cache() is None
+    cache = SegmentCache()
+    assert set_segment_cache(cache) is None
+    try:
+        assert get_segment_cache() is cache
+    finally:
+        assert set_segment_cache(None) is cache
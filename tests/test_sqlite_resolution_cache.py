@@ -0,0 +1,219 @@
+import json
+import os
+import pickle
+import sqlite3
+import subprocess
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from peerdid.cache import CacheBackend, SQLiteResolutionCache
+from peerdid.dids import create_peer_did_numalgo_2, resolve_peer_did
+from peerdid.keys import KeyFormat
+from tests.test_create_peer_did_numalgo_2 import VALID_X25519_KEY_AGREEMENT_KEY_2020
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+def _resolve_cached(cache, peer_did):
+    resolve_peer_did(peer_did, cache=cache)
+    cache.close()
+    return cache.stats().misses
+
+
+def test_persists_across_restarts(path):
+    with SQLiteResolutionCache(path) as cache:
+        resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+        resolve_peer_did(PEER_DID_NUMALGO_2, KeyFormat.JWK, cache=cache)
+    with SQLiteResolutionCache(path) as cache:
+        assert len(cache) == 2
+        for format in (KeyFormat.MULTIBASE, KeyFormat.JWK):
+            assert resolve_peer_did(
+                PEER_DID_NUMALGO_2, format, cache=cache
+            ) == resolve_peer_did(PEER_DID_NUMALGO_2, format)
+        assert cache.stats()[:3] == (2, 0, 0)
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_batched_writes(path):
+    cache = SQLiteResolutionCache(path, batch_size=2)
+    other = SQLiteResolutionCache(path)
+    resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    assert cache.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is not None
+    assert other.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is None
+    resolve_peer_did(PEER_DID_NUMALGO_2, cache=cache)
+    assert other.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is not None
+    resolve_peer_did(PEER_DID_NUMALGO_2_2_SERVICES, cache=cache)
+    assert len(other) == 2
+    cache.flush()
+    assert len(other) == 3
+    other.clear()
+    assert len(cache) == 0
+
+
+def test_shared_between_processes(path):
+    cache = SQLiteResolutionCache(path)
+    assert pickle.loads(pickle.dumps(cache)).path == path
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert list(
+            executor.map(_resolve_cached, [cache] * 2, [PEER_DID_NUMALGO_2] * 2)
+        )
+    assert cache.get(PEER_DID_NUMALGO_2, KeyFormat.MULTIBASE) == resolve_peer_did(
+        PEER_DID_NUMALGO_2
+    )
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "invalid",
+        '{"id": "did:peer:0z6MkqRYqQ"}',
+        resolve_peer_did(PEER_DID_NUMALGO_2).to_json(),
+        resolve_peer_did(PEER_DID_NUMALGO_0)
+        .to_json()
+        .replace("Ed25519VerificationKey2020", "__class__"),
+        resolve_peer_did(PEER_DID_NUMALGO_0)
+        .to_json()
+        .replace('"#6Mkq', '"did:peer:0z6Mkq#'),
+    ],
+)
+def test_unloadable_entry_is_evicted(path, document):
+    cache = SQLiteResolutionCache(path)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO peerdid_documents VALUES (?, ?, ?)",
+            (PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE.value, document),
+        )
+    assert cache.get(PEER_DID_NUMALGO_0, KeyFormat.MULTIBASE) is None
+    assert cache.stats()[1:] == (1, 1, 0, 0)
+
+
+def test_stores_json(path):
+    with SQLiteResolutionCache(path) as cache:
+        for format in KeyFormat:
+            resolve_peer_did(PEER_DID_NUMALGO_2_2_SERVICES, format, cache=cache)
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(
+            "SELECT format, document FROM peerdid_documents"
+        ).fetchall()
+    assert len(rows) == len(KeyFormat)
+    for format, document in rows:
+        expected = resolve_peer_did(PEER_DID_NUMALGO_2_2_SERVICES, KeyFormat(format))
+        assert json.loads(document) == expected.serialize()
+        cached = SQLiteResolutionCache(path).get(
+            PEER_DID_NUMALGO_2_2_SERVICES, KeyFormat(format)
+        )
+        assert cached == expected
+        assert cached.to_json() == expected.to_json()
+        assert cached.dereference(cached.verification_method[0].id)
+
+
+PEER_DID_NULL_SERVICE_MEMBER = create_peer_did_numalgo_2(
+    [VALID_X25519_KEY_AGREEMENT_KEY_2020],
+    [],
+    {
+        "type": "DIDCommMessaging",
+        "serviceEndpoint": "https://example.com",
+        "note": None,
+        "label": "example",
+        "priority": 0,
+    },
+)
+
+
+def test_keeps_null_service_members(path):
+    expected = resolve_peer_did(PEER_DID_NULL_SERVICE_MEMBER)
+    assert "note" not in expected.serialize()["service"][0]
+    # write from a process with another hash seed, which orders the extras differently
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from peerdid.cache import SQLiteResolutionCache\n"
+            "from peerdid.dids import resolve_peer_did\n"
+            "with SQLiteResolutionCache(sys.argv[1]) as cache:\n"
+            "    resolve_peer_did(sys.argv[2], cache=cache)\n",
+            path,
+            PEER_DID_NULL_SERVICE_MEMBER,
+        ],
+        check=True,
+        env=dict(os.environ, PYTHONHASHSEED="1"),
+    )
+    cached = SQLiteResolutionCache(path).get(
+        PEER_DID_NULL_SERVICE_MEMBER, KeyFormat.MULTIBASE
+    )
+    assert cached == expected
+    assert cached.service[0].note is None
+
+
+def test_unsupported_schema_version(path):
+    with SQLiteResolutionCache(path) as cache:
+        resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE peerdid_cache SET value = 2")
+    with pytest.raises(ValueError, match="unsupported cache schema version: 2"):
+        len(SQLiteResolutionCache(path))
+
+
+def test_keeps_other_tables(path):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE documents (name TEXT)")
+        connection.execute("INSERT INTO documents VALUES ('app data')")
+    with SQLiteResolutionCache(path) as cache:
+        resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+        cache.clear()
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT * FROM documents").fetchall() == [
+            ("app data",)
+        ]
+        assert connection.execute("PRAGMA user_version").fetchone() == (0,)
+
+
+def test_foreign_table_is_not_dropped(path):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE peerdid_documents (name TEXT)")
+        connection.execute("INSERT INTO peerdid_documents VALUES ('app data')")
+    with pytest.raises(ValueError, match="not created by the cache"):
+        SQLiteResolutionCache(path)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT * FROM peerdid_documents").fetchall() == [
+            ("app data",)
+        ]
+
+
+def test_invalid_settings(path):
+    with pytest.raises(ValueError):
+        SQLiteResolutionCache(path, batch_size=0)
+
+
+def test_custom_backend():
+    class DictCache(CacheBackend):
+        def __init__(self):
+            self.entries = {}
+
+        def get(self, peer_did, format):
+            return self.entries.get((peer_did, format))
+
+        def put(self, peer_did, format, did_doc):
+            self.entries[(peer_did, format)] = did_doc
+
+        def clear(self):
+            self.entries.clear()
+
+    cache = DictCache()
+    did_doc = resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    assert resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache) is did_doc
+    with pytest.raises(TypeError):
+        CacheBackend()
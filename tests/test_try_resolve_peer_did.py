@@ -0,0 +1,133 @@
+import sys
+
+import pytest
+
+from peerdid.cache import ResolutionCache
+from peerdid.core.multibase import to_multibase
+from peerdid.core.peer_did_helper import encode_service
+from peerdid.dids import (
+    resolve_peer_did,
+    resolve_peer_did_dict,
+    resolve_peer_did_json,
+    try_resolve_peer_did,
+)
+from peerdid.documents import resolve_peer_did_lazy
+from peerdid.errors import MalformedPeerDIDError, PeerDIDErrorCode, ResolutionFailure
+from peerdid.keys import KeyFormat
+from tests.test_vectors import PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2
+
+X25519_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+ED25519_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+PREFIX_LENGTH = len("did:peer:2.E" + X25519_KEY + ".V")
+
+
+@pytest.mark.parametrize("format", list(KeyFormat))
+@pytest.mark.parametrize("peer_did", [PEER_DID_NUMALGO_0, PEER_DID_NUMALGO_2])
+def test_try_resolve_peer_did(peer_did, format):
+    assert try_resolve_peer_did(peer_did, format) == resolve_peer_did(peer_did, format)
+
+
+@pytest.mark.parametrize(
+    "peer_did, code, segment, offset",
+    [
+        (None, PeerDIDErrorCode.MALFORMED, None, 0),
+        ("did:peer:1" + ED25519_KEY, PeerDIDErrorCode.MALFORMED, None, 0),
+        ("did:peer:0" + ED25519_KEY + "0", PeerDIDErrorCode.MALFORMED, 0, 10),
+        (
+            "did:peer:2.E" + X25519_KEY + ".Vz6Mk!",
+            PeerDIDErrorCode.MALFORMED,
+            1,
+            PREFIX_LENGTH,
+        ),
+        (
+            "did:peer:2.E" + X25519_KEY + ".D" + ED25519_KEY,
+            PeerDIDErrorCode.UNKNOWN_PREFIX,
+            1,
+            PREFIX_LENGTH,
+        ),
+        (
+            "did:peer:0" + to_multibase(b"\x01" * 34),
+            PeerDIDErrorCode.INVALID_MULTICODEC,
+            0,
+            10,
+        ),
+        (
+            "did:peer:2.E" + to_multibase(b"\xec\x01" + b"\x01" * 31),
+            PeerDIDErrorCode.INVALID_KEY_LENGTH,
+            0,
+            12,
+        ),
+        (
+            "did:peer:2.E" + X25519_KEY + ".V" + X25519_KEY,
+            PeerDIDErrorCode.UNSUPPORTED_PURPOSE,
+            1,
+            PREFIX_LENGTH,
+        ),
+        (
+            "did:peer:2.E" + X25519_KEY + ".V" + ED25519_KEY + ".SeyJ",
+            PeerDIDErrorCode.INVALID_SERVICE,
+            2,
+            PREFIX_LENGTH + len(ED25519_KEY) + 2,
+        ),
+        (
+            "did:peer:2.E"
+            + X25519_KEY
+            + encode_service({"type": "DIDCommMessaging", "serviceEndpoint": 5}),
+            PeerDIDErrorCode.INVALID_SERVICE,
+            1,
+            PREFIX_LENGTH,
+        ),
+    ],
+)
+def test_try_resolve_peer_did_failure(peer_did, code, segment, offset):
+    failure = try_resolve_peer_did(peer_did)
+    assert isinstance(failure, ResolutionFailure)
+    assert (failure.code, failure.segment, failure.offset) == (code, segment, offset)
+    assert failure.peer_did is peer_did
+    with pytest.raises(MalformedPeerDIDError) as excinfo:
+        resolve_peer_did(peer_did)
+    assert str(excinfo.value) == str(failure.to_error())
+    assert excinfo.value.msg == failure.message
+    # every resolver decodes keys the same way and fails with the same error
+    for resolve in (
+        resolve_peer_did_dict,
+        resolve_peer_did_json,
+        lambda did: resolve_peer_did_lazy(did).document,
+    ):
+        with pytest.raises(MalformedPeerDIDError) as excinfo:
+            resolve(peer_did)
+        assert str(excinfo.value) == str(failure.to_error())
+
+
+def test_try_resolve_peer_did_does_not_raise_on_malformed_keys():
+    exceptions = []
+
+    def trace(frame, event, arg):
+        if event == "exception":
+            exceptions.append(arg[0])
+        return trace
+
+    peer_dids = [
+        "did:peer:1" + ED25519_KEY,
+        "did:peer:2.E" + X25519_KEY + ".D" + ED25519_KEY,
+        "did:peer:0" + to_multibase(b"\x01" * 34),
+        "did:peer:2.V" + X25519_KEY,
+    ]
+    sys.settrace(trace)
+    try:
+        failures = [try_resolve_peer_did(peer_did) for peer_did in peer_dids]
+    finally:
+        sys.settrace(None)
+    assert all(isinstance(failure, ResolutionFailure) for failure in failures)
+    assert exceptions == []
+
+
+def test_try_resolve_peer_did_cache():
+    cache = ResolutionCache()
+    did_doc = try_resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache)
+    assert try_resolve_peer_did(PEER_DID_NUMALGO_0, cache=cache) == did_doc
+    assert cache.stats().hits == 1
+    assert isinstance(
+        try_resolve_peer_did("did:peer:1", cache=cache), ResolutionFailure
+    )
+    assert len(cache) == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from peerdid.core.multibase import to_multibase
+from peerdid.core.peer_did_helper import encode_service
+from peerdid.core.utils import urlsafe_b64encode
+from peerdid.dids import is_peer_did, resolve_peer_did_dict, validate_peer_dids
+from peerdid.errors import MalformedPeerDIDError, PeerDIDErrorCode
+from tests.test_vectors import (
+    PEER_DID_NUMALGO_0,
+    PEER_DID_NUMALGO_2,
+    PEER_DID_NUMALGO_2_2_SERVICES,
+    PEER_DID_NUMALGO_2_MINIMAL_SERVICES,
+    PEER_DID_NUMALGO_2_NO_SERVICES,
+)
+
+X25519_KEY = "z6LSbysY2xFMRpGMhb7tFTLMpeuPRaqaWM1yECx2AtzE3KCc"
+ED25519_KEY = "z6MkqRYqQiSgvZQdnBytw86Qbs2ZWUkGv22od935YF4s8M7V"
+
+PEER_DIDS = [
+    (PEER_DID_NUMALGO_0, PeerDIDErrorCode.VALID),
+    ("did:peer:0" + X25519_KEY, PeerDIDErrorCode.VALID),
+    (PEER_DID_NUMALGO_2, PeerDIDErrorCode.VALID),
+    (PEER_DID_NUMALGO_2_2_SERVICES, PeerDIDErrorCode.VALID),
+    (PEER_DID_NUMALGO_2_MINIMAL_SERVICES, PeerDIDErrorCode.VALID),
+    (PEER_DID_NUMALGO_2_NO_SERVICES, PeerDIDErrorCode.VALID),
+    (None, PeerDIDErrorCode.MALFORMED),
+    ("did:peer:1" + ED25519_KEY, PeerDIDErrorCode.MALFORMED),
+    ("did:peer:2.S" + X25519_KEY, PeerDIDErrorCode.MALFORMED),
+    ("did:peer:2.A" + ED25519_KEY, PeerDIDErrorCode.UNKNOWN_PREFIX),
+    ("did:peer:2.E" + X25519_KEY + ".D" + ED25519_KEY, PeerDIDErrorCode.UNKNOWN_PREFIX),
+    ("did:peer:0" + to_multibase(b"\x01" * 34), PeerDIDErrorCode.INVALID_MULTICODEC),
+    ("did:peer:2.Vz6Mkq", PeerDIDErrorCode.INVALID_MULTICODEC),
+    (
+        "did:peer:0" + to_multibase(b"\xed\x01" + b"\x01" * 33),
+        PeerDIDErrorCode.INVALID_KEY_LENGTH,
+    ),
+    # non-canonical multicodec prefix, accepted by the resolver
+    (
+        "did:peer:0" + to_multibase(b"\xed\x81\x00" + b"\x01" * 31),
+        PeerDIDErrorCode.VALID,
+    ),
+    ("did:peer:2.V" + X25519_KEY, PeerDIDErrorCode.UNSUPPORTED_PURPOSE),
+    ("did:peer:2.E" + ED25519_KEY, PeerDIDErrorCode.UNSUPPORTED_PURPOSE),
+    ("did:peer:2.E" + X25519_KEY + ".Sabcde", PeerDIDErrorCode.INVALID_SERVICE),
+    (
+        "did:peer:2.E" + X25519_KEY + ".S" + urlsafe_b64encode(b"[1]").decode(),
+        PeerDIDErrorCode.INVALID_SERVICE,
+    ),
+    (
+        "did:peer:2.E" + X25519_KEY + encode_service({"type": "DIDCommMessaging"}),
+        PeerDIDErrorCode.INVALID_SERVICE,
+    ),
+]
+
+
+def test_validate_peer_dids_reasons():
+    peer_dids = [peer_did for peer_did, _ in PEER_DIDS]
+    result = validate_peer_dids(peer_dids, deep=True, reasons=True)
+    assert list(result.reasons) == [code for _, code in PEER_DIDS]
+    assert list(result.valid) == [
+        code == PeerDIDErrorCode.VALID for _, code in PEER_DIDS
+    ]
+
+
+@pytest.mark.parametrize("peer_did, code", PEER_DIDS)
+def test_validate_peer_dids_deep_matches_resolve(peer_did, code):
+    try:
+        resolve_peer_did_dict(peer_did)
+    except (MalformedPeerDIDError, TypeError, ValueError):
+        resolvable = False
+    else:
+        resolvable = True
+    assert validate_peer_dids([peer_did], deep=True).valid == bytearray([resolvable])
+
+
+def test_validate_peer_dids_syntax_only():
+    peer_dids = [peer_did for peer_did, _ in PEER_DIDS]
+    result = validate_peer_dids(iter(peer_dids))
+    assert result.reasons is None
+    assert list(result.valid) == [is_peer_did(peer_did) for peer_did in peer_dids]
+
+
+def test_validate_peer_dids_mask_as_numpy_array():
+    np = pytest.importorskip("numpy")
+    result = validate_peer_dids([PEER_DID_NUMALGO_0, "did:peer:1"])
+    assert np.frombuffer(result.valid, dtype=bool).tolist() == [True, False]
+    assert validate_peer_dids([]).valid == bytearray()